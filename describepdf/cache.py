@@ -0,0 +1,182 @@
+"""
+Response cache module for DescribePDF.
+
+This module persists VLM page descriptions on disk so that converting the
+same PDF again (for example while tuning prompts) does not repeat requests
+that were already answered. It uses the diskcache library when installed
+and falls back to a SQLite database from the standard library otherwise.
+"""
+
+import os
+import sqlite3
+import hashlib
+import threading
+import logging
+from functools import lru_cache
+from typing import Optional, Union
+
+logger = logging.getLogger('describepdf')
+
+# Check if diskcache is available
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# Directory holding the persistent response cache
+DEFAULT_CACHE_DIR = os.getenv(
+    "DESCRIBEPDF_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "describepdf")
+)
+
+# Number of file digests remembered in memory, keyed by path, size and mtime
+FILE_DIGEST_CACHE_SIZE = 128
+
+_RESPONSE_CACHE: Optional["ResponseCache"] = None
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+def make_cache_key(*parts: Union[str, bytes, memoryview]) -> str:
+    """
+    Build a cache key from the parts that identify a VLM request.
+
+    Args:
+        *parts: Strings or bytes-like objects (model, prompt, image, language...)
+
+    Returns:
+        str: Hex digest identifying the request
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    for part in parts:
+        digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Hash the contents of a file without loading it all into memory.
+
+    Digests are remembered per path, size and modification time, so
+    converting the same unchanged PDF again does not read it twice.
+
+    Args:
+        path: Path to the file
+        chunk_size: Number of bytes read at a time
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    stat = os.stat(path)
+    return _file_digest(os.path.abspath(path), stat.st_size, stat.st_mtime_ns, chunk_size)
+
+@lru_cache(maxsize=FILE_DIGEST_CACHE_SIZE)
+def _file_digest(path: str, size: int, mtime_ns: int, chunk_size: int) -> str:
+    """Hash a file; size and mtime_ns only make the lru_cache key change with the file."""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ResponseCache:
+    """Persistent key-value store for VLM responses."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        """
+        Open (or create) the response cache.
+
+        Args:
+            directory: Directory where the cache files are stored
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._lock = threading.Lock()
+        if DISKCACHE_AVAILABLE:
+            self._cache = diskcache.Cache(directory)
+            self._db = None
+        else:
+            self._cache = None
+            self._db = sqlite3.connect(os.path.join(directory, "responses.sqlite3"), check_same_thread=False)
+            with self._lock, self._db:
+                self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached response for a key.
+
+        Args:
+            key: Cache key built with make_cache_key
+
+        Returns:
+            Optional[str]: The cached response, or None on a miss or error
+        """
+        try:
+            if self._cache is not None:
+                return self._cache.get(key)
+            with self._lock:
+                row = self._db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            logger.warning(f"Could not read from the response cache: {e}")
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Cache key built with make_cache_key
+            value: Response to store
+        """
+        try:
+            if self._cache is not None:
+                self._cache.set(key, value)
+                return
+            with self._lock, self._db:
+                self._db.execute("INSERT OR REPLACE INTO responses (key, value) VALUES (?, ?)", (key, value))
+        except Exception as e:
+            logger.warning(f"Could not write to the response cache: {e}")
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        if self._cache is not None:
+            self._cache.clear()
+            return
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the underlying storage."""
+        if self._cache is not None:
+            self._cache.close()
+        else:
+            with self._lock:
+                self._db.close()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Return the shared response cache, opening it on first use.
+
+    Returns:
+        Optional[ResponseCache]: The cache, or None if it could not be opened
+    """
+    global _RESPONSE_CACHE
+    with _RESPONSE_CACHE_LOCK:
+        if _RESPONSE_CACHE is None:
+            try:
+                _RESPONSE_CACHE = ResponseCache()
+                logger.info(f"Response cache opened at {_RESPONSE_CACHE.directory}")
+            except Exception as e:
+                logger.warning(f"Could not open the response cache at {DEFAULT_CACHE_DIR}: {e}")
+                return None
+        return _RESPONSE_CACHE
+
+def clear_response_cache() -> None:
+    """Remove every response stored in the shared response cache."""
+    # Never create the cache directory just to clear it
+    if _RESPONSE_CACHE is None and not os.path.isdir(DEFAULT_CACHE_DIR):
+        return
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        response_cache.clear()
+        logger.info("Response cache cleared.")
@@ -87,6 +87,18 @@ def setup_cli_parser() -> argparse.ArgumentParser:
         help="Model to generate the summary (default: configured in .env)"
     )
     
+    parser.add_argument(
+        "-j", "--parallel-pages",
+        type=int,
+        help="Number of pages described at the same time (default: configured in .env)"
+    )
+    
+    parser.add_argument(
+        "--response-cache",
+        action="store_true",
+        help="Reuse page descriptions stored on disk by previous runs and store new ones"
+    )
+    
     parser.add_argument(
         "-v", "--verbose", 
         action="store_true", 
@@ -161,6 +173,13 @@ def run_cli() -> None:
         "output_language": args.language if args.language else env_config.get("output_language"),
         "use_markitdown": args.use_markitdown if args.use_markitdown is not None else env_config.get("use_markitdown"),
         "use_summary": args.use_summary if args.use_summary is not None else env_config.get("use_summary"),
+        "use_page_cache": env_config.get("use_page_cache", True),
+        "use_response_cache": True if args.response_cache else env_config.get("use_response_cache", False),
+        "image_format": env_config.get("image_format", "jpeg"),
+        "render_max_side": env_config.get("render_max_side"),
+        "render_max_pixels": env_config.get("render_max_pixels"),
+        "image_quality": env_config.get("image_quality", 85),
+        "max_parallel_pages": args.parallel_pages if args.parallel_pages else env_config.get("max_parallel_pages", 1),
         "page_selection": args.pages if args.pages else env_config.get("page_selection")
     }
     
@@ -184,6 +203,7 @@ def run_cli() -> None:
     
     elif provider == "ollama":
         run_config["ollama_endpoint"] = args.endpoint if args.endpoint else env_config.get("ollama_endpoint")
+        run_config["ollama_num_batch"] = env_config.get("ollama_num_batch")
         
         if not vlm_model:
             vlm_model = env_config.get("ollama_vlm_model")
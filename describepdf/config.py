@@ -5,8 +5,9 @@ This module manages loading configuration from environment variables
 and prompt templates from files.
 """
 import os
+import time
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dotenv import load_dotenv
 import pathlib
 
@@ -29,10 +30,18 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     "ollama_endpoint": "http://localhost:11434",
     "ollama_vlm_model": "llama3.2-vision",
     "ollama_summary_model": "qwen2.5",
+    "ollama_num_batch": 1024,
     
     "output_language": "English",
     "use_markitdown": False,
     "use_summary": False,
+    "use_page_cache": True,
+    "use_response_cache": False,
+    "image_format": "jpeg",
+    "render_max_side": 1120,
+    "render_max_pixels": 1120 * 1120,
+    "image_quality": 85,
+    "max_parallel_pages": 4,
     "page_selection": None
 }
 
@@ -48,8 +57,16 @@ PROMPT_FILES: Dict[str, str] = {
 # Cache for loaded configuration
 _CONFIG_CACHE: Optional[Dict[str, Any]] = None
 
-# Cache for loaded prompts
+# Cache for loaded prompts, valid while the prompt files keep these modification times
 _PROMPTS_CACHE: Optional[Dict[str, str]] = None
+_PROMPTS_SIGNATURE: Optional[Tuple[Optional[int], ...]] = None
+_PROMPTS_CHECKED_AT: float = 0.0
+
+# Minimum number of seconds between two checks of the prompt files for changes
+PROMPTS_CHECK_INTERVAL = 1.0
+
+# Cache for the prompts required by each (use_markitdown, use_summary) combination
+_REQUIRED_PROMPTS_CACHE: Dict[Tuple[bool, bool], Dict[str, str]] = {}
 
 def load_env_config() -> Dict[str, Any]:
     """
@@ -94,6 +111,45 @@ def load_env_config() -> Dict[str, Any]:
     if os.getenv("DEFAULT_USE_SUMMARY"):
         loaded_config["use_summary"] = str(os.getenv("DEFAULT_USE_SUMMARY")).lower() == 'true'
     
+    if os.getenv("DEFAULT_USE_PAGE_CACHE"):
+        loaded_config["use_page_cache"] = str(os.getenv("DEFAULT_USE_PAGE_CACHE")).lower() == 'true'
+    
+    if os.getenv("DEFAULT_USE_RESPONSE_CACHE"):
+        loaded_config["use_response_cache"] = str(os.getenv("DEFAULT_USE_RESPONSE_CACHE")).lower() == 'true'
+    
+    if os.getenv("DEFAULT_IMAGE_FORMAT"):
+        loaded_config["image_format"] = str(os.getenv("DEFAULT_IMAGE_FORMAT")).lower()
+    
+    if os.getenv("DEFAULT_RENDER_MAX_SIDE"):
+        try:
+            loaded_config["render_max_side"] = int(os.getenv("DEFAULT_RENDER_MAX_SIDE"))
+        except ValueError:
+            logger.warning(f"Invalid DEFAULT_RENDER_MAX_SIDE value: {os.getenv('DEFAULT_RENDER_MAX_SIDE')}. Using default.")
+    
+    if os.getenv("DEFAULT_RENDER_MAX_PIXELS"):
+        try:
+            loaded_config["render_max_pixels"] = int(os.getenv("DEFAULT_RENDER_MAX_PIXELS"))
+        except ValueError:
+            logger.warning(f"Invalid DEFAULT_RENDER_MAX_PIXELS value: {os.getenv('DEFAULT_RENDER_MAX_PIXELS')}. Using default.")
+    
+    if os.getenv("DEFAULT_IMAGE_QUALITY"):
+        try:
+            loaded_config["image_quality"] = int(os.getenv("DEFAULT_IMAGE_QUALITY"))
+        except ValueError:
+            logger.warning(f"Invalid DEFAULT_IMAGE_QUALITY value: {os.getenv('DEFAULT_IMAGE_QUALITY')}. Using default.")
+    
+    if os.getenv("DEFAULT_OLLAMA_NUM_BATCH"):
+        try:
+            loaded_config["ollama_num_batch"] = int(os.getenv("DEFAULT_OLLAMA_NUM_BATCH"))
+        except ValueError:
+            logger.warning(f"Invalid DEFAULT_OLLAMA_NUM_BATCH value: {os.getenv('DEFAULT_OLLAMA_NUM_BATCH')}. Using default.")
+    
+    if os.getenv("DEFAULT_MAX_PARALLEL_PAGES"):
+        try:
+            loaded_config["max_parallel_pages"] = int(os.getenv("DEFAULT_MAX_PARALLEL_PAGES"))
+        except ValueError:
+            logger.warning(f"Invalid DEFAULT_MAX_PARALLEL_PAGES value: {os.getenv('DEFAULT_MAX_PARALLEL_PAGES')}. Using default.")
+    
     if os.getenv("DEFAULT_PAGE_SELECTION"):
         loaded_config["page_selection"] = os.getenv("DEFAULT_PAGE_SELECTION")
 
@@ -166,29 +222,67 @@ def reload_config() -> Dict[str, Any]:
     _CONFIG_CACHE = load_env_config()
     return _CONFIG_CACHE
 
+def _prompt_files_signature() -> Tuple[Optional[int], ...]:
+    """
+    Get the modification times of the prompt files.
+    
+    Returns:
+        Tuple[Optional[int], ...]: mtime in nanoseconds of each prompt file, None if missing
+    """
+    signature: List[Optional[int]] = []
+    for filename in PROMPT_FILES.values():
+        try:
+            signature.append((PROMPTS_DIR / filename).stat().st_mtime_ns)
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
 def get_prompts() -> Dict[str, str]:
     """
     Get the prompt templates.
     
-    This function loads the prompt templates only once and returns the cached version
-    on subsequent calls, improving efficiency.
+    This function loads the prompt templates once and returns the cached version
+    on subsequent calls. The files are only checked for changes (by modification
+    time), at most once every PROMPTS_CHECK_INTERVAL seconds, so editing a prompt
+    takes effect without reading or checking every file on each call.
     
     Returns:
         Dict[str, str]: Dictionary with loaded prompt templates
     """
-    global _PROMPTS_CACHE
+    global _PROMPTS_CACHE, _PROMPTS_SIGNATURE, _PROMPTS_CHECKED_AT
     
-    if _PROMPTS_CACHE is None:
+    now = time.monotonic()
+    if _PROMPTS_CACHE is not None and now - _PROMPTS_CHECKED_AT < PROMPTS_CHECK_INTERVAL:
+        return _PROMPTS_CACHE
+    _PROMPTS_CHECKED_AT = now
+    
+    signature = _prompt_files_signature()
+    if _PROMPTS_CACHE is None or signature != _PROMPTS_SIGNATURE:
+        if _PROMPTS_CACHE is not None:
+            logger.info("Prompt templates changed on disk, reloading them.")
+        _REQUIRED_PROMPTS_CACHE.clear()
         _PROMPTS_CACHE = load_prompt_templates()
+        _PROMPTS_SIGNATURE = signature
         
     return _PROMPTS_CACHE
 
+def clear_prompt_cache() -> None:
+    """
+    Forget the loaded prompt templates so they are read again on next use.
+    """
+    global _PROMPTS_CACHE, _PROMPTS_SIGNATURE, _PROMPTS_CHECKED_AT
+    _PROMPTS_CACHE = None
+    _PROMPTS_SIGNATURE = None
+    _PROMPTS_CHECKED_AT = 0.0
+    _REQUIRED_PROMPTS_CACHE.clear()
+
 def get_required_prompts_for_config(cfg: Dict[str, Any]) -> Dict[str, str]:
     """
     Get only the prompt templates required for the given configuration.
     
     This function determines which prompt templates are necessary based on the
-    provided configuration and returns only those templates.
+    provided configuration and returns only those templates. The selection is
+    cached per combination of flags; the returned dictionary must not be modified.
     
     Args:
         cfg (Dict[str, Any]): Configuration dictionary
@@ -196,11 +290,30 @@ def get_required_prompts_for_config(cfg: Dict[str, Any]) -> Dict[str, str]:
     Returns:
         Dict[str, str]: Dictionary with required prompt templates
     """
+    key = (bool(cfg.get("use_markitdown", False)), bool(cfg.get("use_summary", False)))
+    # Drops the cached selections if the prompt files changed since they were made
     prompts = get_prompts()
-    required_keys: List[str] = ["vlm_base"]
+    required_prompts = _REQUIRED_PROMPTS_CACHE.get(key)
+    if required_prompts is None:
+        required_prompts = _select_required_prompts(prompts, *key)
+        # A failed selection (missing templates) is reported again on the next call
+        if required_prompts:
+            _REQUIRED_PROMPTS_CACHE[key] = required_prompts
+    return required_prompts
+
+def _select_required_prompts(prompts: Dict[str, str], has_markdown: bool, has_summary: bool) -> Dict[str, str]:
+    """
+    Select the prompt templates needed for the given features.
     
-    has_markdown = cfg.get("use_markitdown", False)
-    has_summary = cfg.get("use_summary", False)
+    Args:
+        prompts (Dict[str, str]): All loaded prompt templates
+        has_markdown (bool): Whether Markitdown context is used
+        has_summary (bool): Whether a document summary is used
+        
+    Returns:
+        Dict[str, str]: Dictionary with required prompt templates, empty if any is missing
+    """
+    required_keys: List[str] = ["vlm_base"]
     
     if has_markdown and has_summary:
         required_keys.append("vlm_full")
@@ -5,12 +5,20 @@ This module contains the main orchestration logic for converting PDFs to Markdow
 """
 
 import os
+import re
+import queue
 import time
-from typing import Dict, Any, Callable, Tuple, List, Optional
+import itertools
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Callable, Iterator, Tuple, List, Optional, FrozenSet, Union
 import contextlib
 import logging
 
 from . import config
+from . import cache
 from . import pdf_processor
 from . import markitdown_processor
 from . import summarizer
@@ -20,10 +28,220 @@ from . import ollama_client
 # Get logger from config module
 logger = logging.getLogger('describepdf')
 
+# Maximum number of page descriptions kept in the in-process cache
+PAGE_CACHE_MAX_ENTRIES = 512
+
+# LRU cache of VLM page descriptions keyed by page content and prompt context
+_PAGE_DESCRIPTION_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_PAGE_CACHE_LOCK = threading.Lock()
+
+# Pages rendered and queued ahead of the VLM workers, so a worker never
+# waits for the next page image to be rendered
+RENDER_AHEAD_PAGES = 1
+
+# Separator written after every page description in the output Markdown
+PAGE_SEPARATOR = "\n\n---\n\n"
+
+# Horizontal rule lines in a page preview, which could add up to a PAGE_SEPARATOR
+_PREVIEW_RULE_RE = re.compile(r"^---$", re.MULTILINE)
+
+# One page selection entry: a page number or an inclusive range such as "5-10"
+_PAGE_RANGE_RE = re.compile(r"^\s*(\d+)\s*(?:-\s*(\d+)\s*)?$")
+
 class ConversionError(Exception):
     """Error raised during PDF conversion process."""
     pass
 
+def _page_cache_key(
+    provider: str,
+    model: Optional[str],
+    prompt_template: str,
+    language: str,
+    markdown_context: Optional[str],
+    pdf_summary: Optional[str],
+    image_bytes: Union[bytes, memoryview]
+) -> str:
+    """
+    Build the cache key for a page description.
+    
+    The page number is deliberately left out so that identical pages
+    (blank pages, repeated templates...) share a single VLM call.
+    
+    Returns:
+        str: Hex digest identifying the VLM request
+    """
+    return cache.make_cache_key(
+        provider, model or "", prompt_template, language,
+        markdown_context or "", pdf_summary or "", image_bytes
+    )
+
+def _get_cached_description(key: str) -> Optional[str]:
+    """Return a cached page description, or None if it is not cached."""
+    with _PAGE_CACHE_LOCK:
+        description = _PAGE_DESCRIPTION_CACHE.get(key)
+        if description is not None:
+            _PAGE_DESCRIPTION_CACHE.move_to_end(key)
+        return description
+
+def _store_cached_description(key: str, description: str) -> None:
+    """Store a page description, evicting the least recently used one if full."""
+    with _PAGE_CACHE_LOCK:
+        _PAGE_DESCRIPTION_CACHE[key] = description
+        _PAGE_DESCRIPTION_CACHE.move_to_end(key)
+        while len(_PAGE_DESCRIPTION_CACHE) > PAGE_CACHE_MAX_ENTRIES:
+            _PAGE_DESCRIPTION_CACHE.popitem(last=False)
+
+def _get_remembered_text(key: str, cfg: Dict[str, Any]) -> Optional[str]:
+    """
+    Look up a previously generated text in the caches enabled for this run.
+
+    The in-memory cache is checked first (use_page_cache), then the on-disk
+    response cache (use_response_cache).
+
+    Args:
+        key: Cache key of the text
+        cfg: Configuration dictionary for this run
+
+    Returns:
+        Optional[str]: The cached text, or None if it is not cached
+    """
+    use_page_cache = cfg.get("use_page_cache", True)
+    text = _get_cached_description(key) if use_page_cache else None
+    if text is None and cfg.get("use_response_cache", False):
+        # Fall back to texts persisted by previous runs
+        response_cache = cache.get_response_cache()
+        text = response_cache.get(key) if response_cache else None
+        if text is not None and use_page_cache:
+            _store_cached_description(key, text)
+    return text
+
+def _remember_text(key: str, text: str, cfg: Dict[str, Any]) -> None:
+    """
+    Store a generated text in the caches enabled for this run.
+
+    Args:
+        key: Cache key of the text
+        text: Text to store
+        cfg: Configuration dictionary for this run
+    """
+    if cfg.get("use_page_cache", True):
+        _store_cached_description(key, text)
+    if cfg.get("use_response_cache", False):
+        response_cache = cache.get_response_cache()
+        if response_cache:
+            response_cache.set(key, text)
+
+def _get_cached_summary(
+    pdf_path: str,
+    provider: str,
+    model: Optional[str],
+    summary_prompt: str,
+    cfg: Dict[str, Any]
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Look up the summary of a PDF in the caches enabled for this run.
+
+    The summary only depends on the document, the model and the prompt, so a
+    cached one can be reused when the same PDF is converted again.
+
+    Args:
+        pdf_path: Path to the PDF file
+        provider: Provider name ("openrouter" or "ollama")
+        model: Summary LLM model
+        summary_prompt: Summary prompt template
+        cfg: Configuration dictionary for this run
+
+    Returns:
+        Tuple containing:
+        - Optional[str]: Cache key to store a new summary under, or None if not cached
+        - Optional[str]: The cached summary, or None on a miss
+    """
+    if not (cfg.get("use_page_cache", True) or cfg.get("use_response_cache", False)):
+        return None, None
+    doc_hash = cfg.get("doc_hash")
+    if not doc_hash:
+        try:
+            doc_hash = cache.file_digest(pdf_path)
+        except OSError as hash_err:
+            logger.warning(f"Could not hash '{os.path.basename(pdf_path)}' for the summary cache: {hash_err}")
+            return None, None
+    summary_cache_key = cache.make_cache_key("summary", provider, model or "", summary_prompt, doc_hash)
+    pdf_summary = _get_remembered_text(summary_cache_key, cfg)
+    if pdf_summary is not None:
+        logger.info("Reusing cached summary for this document.")
+    return summary_cache_key, pdf_summary
+
+def _generate_summary(
+    pdf_path: str,
+    provider: str,
+    model: Optional[str],
+    full_text: str,
+    summary_cache_key: Optional[str],
+    cfg: Dict[str, Any]
+) -> Optional[str]:
+    """
+    Request the summary of already extracted PDF text and cache it.
+
+    This runs on a worker thread, so it must not use PyMuPDF.
+
+    Args:
+        pdf_path: Path to the PDF file
+        provider: Provider name ("openrouter" or "ollama")
+        model: Summary LLM model
+        full_text: Text extracted from the PDF
+        summary_cache_key: Key to cache the summary under, or None to not cache it
+        cfg: Configuration dictionary for this run
+
+    Returns:
+        Optional[str]: The summary, or None if it could not be generated
+    """
+    pdf_summary = summarizer.generate_summary(
+        pdf_path,
+        provider=provider,
+        api_key=cfg.get("openrouter_api_key"),
+        ollama_endpoint=cfg.get("ollama_endpoint"),
+        model=model,
+        full_text=full_text
+    )
+    if pdf_summary and summary_cache_key is not None:
+        _remember_text(summary_cache_key, pdf_summary, cfg)
+    return pdf_summary
+
+def clear_page_cache() -> None:
+    """Remove all cached page descriptions."""
+    with _PAGE_CACHE_LOCK:
+        _PAGE_DESCRIPTION_CACHE.clear()
+
+@lru_cache(maxsize=64)
+def parse_page_numbers(selection_string: str) -> FrozenSet[int]:
+    """
+    Parse a page selection string into the set of 1-based page numbers it names.
+
+    Unlike parse_page_selection, pages are not checked against a document, so
+    this can be used to reject malformed input before any PDF is opened.
+    Results are cached, as the same selection is usually validated repeatedly.
+
+    Args:
+        selection_string: String with page selection (e.g. "1,3,5-10,15")
+
+    Returns:
+        FrozenSet[int]: Page numbers (1-based) named by the selection
+
+    Raises:
+        ValueError: If an entry is neither a page number nor a page range
+    """
+    page_numbers = set()
+    for section in selection_string.split(','):
+        if not section.strip():
+            continue
+        match = _PAGE_RANGE_RE.match(section)
+        if not match:
+            raise ValueError(f"invalid page or range '{section.strip()}'")
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        page_numbers.update(range(start, end + 1))
+    return frozenset(page_numbers)
+
 def parse_page_selection(selection_string: Optional[str], total_pages: int) -> List[int]:
     """
     Parse a page selection string into a list of page indices.
@@ -44,15 +262,18 @@ def parse_page_selection(selection_string: Optional[str], total_pages: int) -> L
     try:
         sections = selection_string.split(',')
         for section in sections:
-            section = section.strip()
-            if not section:
+            if not section.strip():
                 continue
-                
-            if '-' in section:
+
+            match = _PAGE_RANGE_RE.match(section)
+            if not match:
+                raise ValueError(f"invalid page or range '{section.strip()}'")
+            section = section.strip()
+
+            if match.group(2) is not None:
                 # Handle page range
-                start, end = section.split('-', 1)
-                start_idx = int(start.strip()) - 1  # Convert to 0-based index
-                end_idx = int(end.strip()) - 1
+                start_idx = int(match.group(1)) - 1  # Convert to 0-based index
+                end_idx = int(match.group(2)) - 1
                 
                 # Validate range
                 if start_idx < 0 or end_idx >= total_pages or start_idx > end_idx:
@@ -62,7 +283,7 @@ def parse_page_selection(selection_string: Optional[str], total_pages: int) -> L
                 page_indices.extend(range(start_idx, end_idx + 1))
             else:
                 # Handle single page
-                page_idx = int(section) - 1  # Convert to 0-based index
+                page_idx = int(match.group(1)) - 1  # Convert to 0-based index
                 
                 # Validate page number
                 if page_idx < 0 or page_idx >= total_pages:
@@ -96,32 +317,292 @@ def format_markdown_output(descriptions: List[str], original_filename: str, page
     Returns:
         str: Complete Markdown content
     """
-    md_content = f"# Description of PDF: {original_filename}\n\n"
-    
-    for i, desc in enumerate(descriptions):
-        # Use actual page number if provided, otherwise use sequential numbering
-        page_num = page_numbers[i] if page_numbers else (i + 1)
-        md_content += f"## Page {page_num}\n\n"
-        md_content += desc if desc else "*No description generated for this page.*"
-        md_content += "\n\n---\n\n"
-    
-    return md_content
+    # Use actual page numbers if provided, otherwise use sequential numbering
+    if not page_numbers:
+        page_numbers = range(1, len(descriptions) + 1)
+    parts = [_format_markdown_header(original_filename)]
+    parts.extend(_format_markdown_page(page_num, desc) for page_num, desc in zip(page_numbers, descriptions))
+    return "".join(parts)
+
+def _format_markdown_header(original_filename: str) -> str:
+    """Return the title that starts the Markdown output."""
+    return f"# Description of PDF: {original_filename}\n\n"
+
+def _format_markdown_page(page_num: int, description: Optional[str]) -> str:
+    """Return the Markdown section of one page, ending with PAGE_SEPARATOR."""
+    return f"## Page {page_num}\n\n{description or '*No description generated for this page.*'}{PAGE_SEPARATOR}"
+
+def _synchronized_progress_callback(
+    progress_callback: Callable[[float, str], None]
+) -> Callable[[float, str], None]:
+    """
+    Wrap a progress callback so it can be called from several threads.
 
-def convert_pdf_to_markdown(
+    Calls are serialized and the reported progress never goes backwards, even
+    when pages finish out of order.
+
+    Args:
+        progress_callback: Function accepting (float_progress, string_status)
+
+    Returns:
+        Callable[[float, str], None]: Thread-safe progress callback
+    """
+    lock = threading.Lock()
+    highest_progress = [0.0]
+
+    def synchronized_callback(progress_value: float, status: str) -> None:
+        with lock:
+            highest_progress[0] = max(highest_progress[0], progress_value)
+            progress_callback(highest_progress[0], status)
+
+    return synchronized_callback
+
+def _prepare_page(
+    page: Any,
+    page_index: int,
+    total_pages: int,
+    pdf_doc: Any,
+    provider: str,
+    cfg: Dict[str, Any],
+    required_prompts: Dict[str, str],
+    pdf_summary: Optional[str],
+    current_progress: float,
+    progress_callback: Callable[[float, str], None],
+    page_markdown: Optional[Dict[int, str]] = None
+) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """
+    Render a single page and gather everything needed to ask the VLM about it.
+
+    This step uses the open PDF document, which is not thread-safe, so it always
+    runs on the thread driving the conversion.
+
+    Args:
+        page: PyMuPDF Page object to describe
+        page_index: Zero-based index of the page in the document
+        total_pages: Total number of pages in the document
+        pdf_doc: The open PDF document (used for Markitdown extraction)
+        provider: Provider to use ("openrouter" or "ollama")
+        cfg: Configuration dictionary for this run
+        required_prompts: Prompt templates loaded for this run
+        pdf_summary: Document summary, or None if not available
+        current_progress: Progress value to report for this page
+        progress_callback: Function accepting (float_progress, string_status)
+        page_markdown: Markitdown content already extracted for the whole document,
+            by page index; pages missing from it are extracted on their own
+
+    Returns:
+        Tuple containing:
+        - Optional[str]: The page description if it is already known (cached page or
+          inline error note), otherwise None
+        - Optional[Dict[str, Any]]: The VLM request to send for this page
+          (see _request_page_description), or None if no VLM call is needed
+    """
+    page_num = page_index + 1
+
+    try:
+        # Render page to image
+        render_progress_message = f"Page {page_num}: Rendering image..."
+        progress_callback(current_progress, render_progress_message)
+        image_bytes, mime_type = pdf_processor.render_page_to_image_bytes(
+            page,
+            image_format=cfg.get("image_format") or "jpeg",
+            max_side=cfg.get("render_max_side"),
+            max_pixels=cfg.get("render_max_pixels"),
+            quality=int(cfg.get("image_quality") or 85),
+            as_view=True
+        )
+        if not image_bytes:
+            logger.warning(f"Could not render image for page {page_num}. Skipping VLM call.")
+            return f"*Error: Could not render image for page {page_num}.*", None
+
+        # Extract markdown context if needed
+        markdown_context = None
+        if cfg.get("use_markitdown"):
+            markitdown_progress_message = f"Page {page_num}: Extracting text (Markitdown)..."
+            progress_callback(current_progress, markitdown_progress_message)
+            
+            # Verify Markitdown availability
+            if not markitdown_processor.MARKITDOWN_AVAILABLE:
+                logger.warning(f"Markitdown not available for page {page_num}. Proceeding without it.")
+                progress_callback(current_progress, f"Page {page_num}: Markitdown not available, skipping extraction.")
+            elif page_markdown and page_index in page_markdown:
+                markdown_context = page_markdown[page_index]
+            else:
+                # The single page is handed to Markitdown in memory, without a temporary file
+                page_pdf_bytes = pdf_processor.save_page_as_bytes(pdf_doc, page_index)
+                
+                if page_pdf_bytes:
+                    try:
+                        markdown_context = markitdown_processor.get_markdown_for_page_bytes(page_pdf_bytes)
+                        if markdown_context is None:
+                            logger.warning(f"Markitdown failed for page {page_num}. Proceeding without it.")
+                            progress_callback(current_progress, f"Page {page_num}: Markitdown extraction failed.")
+                        else:
+                            logger.info(f"Markitdown context extracted for page {page_num}.")
+                    except Exception as markdown_err:
+                        logger.warning(f"Error extracting Markitdown for page {page_num}: {markdown_err}")
+                        progress_callback(current_progress, f"Page {page_num}: Markitdown extraction error.")
+                else:
+                    logger.warning(f"Could not copy page {page_num} to a PDF for Markitdown.")
+                    progress_callback(current_progress, f"Page {page_num}: Failed to prepare for Markitdown.")
+
+        # Select appropriate prompt
+        prompt_key = "vlm_base"
+        has_markdown = cfg.get("use_markitdown") and markdown_context is not None
+        has_summary = cfg.get("use_summary") and pdf_summary is not None
+
+        if has_markdown and has_summary:
+            prompt_key = "vlm_full"
+        elif has_markdown:
+            prompt_key = "vlm_markdown"
+        elif has_summary:
+            prompt_key = "vlm_summary"
+
+        vlm_prompt_template = required_prompts.get(prompt_key)
+        if not vlm_prompt_template:
+            error_msg = f"Missing required prompt template: {prompt_key}"
+            progress_callback(current_progress, error_msg)
+            logger.error(error_msg)
+            return f"*Error: Could not generate description for page {page_num} due to missing prompt template.*", None
+
+        # Prepare prompt
+        output_language = cfg.get("output_language", "English")
+        prompt_text = vlm_prompt_template.replace("[PAGE_NUM]", str(page_num))
+        prompt_text = prompt_text.replace("[TOTAL_PAGES]", str(total_pages))
+        prompt_text = prompt_text.replace("[LANGUAGE]", output_language)
+        if "[MARKDOWN_CONTEXT]" in prompt_text:
+            prompt_text = prompt_text.replace("[MARKDOWN_CONTEXT]", markdown_context if markdown_context else "N/A")
+        if "[SUMMARY_CONTEXT]" in prompt_text:
+            prompt_text = prompt_text.replace("[SUMMARY_CONTEXT]", pdf_summary if pdf_summary else "N/A")
+
+        # Reuse the description of an identical page if we already have one
+        vlm_model = cfg.get("vlm_model")
+        cache_key = None
+        use_page_cache = cfg.get("use_page_cache", True)
+        use_response_cache = cfg.get("use_response_cache", False)
+        if use_page_cache or use_response_cache:
+            cache_key = _page_cache_key(
+                provider, vlm_model, vlm_prompt_template, output_language,
+                markdown_context if has_markdown else None,
+                pdf_summary if has_summary else None,
+                image_bytes
+            )
+            cached_description = _get_remembered_text(cache_key, cfg)
+            if cached_description is not None:
+                progress_callback(current_progress, f"Page {page_num}: Reusing description of an identical page.")
+                logger.info(f"Page {page_num} matches a previously described page. Skipping VLM call.")
+                return cached_description, None
+
+        return None, {
+            "prompt_text": prompt_text,
+            "image_bytes": image_bytes,
+            "mime_type": mime_type,
+            "cache_key": cache_key
+        }
+
+    except Exception as page_err:
+        error_msg = f"Unexpected error processing page {page_num}: {page_err}. Skipping page."
+        progress_callback(current_progress, error_msg)
+        logger.exception(error_msg)
+        return f"*Error: An unexpected error occurred while processing page {page_num}.*", None
+
+def _request_page_description(
+    page_num: int,
+    provider: str,
+    cfg: Dict[str, Any],
+    vlm_request: Dict[str, Any],
+    current_progress: float,
+    progress_callback: Callable[[float, str], None],
+    on_partial: Optional[Callable[[str], None]] = None
+) -> str:
+    """
+    Get the description of a prepared page from the VLM.
+
+    This step does not touch the PDF document, so several pages can be requested
+    concurrently from worker threads.
+
+    Args:
+        page_num: One-based page number
+        provider: Provider to use ("openrouter" or "ollama")
+        cfg: Configuration dictionary for this run
+        vlm_request: Request prepared by _prepare_page (prompt_text, image_bytes,
+            mime_type and cache_key)
+        current_progress: Progress value to report for this page
+        progress_callback: Function accepting (float_progress, string_status)
+        on_partial: Optional function receiving the description received so far
+            while it is streamed (Ollama only)
+
+    Returns:
+        str: Markdown description for the page (or an inline error note)
+
+    Raises:
+        ConversionError: If a critical API error makes continuing pointless
+    """
+    page_description = None
+    vlm_model = cfg.get("vlm_model")
+    prompt_text = vlm_request["prompt_text"]
+    image_bytes = vlm_request["image_bytes"]
+    mime_type = vlm_request["mime_type"]
+    cache_key = vlm_request["cache_key"]
+
+    # Call VLM
+    vlm_progress_message = f"Page {page_num}: Calling VLM ({vlm_model})..."
+    progress_callback(current_progress, vlm_progress_message)
+    try:
+        if provider == "openrouter":
+            page_description = openrouter_client.get_vlm_description(
+                cfg.get("openrouter_api_key"), vlm_model, prompt_text, image_bytes, mime_type
+            )
+        elif provider == "ollama":
+            page_description = ollama_client.get_vlm_description(
+                cfg.get("ollama_endpoint"), vlm_model, prompt_text, image_bytes, mime_type,
+                on_partial=on_partial,
+                options={"num_batch": int(cfg["ollama_num_batch"])} if cfg.get("ollama_num_batch") else None
+            )
+        
+        if page_description:
+            logger.info(f"VLM description received for page {page_num}.")
+            if cache_key is not None:
+                _remember_text(cache_key, page_description, cfg)
+        else:
+            page_description = f"*Warning: VLM did not return a description for page {page_num}.*"
+            progress_callback(current_progress, f"Page {page_num}: VLM returned no description.")
+            logger.warning(f"VLM returned no description for page {page_num}.")
+
+    except (ValueError, ConnectionError, TimeoutError, ImportError) as api_err:
+        error_msg = f"API Error on page {page_num}: {api_err}. Aborting."
+        progress_callback(current_progress, error_msg)
+        logger.error(error_msg)
+        raise ConversionError(error_msg)
+
+    except Exception as vlm_err:
+        error_msg = f"Unexpected error during VLM call for page {page_num}: {vlm_err}. Skipping page."
+        progress_callback(current_progress, error_msg)
+        logger.exception(error_msg)
+        page_description = f"*Error: Failed to get VLM description for page {page_num} due to an unexpected error.*"
+
+    return page_description if page_description else "*No description available.*"
+
+def stream_convert_pdf_to_markdown(
     pdf_path: str,
     cfg: Dict[str, Any],
     progress_callback: Callable[[float, str], None]
-) -> Tuple[str, Optional[str]]:
+) -> Iterator[Tuple[str, Optional[str]]]:
     """
-    Orchestrate the complete PDF to descriptive Markdown conversion process.
+    Orchestrate the PDF to descriptive Markdown conversion, yielding partial results.
+
+    A ``(status_message, markdown_so_far)`` tuple is yielded after every processed
+    page so callers can display descriptions as soon as they are ready. The last
+    tuple yielded is always the final result: ``(final_status, final_markdown)`` on
+    success or ``(error_message, None)`` on failure.
 
     Args:
         pdf_path: Path to the PDF file
         cfg: Configuration dictionary for this run
         progress_callback: Function accepting (float_progress, string_status)
 
-    Returns:
-        tuple: (status_message, result_markdown or None)
+    Yields:
+        tuple: (status_message, cumulative_markdown or None)
     """
     start_time = time.time()
     progress_callback(0.0, "Starting conversion process...")
@@ -137,32 +618,37 @@ def convert_pdf_to_markdown(
             msg = "Error: OpenRouter API Key is missing."
             logger.error(msg)
             progress_callback(0.0, msg)
-            return msg, None
+            yield msg, None
+            return
     elif provider == "ollama":
         ollama_endpoint = cfg.get("ollama_endpoint", "http://localhost:11434")
         if not ollama_client.OLLAMA_AVAILABLE:
             msg = "Error: Ollama Python client not installed. Install with 'pip install ollama'."
             logger.error(msg)
             progress_callback(0.0, msg)
-            return msg, None
+            yield msg, None
+            return
         
         if not ollama_client.check_ollama_availability(ollama_endpoint):
             msg = f"Error: Could not connect to Ollama at {ollama_endpoint}. Make sure it is running."
             logger.error(msg)
             progress_callback(0.0, msg)
-            return msg, None
+            yield msg, None
+            return
     else:
         msg = f"Error: Unknown provider '{provider}'. Use 'openrouter' or 'ollama'."
         logger.error(msg)
         progress_callback(0.0, msg)
-        return msg, None
+        yield msg, None
+        return
 
     # Validate input file
     if not pdf_path or not os.path.exists(pdf_path) or not os.path.isfile(pdf_path):
         msg = "Error: Invalid or missing PDF file."
         logger.error(msg)
         progress_callback(0.0, msg)
-        return msg, None
+        yield msg, None
+        return
 
     original_filename = os.path.basename(pdf_path)
     logger.info(f"Processing file: {original_filename}")
@@ -176,23 +662,46 @@ def convert_pdf_to_markdown(
             msg = "Error: Could not load all required prompt templates. Check the 'prompts' directory."
             progress_callback(0.0, msg)
             logger.error(msg)
-            return msg, None
-
-        # Generate summary if needed
+            yield msg, None
+            return
+
+        # Generate the summary in a background thread, so the LLM request overlaps
+        # loading the document and the Markitdown pre-pass. PyMuPDF must not be
+        # used from two threads at once, so the text is extracted here and the
+        # worker only sends the request. The summary is waited for before any
+        # page is described.
         pdf_summary = None
-        summary_progress = 0.05
-        if cfg.get("use_summary"):
+        summary_future: Optional[Future] = None
+        summary_pending = bool(cfg.get("use_summary"))
+        if summary_pending:
+            summary_progress = 0.05
             summary_model = cfg.get("summary_llm_model")
             progress_callback(summary_progress, f"Generating summary using {summary_model}...")
+            summary_cache_key, pdf_summary = _get_cached_summary(
+                pdf_path, provider, summary_model, required_prompts.get("summary", ""), cfg
+            )
+            if pdf_summary is None:
+                full_text = pdf_processor.extract_all_text(pdf_path)
+                if full_text is None:
+                    logger.error("Failed to extract text for summary.")
+                else:
+                    summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="describepdf-summary")
+                    summary_future = summary_executor.submit(
+                        _generate_summary, pdf_path, provider, summary_model, full_text, summary_cache_key, cfg
+                    )
+                    summary_executor.shutdown(wait=False)
+        else:
+            summary_progress = 0.0
+
+        def wait_for_summary() -> None:
+            """Wait for the background summary and disable it if it failed."""
+            nonlocal pdf_summary, summary_pending
+            if not summary_pending:
+                return
+            summary_pending = False
             try:
-                pdf_summary = summarizer.generate_summary(
-                    pdf_path, 
-                    provider=provider, 
-                    api_key=cfg.get("openrouter_api_key"), 
-                    ollama_endpoint=cfg.get("ollama_endpoint"), 
-                    model=summary_model
-                )
-                
+                if summary_future is not None:
+                    pdf_summary = summary_future.result()
                 if pdf_summary:
                     progress_callback(summary_progress, "Summary generated.")
                     logger.info("PDF summary generated.")
@@ -202,13 +711,11 @@ def convert_pdf_to_markdown(
                     # Set use_summary to False since we don't have a summary
                     cfg["use_summary"] = False
             except Exception as e:
-                 error_msg = f"Warning: Summary generation failed: {e}"
-                 progress_callback(summary_progress, error_msg)
-                 logger.warning(error_msg)
-                 # Set use_summary to False since summary generation failed
-                 cfg["use_summary"] = False
-        else:
-            summary_progress = 0.0
+                error_msg = f"Warning: Summary generation failed: {e}"
+                progress_callback(summary_progress, error_msg)
+                logger.warning(error_msg)
+                # Set use_summary to False since summary generation failed
+                cfg["use_summary"] = False
 
         # Load PDF and process pages
         pdf_load_progress = summary_progress + 0.05
@@ -221,22 +728,31 @@ def convert_pdf_to_markdown(
             # Register PDF document for cleanup only if it was successfully opened
             if pdf_doc is not None:
                 stack.callback(pdf_doc.close)
+                stack.callback(pdf_processor.close_scratch_doc)
             else:
+                wait_for_summary()
                 msg = f"Error: Could not process PDF file: {original_filename}"
                 progress_callback(pdf_load_progress, msg)
                 logger.error(msg)
-                return msg, None
+                yield msg, None
+                return
 
-            if not pages or total_pages == 0:
+            if pages is None or total_pages == 0:
+                wait_for_summary()
                 msg = f"Error: PDF file is empty: {original_filename}"
                 progress_callback(pdf_load_progress, msg)
                 logger.error(msg)
-                return msg, None
+                yield msg, None
+                return
                 
             progress_callback(pdf_load_progress, f"PDF has {total_pages} pages. Starting page processing...")
 
             # Process each page
-            all_descriptions = []
+            all_descriptions: List[str] = []
+            processed_page_numbers: List[int] = []
+            # Markdown of the finished pages, extended page by page instead of
+            # formatting every finished page again for each update
+            markdown_so_far = [_format_markdown_header(original_filename)]
             page_processing_progress_start = pdf_load_progress
             total_page_progress_ratio = (0.98 - page_processing_progress_start) if total_pages > 0 else 0
 
@@ -249,142 +765,137 @@ def convert_pdf_to_markdown(
             else:
                 logger.info(f"Processing all {total_pages} pages.")
 
-            for i in selected_indices:
-                page = pages[i]
-                page_num = i + 1
-                current_page_ratio = (page_num / total_pages) if total_pages > 0 else 1.0
-                
-                # Calculate progress for this specific page
-                current_progress = page_processing_progress_start + (current_page_ratio * total_page_progress_ratio)
-
-                # Update progress for the start of page processing 
-                progress_callback(current_progress, f"Processing page {page_num}/{total_pages}...")
-                logger.info(f"Processing page {page_num}/{total_pages}")
-
-                page_description = None
-                temp_page_pdf_path = None
-
-                try:
-                    # Render page to image
-                    render_progress_message = f"Page {page_num}: Rendering image..."
-                    progress_callback(current_progress, render_progress_message)
-                    image_bytes, mime_type = pdf_processor.render_page_to_image_bytes(page, image_format="jpeg")
-                    if not image_bytes:
-                        logger.warning(f"Could not render image for page {page_num}. Skipping VLM call.")
-                        all_descriptions.append(f"*Error: Could not render image for page {page_num}.*")
-                        continue
-
-                    # Extract markdown context if needed
-                    markdown_context = None
-                    if cfg.get("use_markitdown"):
-                        markitdown_progress_message = f"Page {page_num}: Extracting text (Markitdown)..."
-                        progress_callback(current_progress, markitdown_progress_message)
-                        
-                        # Verify Markitdown availability
-                        if not markitdown_processor.MARKITDOWN_AVAILABLE:
-                            logger.warning(f"Markitdown not available for page {page_num}. Proceeding without it.")
-                            progress_callback(current_progress, f"Page {page_num}: Markitdown not available, skipping extraction.")
-                        else:
-                            temp_page_pdf_path = pdf_processor.save_page_as_temp_pdf(pdf_doc, i)
-                            
-                            if temp_page_pdf_path:
-                                # Register temp file for cleanup
-                                stack.callback(lambda p=temp_page_pdf_path: os.remove(p) if os.path.exists(p) else None)
-                                
-                                try:
-                                    markdown_context = markitdown_processor.get_markdown_for_page_via_temp_pdf(temp_page_pdf_path)
-                                    if markdown_context is None:
-                                        logger.warning(f"Markitdown failed for page {page_num}. Proceeding without it.")
-                                        progress_callback(current_progress, f"Page {page_num}: Markitdown extraction failed.")
-                                    else:
-                                        logger.info(f"Markitdown context extracted for page {page_num}.")
-                                except Exception as markdown_err:
-                                    logger.warning(f"Error extracting Markitdown for page {page_num}: {markdown_err}")
-                                    progress_callback(current_progress, f"Page {page_num}: Markitdown extraction error.")
-                            else:
-                                logger.warning(f"Could not create temporary PDF for Markitdown on page {page_num}.")
-                                progress_callback(current_progress, f"Page {page_num}: Failed to prepare for Markitdown.")
-
-                    # Select appropriate prompt
-                    prompt_key = "vlm_base"
-                    has_markdown = cfg.get("use_markitdown") and markdown_context is not None
-                    has_summary = cfg.get("use_summary") and pdf_summary is not None
-
-                    if has_markdown and has_summary:
-                        prompt_key = "vlm_full"
-                    elif has_markdown:
-                        prompt_key = "vlm_markdown"
-                    elif has_summary:
-                        prompt_key = "vlm_summary"
-
-                    vlm_prompt_template = required_prompts.get(prompt_key)
-                    if not vlm_prompt_template:
-                        error_msg = f"Missing required prompt template: {prompt_key}"
-                        progress_callback(current_progress, error_msg)
-                        logger.error(error_msg)
-                        all_descriptions.append(f"*Error: Could not generate description for page {page_num} due to missing prompt template.*")
-                        continue
-
-                    # Prepare prompt
-                    prompt_text = vlm_prompt_template.replace("[PAGE_NUM]", str(page_num))
-                    prompt_text = prompt_text.replace("[TOTAL_PAGES]", str(total_pages))
-                    prompt_text = prompt_text.replace("[LANGUAGE]", cfg.get("output_language", "English"))
-                    if "[MARKDOWN_CONTEXT]" in prompt_text:
-                        prompt_text = prompt_text.replace("[MARKDOWN_CONTEXT]", markdown_context if markdown_context else "N/A")
-                    if "[SUMMARY_CONTEXT]" in prompt_text:
-                        prompt_text = prompt_text.replace("[SUMMARY_CONTEXT]", pdf_summary if pdf_summary else "N/A")
-
-                    # Call VLM
-                    vlm_model = cfg.get("vlm_model")
-                    vlm_progress_message = f"Page {page_num}: Calling VLM ({vlm_model})..."
-                    progress_callback(current_progress, vlm_progress_message)
+            # Extract the Markitdown context of all pages in one pass when most of the
+            # document is selected, rather than converting a temporary PDF per page
+            page_markdown: Dict[int, str] = {}
+            if (cfg.get("use_markitdown") and markitdown_processor.MARKITDOWN_AVAILABLE
+                    and len(selected_indices) > 1 and 2 * len(selected_indices) >= total_pages):
+                progress_callback(pdf_load_progress, "Extracting text (Markitdown)...")
+                page_markdown = markitdown_processor.get_markdown_for_all_pages(pdf_path, selected_indices, total_pages)
+
+            # Page prompts include the summary, so it must be ready from here on
+            wait_for_summary()
+
+            # Pages are prepared one by one on this thread, while up to
+            # max_parallel_pages VLM requests run concurrently in worker threads,
+            # so rendering the next page overlaps with describing the current ones
+            max_parallel_pages = max(1, int(cfg.get("max_parallel_pages") or 1))
+            stream_page_text = bool(cfg.get("stream_page_text")) and provider == "ollama"
+            use_workers = max_parallel_pages > 1 or stream_page_text or len(selected_indices) > 1
+            page_progress_callback = progress_callback
+            if use_workers:
+                page_progress_callback = _synchronized_progress_callback(progress_callback)
+                logger.info(f"Describing up to {max_parallel_pages} pages in parallel.")
+
+            # Descriptions (or pending VLM requests) of the pages in document order
+            page_results: List[Tuple[int, Union[str, "Future[str]"]]] = []
+
+            # Notifications from the workers: (page_num, partial_text), where a
+            # partial_text of None means the request for that page finished
+            page_events: "queue.Queue[Tuple[int, Optional[str]]]" = queue.Queue()
+            partial_texts: Dict[int, str] = {}
+
+            def wait_for_page_event() -> None:
+                """Block until a worker reports something, then collect all pending reports."""
+                event = page_events.get()
+                while True:
+                    event_page_num, partial_text = event
+                    if partial_text is not None:
+                        partial_texts[event_page_num] = partial_text
                     try:
-                        if provider == "openrouter":
-                            page_description = openrouter_client.get_vlm_description(
-                                cfg.get("openrouter_api_key"), vlm_model, prompt_text, image_bytes, mime_type
-                            )
-                        elif provider == "ollama":
-                            page_description = ollama_client.get_vlm_description(
-                                cfg.get("ollama_endpoint"), vlm_model, prompt_text, image_bytes, mime_type
-                            )
-                        
-                        if page_description:
-                            logger.info(f"VLM description received for page {page_num}.")
-                        else:
-                            page_description = f"*Warning: VLM did not return a description for page {page_num}.*"
-                            progress_callback(current_progress, f"Page {page_num}: VLM returned no description.")
-                            logger.warning(f"VLM returned no description for page {page_num}.")
-
-                    except (ValueError, ConnectionError, TimeoutError, ImportError) as api_err:
-                        error_msg = f"API Error on page {page_num}: {api_err}. Aborting."
-                        progress_callback(current_progress, error_msg)
-                        logger.error(error_msg)
-                        raise ConversionError(error_msg)
-
-                    except Exception as vlm_err:
-                        error_msg = f"Unexpected error during VLM call for page {page_num}: {vlm_err}. Skipping page."
-                        progress_callback(current_progress, error_msg)
-                        logger.exception(error_msg)
-                        page_description = f"*Error: Failed to get VLM description for page {page_num} due to an unexpected error.*"
-
-                    all_descriptions.append(page_description if page_description else "*No description available.*")
-
-                except ConversionError:
-                    # Let critical errors propagate up
-                    raise
-                except Exception as page_err:
-                    error_msg = f"Unexpected error processing page {page_num}: {page_err}. Skipping page."
-                    progress_callback(current_progress, error_msg)
-                    logger.exception(error_msg)
-                    all_descriptions.append(f"*Error: An unexpected error occurred while processing page {page_num}.*")
+                        event = page_events.get_nowait()
+                    except queue.Empty:
+                        return
+
+            def ready_updates() -> Iterator[Tuple[str, str]]:
+                """Hand over every finished page in document order, then a preview of the next one."""
+                while len(all_descriptions) < len(page_results):
+                    page_num, result = page_results[len(all_descriptions)]
+                    if isinstance(result, Future):
+                        if not result.done():
+                            partial_text = partial_texts.pop(page_num, None)
+                            if partial_text:
+                                # Separators inside the preview would look like finished pages, so
+                                # every "---" line is shown as an equivalent "- - -" rule instead
+                                yield (
+                                    f"Page {page_num}/{total_pages}: receiving description...",
+                                    markdown_so_far[0] + f"## Page {page_num}\n\n" + _PREVIEW_RULE_RE.sub("- - -", partial_text)
+                                )
+                            return
+                        result = result.result()
+                    partial_texts.pop(page_num, None)
+                    all_descriptions.append(result)
+                    processed_page_numbers.append(page_num)
+                    markdown_so_far[0] += _format_markdown_page(page_num, result)
+                    yield f"Page {page_num}/{total_pages} described.", markdown_so_far[0]
+
+            def pages_in_flight() -> int:
+                return sum(1 for _, result in page_results[len(all_descriptions):]
+                           if isinstance(result, Future) and not result.done())
+
+            # Walk the lazily loaded pages up to the last selected one, so only the
+            # page being prepared is held in memory
+            selected_set = frozenset(selected_indices)
+            selected_pages = (
+                (i, page) for i, page in enumerate(itertools.islice(pages, selected_indices[-1] + 1))
+                if i in selected_set
+            )
+
+            executor = ThreadPoolExecutor(max_workers=max_parallel_pages, thread_name_prefix="describepdf-page") if use_workers else None
+            try:
+                for i, page in selected_pages:
+                    page_num = i + 1
+                    current_page_ratio = (page_num / total_pages) if total_pages > 0 else 1.0
+                    
+                    # Calculate progress for this specific page
+                    current_progress = page_processing_progress_start + (current_page_ratio * total_page_progress_ratio)
+
+                    # Update progress for the start of page processing 
+                    page_progress_callback(current_progress, f"Processing page {page_num}/{total_pages}...")
+                    logger.info(f"Processing page {page_num}/{total_pages}")
+
+                    page_description, vlm_request = _prepare_page(
+                        page, i, total_pages, pdf_doc, provider, cfg,
+                        required_prompts, pdf_summary, current_progress, page_progress_callback, page_markdown
+                    )
+                    if vlm_request is None:
+                        page_results.append((page_num, page_description))
+                    elif executor is None:
+                        page_results.append((page_num, _request_page_description(
+                            page_num, provider, cfg, vlm_request, current_progress, page_progress_callback
+                        )))
+                    else:
+                        on_partial = None
+                        if stream_page_text:
+                            on_partial = lambda text, n=page_num: page_events.put((n, text))
+                        future = executor.submit(
+                            _request_page_description,
+                            page_num, provider, cfg, vlm_request, current_progress, page_progress_callback, on_partial
+                        )
+                        future.add_done_callback(lambda _, n=page_num: page_events.put((n, None)))
+                        page_results.append((page_num, future))
+
+                    # Don't render further ahead than the workers can keep up with
+                    yield from ready_updates()
+                    while pages_in_flight() >= max_parallel_pages + RENDER_AHEAD_PAGES:
+                        wait_for_page_event()
+                        yield from ready_updates()
+
+                # Wait for the pages still being described
+                while len(all_descriptions) < len(page_results):
+                    wait_for_page_event()
+                    yield from ready_updates()
+            finally:
+                # Drop queued requests if the conversion failed or was abandoned
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
 
         # Generate final markdown
         final_progress = 0.99
         progress_callback(final_progress, "Combining page descriptions into final Markdown...")
 
-        actual_page_numbers = [i + 1 for i in selected_indices] if 'selected_indices' in locals() else None
-
-        final_markdown = format_markdown_output(all_descriptions, original_filename, actual_page_numbers)
+        # Every page was already appended to the Markdown as it finished
+        final_markdown = markdown_so_far[0]
         logger.info("Final Markdown content assembled.")
 
         # Report completion
@@ -394,13 +905,37 @@ def convert_pdf_to_markdown(
         progress_callback(1.0, final_status)
         logger.info(final_status)
 
-        return final_status, final_markdown
+        yield final_status, final_markdown
 
     except ConversionError as critical_err:
-        return str(critical_err), None
+        yield str(critical_err), None
 
     except Exception as e:
         error_msg = f"Critical Error during conversion: {e}"
         progress_callback(0.0, error_msg)
         logger.exception(error_msg)
-        return error_msg, None
\ No newline at end of file
+        yield error_msg, None
+
+def convert_pdf_to_markdown(
+    pdf_path: str,
+    cfg: Dict[str, Any],
+    progress_callback: Callable[[float, str], None]
+) -> Tuple[str, Optional[str]]:
+    """
+    Orchestrate the complete PDF to descriptive Markdown conversion process.
+
+    This is the blocking counterpart of stream_convert_pdf_to_markdown: it runs
+    the whole conversion and only returns the final result.
+
+    Args:
+        pdf_path: Path to the PDF file
+        cfg: Configuration dictionary for this run
+        progress_callback: Function accepting (float_progress, string_status)
+
+    Returns:
+        tuple: (status_message, result_markdown or None)
+    """
+    status_message, result_markdown = "", None
+    for status_message, result_markdown in stream_convert_pdf_to_markdown(pdf_path, cfg, progress_callback):
+        pass
+    return status_message, result_markdown
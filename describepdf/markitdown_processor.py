@@ -5,24 +5,38 @@ This module handles the enhanced text extraction functionality using the
 MarkItDown library to convert PDF content to markdown format.
 """
 
+import io
 import os
 import logging
-from typing import Optional
+import threading
+import importlib.util
+from typing import Optional, Any, Dict, Iterable
 
 logger = logging.getLogger('describepdf')
 
-# Check if MarkItDown is available
+# Check if MarkItDown is available without importing it: the import is slow
+# (it pulls in every converter) and only needed once a page is converted
 try:
-    from markitdown import MarkItDown
-    MARKITDOWN_AVAILABLE = True
-    logger.info("MarkItDown library is available and successfully imported.")
-except ImportError:
-    logger.warning("MarkItDown library not installed. Install with 'pip install markitdown[pdf]'")
-    MARKITDOWN_AVAILABLE = False
+    MARKITDOWN_AVAILABLE = importlib.util.find_spec("markitdown") is not None
 except Exception as e:
-    logger.error(f"Failed to initialize MarkItDown: {e}")
+    logger.error(f"Failed to look up MarkItDown: {e}")
     MARKITDOWN_AVAILABLE = False
 
+if MARKITDOWN_AVAILABLE:
+    logger.info("MarkItDown library is available.")
+else:
+    logger.warning("MarkItDown library not installed. Install with 'pip install markitdown[pdf]'")
+
+# MarkItDown class, imported on first use by _get_markdown_converter
+MarkItDown: Any = None
+
+# Converter shared by every conversion, created on first use
+_CONVERTER: Any = None
+_CONVERTER_LOCK = threading.Lock()
+
+# Character the PDF text extractor writes between pages
+PAGE_BREAK = "\f"
+
 def _get_markdown_converter() -> Optional['MarkItDown']:
     """
     Initialize and return a MarkItDown converter instance.
@@ -30,13 +44,18 @@ def _get_markdown_converter() -> Optional['MarkItDown']:
     Returns:
         MarkItDown: An initialized MarkItDown converter or None if not available
     """
+    global MarkItDown, _CONVERTER
     if not MARKITDOWN_AVAILABLE:
         logger.error("Cannot initialize MarkItDown converter - library not available.")
         return None
         
     try:
-        converter = MarkItDown()
-        return converter
+        with _CONVERTER_LOCK:
+            if _CONVERTER is None:
+                if MarkItDown is None:
+                    from markitdown import MarkItDown
+                _CONVERTER = MarkItDown()
+            return _CONVERTER
     except Exception as e:
         logger.error(f"Failed to initialize MarkItDown converter: {e}")
         return None
@@ -71,6 +90,76 @@ def get_markdown_for_page_via_temp_pdf(temp_pdf_path: str) -> Optional[str]:
         logger.error(f"MarkItDown failed to process {temp_pdf_path}: {e}")
         return None
 
+def get_markdown_for_page_bytes(pdf_bytes: bytes) -> Optional[str]:
+    """
+    Use MarkItDown to extract Markdown from an in-memory PDF (single page).
+
+    Args:
+        pdf_bytes: Contents of the single-page PDF
+
+    Returns:
+        str: Extracted Markdown content, or None if there was an error
+    """
+    if not MARKITDOWN_AVAILABLE:
+        logger.error("MarkItDown converter is not available.")
+        return None
+
+    try:
+        md_converter = _get_markdown_converter()
+        if not md_converter:
+            return None
+
+        result = md_converter.convert_stream(io.BytesIO(pdf_bytes), file_extension=".pdf")
+        logger.debug(f"Extracted Markdown from in-memory PDF ({len(pdf_bytes)} bytes)")
+        return result.text_content if result else ""
+    except Exception as e:
+        logger.error(f"MarkItDown failed to process in-memory PDF: {e}")
+        return None
+
+def get_markdown_for_all_pages(pdf_path: str, page_indices: Iterable[int], page_count: int) -> Dict[int, str]:
+    """
+    Use MarkItDown to extract the Markdown of several pages in a single pass.
+
+    The whole document is converted once and split on the page breaks written
+    by the PDF text extractor, instead of converting one temporary PDF per page.
+
+    Args:
+        pdf_path: Path to the PDF file
+        page_indices: Zero-based indices of the pages to return
+        page_count: Total number of pages in the document
+
+    Returns:
+        Dict[int, str]: Markdown content by page index; empty if the document could
+        not be converted or split into pages (callers then fall back to single pages)
+    """
+    if not MARKITDOWN_AVAILABLE:
+        logger.error("MarkItDown converter is not available.")
+        return {}
+
+    try:
+        md_converter = _get_markdown_converter()
+        if not md_converter:
+            return {}
+
+        result = md_converter.convert(pdf_path)
+        pages_text = (result.text_content if result else "").split(PAGE_BREAK)
+    except Exception as e:
+        logger.error(f"MarkItDown failed to process {pdf_path}: {e}")
+        return {}
+
+    # Some extractor versions also end the last page with a page break
+    if len(pages_text) == page_count + 1 and not pages_text[-1].strip():
+        pages_text.pop()
+    if len(pages_text) != page_count:
+        logger.warning(
+            f"MarkItDown returned {len(pages_text)} pages for a {page_count}-page document; "
+            "extracting pages one by one instead."
+        )
+        return {}
+
+    logger.debug(f"Extracted Markdown for all pages of {pdf_path} in a single pass.")
+    return {index: pages_text[index] for index in page_indices if 0 <= index < page_count}
+
 def is_available() -> bool:
     """
     Check if MarkItDown functionality is available.
@@ -5,10 +5,16 @@ This module handles all interactions with local Ollama API for
 VLM (Vision Language Model) image description and LLM text summarization.
 """
 
+import atexit
+import os
 import logging
 import base64
+import threading
+import time
 import requests
-from typing import Any, Dict, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 # Try to import Ollama, but handle gracefully if it's not available
 try:
@@ -22,6 +28,115 @@ except ImportError:
 # Get logger
 logger = logging.getLogger('describepdf')
 
+# Seconds an Ollama request may take before giving up, so a stalled server
+# cannot hang a conversion forever
+DEFAULT_TIMEOUT = 300  # 5 minutes
+
+# Ollama clients keyed by normalized endpoint URL, shared across calls so that
+# HTTP connections are kept alive between pages and conversions
+_CLIENTS: Dict[str, 'Client'] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+# Seconds the availability check waits to connect and to get an answer; a host
+# that is down should be reported quickly instead of holding up the conversion
+AVAILABILITY_TIMEOUT = (2, 5)
+
+# HTTP session for the availability check, the only REST call made outside the
+# Ollama client, kept alive so repeated checks reuse pooled connections. It does
+# not retry: a failed probe is reported at once and model requests, which go
+# through the Ollama client, are unaffected
+_SESSION = requests.Session()
+_SESSION_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=0, connect=0, read=0, raise_on_status=False)
+)
+_SESSION.mount("http://", _SESSION_ADAPTER)
+_SESSION.mount("https://", _SESSION_ADAPTER)
+
+# Maximum number of requests in flight to one Ollama endpoint, shared by every
+# conversion in this process; further requests wait until a slot is free
+MAX_CONCURRENT_REQUESTS = int(os.getenv("DESCRIBEPDF_OLLAMA_MAX_REQUESTS", "4"))
+_REQUEST_SLOTS: Dict[str, threading.BoundedSemaphore] = {}
+
+# Seconds a successful availability check is trusted before asking the server again
+AVAILABILITY_CACHE_TTL = 30.0
+
+# Monotonic time of the last successful availability check, keyed by endpoint
+_AVAILABLE_SINCE: Dict[str, float] = {}
+
+# How long Ollama keeps a warmed-up model loaded, as seconds or a duration such as "30m"
+_WARMUP_KEEP_ALIVE_SETTING = os.getenv("DESCRIBEPDF_OLLAMA_KEEP_ALIVE", "30m")
+WARMUP_KEEP_ALIVE: Union[int, str] = (
+    int(_WARMUP_KEEP_ALIVE_SETTING) if _WARMUP_KEEP_ALIVE_SETTING.isdigit() else _WARMUP_KEEP_ALIVE_SETTING
+)
+
+# Seconds after a warm-up during which the same model is not warmed up again
+WARMUP_CACHE_TTL = 300.0
+
+# Monotonic time of the last warm-up, keyed by endpoint and model
+_WARMED_UP_SINCE: Dict[Tuple[str, str], float] = {}
+
+def _get_client(endpoint: str) -> 'Client':
+    """
+    Get the shared Ollama client for an endpoint, creating it on first use.
+    
+    Args:
+        endpoint: URL of the Ollama endpoint
+        
+    Returns:
+        Client: Ollama client bound to the endpoint
+    """
+    host = endpoint.rstrip('/')
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(host)
+        if client is None:
+            client = Client(host=host, timeout=DEFAULT_TIMEOUT)
+            _CLIENTS[host] = client
+            logger.debug(f"Created Ollama client for {host}")
+        return client
+
+def _get_request_slots(endpoint: str) -> threading.BoundedSemaphore:
+    """
+    Get the semaphore limiting concurrent requests to an endpoint.
+    
+    Args:
+        endpoint: URL of the Ollama endpoint
+        
+    Returns:
+        threading.BoundedSemaphore: Semaphore to hold while a request is running
+    """
+    host = endpoint.rstrip('/')
+    with _CLIENTS_LOCK:
+        slots = _REQUEST_SLOTS.get(host)
+        if slots is None:
+            slots = threading.BoundedSemaphore(max(1, MAX_CONCURRENT_REQUESTS))
+            _REQUEST_SLOTS[host] = slots
+        return slots
+
+def close_clients() -> None:
+    """
+    Close and forget all shared Ollama clients and pooled HTTP connections.
+    
+    This is registered to run at interpreter exit, and can also be called
+    explicitly to drop pooled connections (e.g. after an endpoint restarts).
+    """
+    with _CLIENTS_LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    for client in clients:
+        # Older Ollama clients do not expose close()
+        close = getattr(client, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.debug(f"Error closing Ollama client: {e}")
+    # The session reopens its connection pools on the next request
+    _SESSION.close()
+
+atexit.register(close_clients)
+
 def check_ollama_availability(endpoint: str) -> bool:
     """
     Check if Ollama is available at the specified endpoint.
@@ -40,10 +155,16 @@ def check_ollama_availability(endpoint: str) -> bool:
         # Normalize endpoint URL by removing trailing slashes
         endpoint = endpoint.rstrip('/')
         
-        # Use requests to check API availability (faster than creating a Client)
-        response = requests.get(f"{endpoint}/api/version", timeout=5)
+        # Skip the round-trip if the server answered recently; failures are never cached
+        checked_at = _AVAILABLE_SINCE.get(endpoint)
+        if checked_at is not None and time.monotonic() - checked_at < AVAILABILITY_CACHE_TTL:
+            return True
+        
+        # Use the shared session to check API availability (faster than creating a Client)
+        response = _SESSION.get(f"{endpoint}/api/version", timeout=AVAILABILITY_TIMEOUT)
         response.raise_for_status()
         
+        _AVAILABLE_SINCE[endpoint] = time.monotonic()
         logger.info(f"Ollama is available at {endpoint}. Response status: {response.status_code}")
         return True
     except requests.exceptions.RequestException as e:
@@ -53,7 +174,53 @@ def check_ollama_availability(endpoint: str) -> bool:
         logger.error(f"Unexpected error checking Ollama availability: {e}")
         return False
 
-def get_vlm_description(endpoint: str, model: str, prompt_text: str, image_bytes: bytes, mime_type: str) -> str:
+def warm_up_model(endpoint: str, model: str) -> bool:
+    """
+    Ask Ollama to load a model into memory before the first real request.
+    
+    An empty generate request only loads the model, so the first page of the
+    next conversion does not pay the model loading time. A model is warmed up
+    at most once every WARMUP_CACHE_TTL seconds per endpoint, however often
+    this is called.
+    
+    Args:
+        endpoint: URL of the Ollama endpoint
+        model: Ollama model name to load
+        
+    Returns:
+        bool: True if the model was loaded, False otherwise
+    """
+    if not OLLAMA_AVAILABLE or not model:
+        return False
+    
+    # Claim the warm-up before sending it, so concurrent callers skip it too
+    key = (endpoint.rstrip('/'), model)
+    with _CLIENTS_LOCK:
+        warmed_at = _WARMED_UP_SINCE.get(key)
+        if warmed_at is not None and time.monotonic() - warmed_at < WARMUP_CACHE_TTL:
+            return True
+        _WARMED_UP_SINCE[key] = time.monotonic()
+    
+    try:
+        client: Client = _get_client(endpoint)
+        client.generate(model=model, prompt="", keep_alive=WARMUP_KEEP_ALIVE)
+        logger.info(f"Ollama model {model} loaded at {endpoint}.")
+        return True
+    except Exception as e:
+        with _CLIENTS_LOCK:
+            _WARMED_UP_SINCE.pop(key, None)
+        logger.warning(f"Could not warm up Ollama model {model}: {e}")
+        return False
+
+def get_vlm_description(
+    endpoint: str,
+    model: str,
+    prompt_text: str,
+    image_bytes: bytes,
+    mime_type: str,
+    on_partial: Optional[Callable[[str], None]] = None,
+    options: Optional[Dict[str, Any]] = None
+) -> str:
     """
     Get a page description using a VLM through Ollama.
     
@@ -63,6 +230,9 @@ def get_vlm_description(endpoint: str, model: str, prompt_text: str, image_bytes
         prompt_text: Text prompt
         image_bytes: Bytes of the page image
         mime_type: MIME type of the image ('image/png' or 'image/jpeg')
+        on_partial: Optional function called with the text received so far while
+            the response is streamed. When omitted the response is not streamed.
+        options: Optional Ollama model options for the request (e.g. {"num_batch": 1024})
         
     Returns:
         str: Generated description
@@ -76,8 +246,8 @@ def get_vlm_description(endpoint: str, model: str, prompt_text: str, image_bytes
         raise ImportError("Ollama Python client not installed. Install with 'pip install ollama'")
     
     try:
-        # Create Ollama client
-        client: Client = Client(host=endpoint.rstrip('/'))
+        # Get shared Ollama client
+        client: Client = _get_client(endpoint)
         
         # Encode image to base64
         encoded_image = base64.b64encode(image_bytes).decode('utf-8')
@@ -93,11 +263,29 @@ def get_vlm_description(endpoint: str, model: str, prompt_text: str, image_bytes
         
         logger.info(f"Calling Ollama VLM model: {model}")
         
+        chat_kwargs: Dict[str, Any] = {'options': options} if options else {}
+        
+        if on_partial is not None:
+            # Stream the response, reporting the accumulated text after each chunk
+            content = ""
+            with _get_request_slots(endpoint):
+                for chunk in client.chat(model=model, messages=messages, stream=True, **chat_kwargs):
+                    delta = chunk['message']['content'] if chunk and 'message' in chunk else None
+                    if delta:
+                        content += delta
+                        on_partial(content)
+            if not content:
+                raise ValueError("Ollama returned an empty streamed response")
+            logger.info(f"Received streamed VLM description from Ollama (model: {model}).")
+            return content
+        
         # Call Ollama chat API
-        response: Dict[str, Any] = client.chat(
-            model=model,
-            messages=messages
-        )
+        with _get_request_slots(endpoint):
+            response: Dict[str, Any] = client.chat(
+                model=model,
+                messages=messages,
+                **chat_kwargs
+            )
         
         # Extract and validate response
         if response and 'message' in response and 'content' in response['message']:
@@ -136,8 +324,8 @@ def get_llm_summary(endpoint: str, model: str, prompt_text: str) -> str:
         raise ImportError("Ollama Python client not installed. Install with 'pip install ollama'")
     
     try:
-        # Create Ollama client
-        client: Client = Client(host=endpoint.rstrip('/'))
+        # Get shared Ollama client
+        client: Client = _get_client(endpoint)
         
         # Prepare messages for chat API
         messages: List[Dict[str, Any]] = [
@@ -150,10 +338,11 @@ def get_llm_summary(endpoint: str, model: str, prompt_text: str) -> str:
         logger.info(f"Calling Ollama LLM model for summary: {model}")
         
         # Call Ollama chat API
-        response: Dict[str, Any] = client.chat(
-            model=model,
-            messages=messages
-        )
+        with _get_request_slots(endpoint):
+            response: Dict[str, Any] = client.chat(
+                model=model,
+                messages=messages
+            )
         
         # Extract and validate response
         if response and 'message' in response and 'content' in response['message']:
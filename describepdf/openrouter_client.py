@@ -5,11 +5,14 @@ This module handles all interactions with the OpenRouter API for
 VLM (Vision Language Model) image description and LLM text summarization.
 """
 
+import atexit
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import base64
 import json
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 # Get logger from config module
 logger = logging.getLogger('describepdf')
@@ -18,6 +21,28 @@ logger = logging.getLogger('describepdf')
 OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
 DEFAULT_TIMEOUT = 300  # 5 minutes
 
+# Session shared by all API calls, so pages described one after another (or in
+# parallel) reuse kept-alive HTTPS connections instead of a new TLS handshake each.
+# Only failed connection attempts are retried: POST requests that reached the
+# API are never sent twice
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5)
+))
+
+def close_session() -> None:
+    """
+    Close the pooled connections of the shared session.
+    
+    This is registered to run at interpreter exit; the session opens new
+    connections if it is used again afterwards.
+    """
+    _SESSION.close()
+
+atexit.register(close_session)
+
 def encode_image_to_base64(image_bytes: bytes, mime_type: str) -> str:
     """
     Encode image bytes to Base64 string for the API.
@@ -39,7 +64,12 @@ def encode_image_to_base64(image_bytes: bytes, mime_type: str) -> str:
         logger.error(f"Error encoding image to Base64: {e}")
         raise ValueError(f"Failed to encode image: {e}")
 
-def call_openrouter_api(api_key: str, model: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+def call_openrouter_api(
+    api_key: str,
+    model: str,
+    messages: List[Dict[str, Any]],
+    session: Optional[requests.Session] = None
+) -> Dict[str, Any]:
     """
     Make a call to the OpenRouter Chat Completions API.
 
@@ -47,6 +77,7 @@ def call_openrouter_api(api_key: str, model: str, messages: List[Dict[str, Any]]
         api_key: OpenRouter API key
         model: Model name to use
         messages: List of messages in API format
+        session: Session used to send the request (defaults to the shared pooled session)
 
     Returns:
         Dict: The JSON response from the API
@@ -76,7 +107,7 @@ def call_openrouter_api(api_key: str, model: str, messages: List[Dict[str, Any]]
         logger.debug(f"Calling OpenRouter API. Model: {model}. Messages: {msg_log}")
         
         # Make API request
-        response = requests.post(
+        response = (session or _SESSION).post(
             OPENROUTER_API_URL, 
             headers=headers, 
             json=payload, 
@@ -97,9 +128,9 @@ def call_openrouter_api(api_key: str, model: str, messages: List[Dict[str, Any]]
         response_text = getattr(e.response, 'text', 'No response') if hasattr(e, 'response') else 'No response'
         logger.error(f"API call failed for model {model}. Status: {status_code}. Response: {response_text}")
         
-        # Extract error message from response if possible
+        # Extract error message from response if possible (a Response is falsy for 4xx/5xx codes)
         error_message = f"API Error: {e}"
-        if hasattr(e, 'response') and e.response:
+        if getattr(e, 'response', None) is not None:
             try:
                 error_details = e.response.json()
                 if 'error' in error_details and 'message' in error_details['error']:
@@ -7,8 +7,11 @@ including rendering, text extraction, and file manipulation.
 
 import io
 import os
+import math
 import tempfile
-from typing import Tuple, List, Optional
+import threading
+from functools import lru_cache
+from typing import Iterator, Tuple, Optional, Union
 
 # Get logger from config module
 from .config import logger
@@ -28,9 +31,19 @@ except ImportError:
     PIL_AVAILABLE = False
     logger.error("Pillow not installed. Install with 'pip install pillow'")
 
-def get_pdf_pages(pdf_path: str) -> Tuple[Optional[pymupdf.Document], Optional[List[pymupdf.Page]], int]:
+# Number of extracted PDF texts remembered in memory, keyed by path, size and mtime
+TEXT_CACHE_SIZE = 8
+
+# Per-thread scratch document that single pages are copied into, together
+# with the document those pages come from
+_SCRATCH = threading.local()
+
+def get_pdf_pages(pdf_path: str) -> Tuple[Optional[pymupdf.Document], Optional[Iterator[pymupdf.Page]], int]:
     """
-    Open a PDF and return a list of page objects and the total number of pages.
+    Open a PDF and return its pages, loaded lazily, and the total number of pages.
+    
+    Pages are only loaded as the returned iterator reaches them, so callers
+    that process one page at a time never hold every page object at once.
     
     NOTE: The caller is responsible for calling close() on the returned document
     when done with it.
@@ -41,7 +54,7 @@ def get_pdf_pages(pdf_path: str) -> Tuple[Optional[pymupdf.Document], Optional[L
     Returns:
         Tuple containing:
         - pymupdf.Document: The open PDF document (caller must close)
-        - List[pymupdf.Page]: List of page objects
+        - Iterator[pymupdf.Page]: Page objects in document order, loaded on demand
         - int: Total number of pages (0 if error)
     """
     if not PYMUPDF_AVAILABLE:
@@ -50,66 +63,119 @@ def get_pdf_pages(pdf_path: str) -> Tuple[Optional[pymupdf.Document], Optional[L
         
     try:
         doc = pymupdf.open(pdf_path)
-        pages = [doc.load_page(i) for i in range(len(doc))]
         total_pages = len(doc)
+        pages = (doc.load_page(i) for i in range(total_pages))
         logger.info(f"Opened PDF '{os.path.basename(pdf_path)}' with {total_pages} pages.")
         return doc, pages, total_pages
     except Exception as e:
         logger.error(f"Error opening or reading PDF {pdf_path}: {e}")
         return None, None, 0
 
-def render_page_to_image_bytes(page: pymupdf.Page, image_format: str = "jpeg", dpi: int = 150) -> Tuple[Optional[bytes], Optional[str]]:
+def render_page_to_image_bytes(
+    page: pymupdf.Page,
+    image_format: str = "jpeg",
+    dpi: int = 150,
+    max_side: Optional[int] = None,
+    quality: int = 85,
+    as_view: bool = False,
+    max_pixels: Optional[int] = None
+) -> Tuple[Optional[Union[bytes, memoryview]], Optional[str]]:
     """
     Render a PDF page to image bytes in memory.
 
     Args:
         page: PyMuPDF Page object
-        image_format: Desired format ('png' or 'jpeg')
+        image_format: Desired format ('png', 'jpeg' or 'webp')
         dpi: Image resolution
+        max_side: Optional limit in pixels for the longest side of the image.
+            The resolution is lowered when needed so the page fits, which avoids
+            sending pixels that VLMs discard when resizing to their native size.
+        quality: Compression quality (1-95) for JPEG and WebP images
+        as_view: Return a memoryview over the encoded image instead of bytes,
+            which avoids copying WebP images out of their encoding buffer
+        max_pixels: Optional limit for the total number of pixels of the image,
+            which bounds the memory used by pages with unusually large sizes
 
     Returns:
         Tuple containing:
-        - bytes: Image bytes
-        - str: MIME type ('image/png' or 'image/jpeg')
+        - bytes: Image bytes (a memoryview when as_view is True)
+        - str: MIME type ('image/png', 'image/jpeg' or 'image/webp')
         Returns (None, None) on error
     """
-    if not PYMUPDF_AVAILABLE or not PIL_AVAILABLE:
-        logger.error("PyMuPDF and Pillow are required for image rendering but are not installed.")
+    if not PYMUPDF_AVAILABLE:
+        logger.error("PyMuPDF is required for image rendering but is not installed.")
         return None, None
         
     try:
         # Validate image format
-        if image_format.lower() not in ["png", "jpeg"]:
+        if image_format.lower() not in ["png", "jpeg", "webp"]:
             logger.error(f"Unsupported image format: {image_format}")
             return None, None
+
+        if image_format.lower() == "webp" and not PIL_AVAILABLE:
+            logger.error("Pillow is required for WebP images but is not installed.")
+            return None, None
+
+        # Lower the resolution if the page would exceed the maximum side
+        if max_side:
+            longest_side_points = max(page.rect.width, page.rect.height)
+            if longest_side_points > 0:
+                dpi = max(1, min(dpi, int(max_side * 72 / longest_side_points)))
+
+        # Lower the resolution if the page would exceed the maximum pixel count
+        if max_pixels:
+            area_points = page.rect.width * page.rect.height
+            if area_points > 0:
+                dpi = max(1, min(dpi, int(72 * math.sqrt(max_pixels / area_points))))
             
         # Render page to pixmap
         pix = page.get_pixmap(dpi=dpi)
-        img_bytes_io = io.BytesIO()
 
         if image_format.lower() == "png":
             # Use PyMuPDF's built-in PNG conversion
             img_bytes = pix.tobytes("png")
-            img_bytes_io.write(img_bytes)
             mime_type = "image/png"
         elif image_format.lower() == "jpeg":
-            # Use PIL for JPEG conversion
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            img.save(img_bytes_io, format="JPEG", quality=85)
+            # Use PyMuPDF's built-in JPEG conversion, which encodes the pixmap
+            # directly instead of copying its samples into a PIL image first
+            img_bytes = pix.tobytes("jpeg", jpg_quality=quality)
             mime_type = "image/jpeg"
+        else:
+            # Use PIL for WebP conversion
+            img_bytes_io = io.BytesIO()
+            img = _pixmap_to_pil_image(pix)
+            img.save(img_bytes_io, format="WEBP", quality=quality, method=4)
+            img_bytes = img_bytes_io.getbuffer() if as_view else img_bytes_io.getvalue()
+            mime_type = "image/webp"
 
-        img_bytes_io.seek(0)
-        logger.debug(f"Rendered page {page.number + 1} to {image_format.upper()} bytes.")
-        return img_bytes_io.getvalue(), mime_type
+        logger.debug(f"Rendered page {page.number + 1} to {image_format.upper()} bytes at {dpi} DPI.")
+        if as_view and not isinstance(img_bytes, memoryview):
+            img_bytes = memoryview(img_bytes)
+        return img_bytes, mime_type
 
     except Exception as e:
         logger.error(f"Error rendering page {page.number + 1} to image: {e}")
         return None, None
 
+def _pixmap_to_pil_image(pix: pymupdf.Pixmap) -> "Image.Image":
+    """
+    Wrap the samples of an RGB pixmap in a PIL image without copying them.
+
+    Args:
+        pix: The rendered pixmap; it must stay alive while the image is used
+
+    Returns:
+        Image.Image: Image sharing its memory with the pixmap
+    """
+    return Image.frombuffer("RGB", (pix.width, pix.height), pix.samples_mv, "raw", "RGB", pix.stride, 1)
+
 def extract_all_text(pdf_path: str) -> Optional[str]:
     """
     Extract all text from a PDF file.
 
+    The text is remembered per path, size and modification time, so
+    converting the same unchanged PDF again does not parse it twice.
+
     Args:
         pdf_path: Path to the PDF file
 
@@ -120,22 +186,30 @@ def extract_all_text(pdf_path: str) -> Optional[str]:
         logger.error("PyMuPDF is required for text extraction but is not installed.")
         return None
         
-    doc = None
     try:
-        doc = pymupdf.open(pdf_path)
-        all_text = ""
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            all_text += page.get_text("text") + "\n\n"
+        stat = os.stat(pdf_path)
+        all_text = _extract_all_text(os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns)
         logger.info(f"Extracted text from all pages of '{os.path.basename(pdf_path)}'.")
         return all_text
     except Exception as e:
         logger.error(f"Error extracting text from PDF {pdf_path}: {e}")
         return None
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def _extract_all_text(pdf_path: str, size: int, mtime_ns: int) -> str:
+    """Extract the text of a PDF; size and mtime_ns only make the lru_cache key change with the file."""
+    doc = pymupdf.open(pdf_path)
+    try:
+        # Document.get_page_text(pno) is a wrapper around doc[pno].get_text() that
+        # still creates the Page object and is slower than iterating doc.pages()
+        page_texts = [page.get_text("text") for page in doc.pages()]
+        return "\n\n".join(page_texts) + "\n\n" if page_texts else ""
     finally:
-        # Always close the document if we opened it
-        if doc is not None:
-            doc.close()
+        doc.close()
+
+def clear_text_cache() -> None:
+    """Forget the text extracted from previously read PDFs."""
+    _extract_all_text.cache_clear()
 
 def save_page_as_temp_pdf(original_doc: pymupdf.Document, page_num: int) -> Optional[str]:
     """
@@ -182,4 +256,62 @@ def save_page_as_temp_pdf(original_doc: pymupdf.Document, page_num: int) -> Opti
     finally:
         # Always close the new document if we created it
         if new_doc is not None:
-            new_doc.close()
\ No newline at end of file
+            new_doc.close()
+
+def save_page_as_bytes(original_doc: pymupdf.Document, page_num: int) -> Optional[bytes]:
+    """
+    Save a specific page as an in-memory single-page PDF.
+
+    Unlike save_page_as_temp_pdf, nothing is written to disk: the page is
+    copied into a scratch document, kept between calls for the same original
+    document instead of creating a new one per page, and serialized directly.
+
+    Args:
+        original_doc: The open original PDF document
+        page_num: The page number (zero-based)
+
+    Returns:
+        bytes: Contents of the single-page PDF, or None if there was an error
+    """
+    if not PYMUPDF_AVAILABLE:
+        logger.error("PyMuPDF is required for PDF processing but is not installed.")
+        return None
+
+    try:
+        scratch_doc = _get_scratch_doc(original_doc)
+        scratch_doc.insert_pdf(original_doc, from_page=page_num, to_page=page_num)
+        pdf_bytes = scratch_doc.tobytes(garbage=3)
+        scratch_doc.delete_page(0)
+
+        logger.debug(f"Saved page {page_num + 1} to an in-memory PDF ({len(pdf_bytes)} bytes)")
+        return pdf_bytes
+
+    except Exception as e:
+        logger.error(f"Error saving page {page_num + 1} as in-memory PDF: {e}")
+        # A failed copy may leave the scratch document in an unknown state
+        close_scratch_doc()
+        return None
+
+def _get_scratch_doc(original_doc: pymupdf.Document) -> pymupdf.Document:
+    """
+    Get this thread's scratch document for copying pages of a document.
+
+    Args:
+        original_doc: The document whose pages will be copied
+
+    Returns:
+        pymupdf.Document: An empty document, reused while the original is the same
+    """
+    if getattr(_SCRATCH, "source", None) is not original_doc:
+        close_scratch_doc()
+        _SCRATCH.doc = pymupdf.open()
+        _SCRATCH.source = original_doc
+    return _SCRATCH.doc
+
+def close_scratch_doc() -> None:
+    """Close this thread's scratch document used to copy single pages, if any."""
+    scratch_doc = getattr(_SCRATCH, "doc", None)
+    _SCRATCH.doc = None
+    _SCRATCH.source = None
+    if scratch_doc is not None:
+        scratch_doc.close()
@@ -6,7 +6,8 @@ using either OpenRouter or Ollama LLM models.
 """
 
 import logging
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 
 from . import pdf_processor
 from . import openrouter_client
@@ -16,15 +17,81 @@ from .config import get_prompts
 # Get logger from config module
 logger = logging.getLogger('describepdf')
 
+# Check if tiktoken is available for token-aware truncation
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
 # Constants
 MAX_CHARS_FOR_PROMPT = 512000  # Maximum characters to include in prompt (128K tokens approx.)
+MAX_TOKENS_FOR_PROMPT = 128000  # Maximum tokens to include in prompt when tiktoken is installed
+DEFAULT_ENCODING = "cl100k_base"  # Encoding used for models tiktoken does not know
+FULL_TEXT_PLACEHOLDER = "[FULL_PDF_TEXT]"  # Placeholder replaced by the PDF text in the summary prompt
+MIN_INFORMATIVE_CHARS = 32  # Below this many non-whitespace characters (e.g. scanned PDFs, OCR noise) no LLM call is made
+
+@lru_cache(maxsize=4)
+def _split_summary_template(template: str) -> Optional[Tuple[str, str]]:
+    """
+    Split the summary prompt template around the PDF text placeholder.
+
+    Args:
+        template: Summary prompt template
+
+    Returns:
+        Optional[Tuple[str, str]]: Text before and after the placeholder,
+        or None if the template has no placeholder
+    """
+    prefix, placeholder, suffix = template.partition(FULL_TEXT_PLACEHOLDER)
+    if not placeholder:
+        return None
+    return prefix, suffix
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: Optional[str]) -> 'tiktoken.Encoding':
+    """
+    Get the tiktoken encoding for a model, falling back to a generic one.
+
+    Args:
+        model: Model name
+
+    Returns:
+        tiktoken.Encoding: Encoding used to count tokens
+    """
+    try:
+        return tiktoken.encoding_for_model(model or "")
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+def _truncate_to_tokens(text: str, model: Optional[str], max_tokens: int) -> Optional[str]:
+    """
+    Cut a text to a maximum number of tokens.
+
+    Args:
+        text: Text to truncate
+        model: Model the text is sent to
+        max_tokens: Maximum number of tokens to keep
+
+    Returns:
+        Optional[str]: The truncated text, or None if the text already fits
+    """
+    # Every token covers at least one UTF-8 byte, so short texts fit without encoding them
+    if len(text.encode("utf-8")) <= max_tokens:
+        return None
+    encoding = _get_encoding(model)
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return None
+    return encoding.decode(tokens[:max_tokens])
 
 def generate_summary(
     pdf_path: str,
     provider: str = "openrouter",
     api_key: Optional[str] = None,
     ollama_endpoint: Optional[str] = None,
-    model: Optional[str] = None
+    model: Optional[str] = None,
+    full_text: Optional[str] = None
 ) -> Optional[str]:
     """
     Generate a summary of the complete textual content of a PDF using specified provider.
@@ -35,52 +102,92 @@ def generate_summary(
         api_key: OpenRouter API key (required for openrouter provider)
         ollama_endpoint: Ollama endpoint URL (required for ollama provider)
         model: LLM model to use for the summary
+        full_text: Text already extracted from the PDF; when given, the PDF is not
+            opened, so the summary can be generated on a thread that must not use PyMuPDF
 
     Returns:
         str: The generated summary, or None if any step fails
     """
     logger.info(f"Starting summary generation for '{pdf_path}' using provider {provider} with model {model}.")
 
+    # Validate the provider settings before parsing the PDF, so misconfigured
+    # calls fail without reading the whole document
+    if provider == "openrouter":
+        if not api_key:
+            logger.error("OpenRouter API key is required for OpenRouter provider.")
+            return None
+    elif provider == "ollama":
+        if not ollama_endpoint:
+            logger.error("Ollama endpoint URL is required for Ollama provider.")
+            return None
+    else:
+        logger.error(f"Unsupported provider: {provider}")
+        return None
+
     # Extract text from PDF
-    logger.info("Extracting full text from PDF...")
-    full_text = pdf_processor.extract_all_text(pdf_path)
+    if full_text is None:
+        logger.info("Extracting full text from PDF...")
+        full_text = pdf_processor.extract_all_text(pdf_path)
     
     # Handle error cases
     if full_text is None:
         logger.error("Failed to extract text for summary.")
         return None
         
-    if not full_text.strip():
+    informative_chars = sum(not c.isspace() for c in full_text)
+    if not informative_chars:
         logger.warning("PDF contains no extractable text for summary.")
         return "Document contains no extractable text."
 
-    logger.info(f"Text extracted ({len(full_text)} characters). Preparing summary prompt...")
+    # Image-only PDFs often yield a few stray characters, spread over blank
+    # lines and pages, that are not worth an LLM call
+    if informative_chars < MIN_INFORMATIVE_CHARS:
+        logger.warning(
+            f"PDF contains only {informative_chars} non-blank characters of text, too few to summarize."
+        )
+        return "Document contains insufficient extractable text."
 
-    # Load and prepare prompt
+    # The prompt is only needed once there is text to summarize
     prompts = get_prompts()
     summary_prompt_template = prompts.get("summary")
     if not summary_prompt_template:
         logger.error("Summary prompt template not found.")
         return None
 
+    logger.info(f"Text extracted ({len(full_text)} characters). Preparing summary prompt...")
+
     # Truncate text if too long
-    if len(full_text) > MAX_CHARS_FOR_PROMPT:
+    tokens_counted = False
+    if TIKTOKEN_AVAILABLE:
+        # Loading an encoding may download it, so offline it can fail like a missing tiktoken
+        try:
+            truncated_text = _truncate_to_tokens(full_text, model, MAX_TOKENS_FOR_PROMPT)
+            tokens_counted = True
+        except Exception as e:
+            logger.warning(f"Could not count tokens with tiktoken, truncating by characters instead: {e}")
+    if tokens_counted:
+        if truncated_text is not None:
+            logger.warning(
+                f"PDF text exceeds limit ({MAX_TOKENS_FOR_PROMPT} tokens), truncating for summary."
+            )
+            full_text = truncated_text + "\n\n[... text truncated ...]"
+    elif len(full_text) > MAX_CHARS_FOR_PROMPT:
         logger.warning(
             f"PDF text ({len(full_text)} chars) exceeds limit ({MAX_CHARS_FOR_PROMPT}), truncating for summary."
         )
         full_text = full_text[:MAX_CHARS_FOR_PROMPT] + "\n\n[... text truncated ...]"
 
     # Fill prompt template
-    prompt_text = summary_prompt_template.replace("[FULL_PDF_TEXT]", full_text)
+    template_parts = _split_summary_template(summary_prompt_template)
+    if template_parts is None:
+        prompt_text = summary_prompt_template
+    else:
+        prompt_text = template_parts[0] + full_text + template_parts[1]
 
     # Call LLM for summary based on provider
     try:
         # Handle OpenRouter provider
         if provider == "openrouter":
-            if not api_key:
-                logger.error("OpenRouter API key is required for OpenRouter provider.")
-                return None
-                
             logger.info(f"Calling OpenRouter LLM for summary (model: {model})...")
             summary = openrouter_client.get_llm_summary(api_key, model, prompt_text)
             if summary:
@@ -91,11 +198,7 @@ def generate_summary(
                 return None
         
         # Handle Ollama provider
-        elif provider == "ollama":
-            if not ollama_endpoint:
-                logger.error("Ollama endpoint URL is required for Ollama provider.")
-                return None
-                
+        else:
             logger.info(f"Calling Ollama LLM for summary (model: {model})...")
             summary = ollama_client.get_llm_summary(ollama_endpoint, model, prompt_text)
             if summary:
@@ -104,11 +207,6 @@ def generate_summary(
             else:
                 logger.error("Ollama LLM call for summary returned no content.")
                 return None
-        
-        # Handle unsupported provider        
-        else:
-            logger.error(f"Unsupported provider: {provider}")
-            return None
             
     except ValueError as e:
         logger.error(f"Value error during summary generation: {e}")
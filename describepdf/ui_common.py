@@ -0,0 +1,455 @@
+"""
+Shared building blocks for the DescribePDF web UIs.
+
+This module holds the parts of the Gradio interface that are identical for
+the OpenRouter and Ollama versions: the conversion streaming and download
+handling, and the layout of the Generate and Settings tabs.
+"""
+
+import gradio as gr
+import atexit
+import os
+import re
+import tempfile
+import logging
+import time
+import threading
+from collections import deque
+from typing import Iterator, Tuple, Optional, Dict, Any, Callable, List, Deque
+
+from . import cache
+from . import config
+from . import core
+
+# Buffer size used when streaming the result Markdown to the download file
+DOWNLOAD_WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+# Directory where download files are created
+TEMP_DIR = tempfile.gettempdir()
+
+# Number of download files kept on disk; older ones are deleted as new ones are created
+MAX_DOWNLOAD_FILES = 100
+
+# Download files created by this process, oldest first
+_DOWNLOAD_FILES: Deque[str] = deque()
+_DOWNLOAD_FILES_LOCK = threading.Lock()
+
+# Number of conversions the Gradio queue runs at the same time
+DEFAULT_CONCURRENCY = int(os.getenv("DESCRIBEPDF_CONCURRENCY", "4"))
+
+# Maximum number of requests waiting in the Gradio queue
+QUEUE_MAX_SIZE = 32
+
+# Options passed to launch(); server-side rendering would start a Node server
+# and render every page load, which this single-page app does not need
+LAUNCH_OPTIONS: Dict[str, Any] = {"ssr_mode": False}
+
+# Characters not allowed in download file names, and the maximum base name length
+_SAFE_NAME = re.compile(r"[^\w.-]+")
+MAX_BASE_NAME_LENGTH = 80
+
+# Minimum seconds and progress delta between two progress bar updates
+PROGRESS_MIN_INTERVAL = 0.1
+PROGRESS_MIN_DELTA = 0.01
+
+# Update hiding the download button. Gradio pops keys from the update dicts
+# it receives, so callers get a copy through hidden_download_update()
+_HIDDEN_DOWNLOAD: Dict[str, Any] = gr.update(value=None, visible=False)
+
+# Output languages offered in the settings dropdown
+SUGGESTED_LANGUAGES: Tuple[str, ...] = (
+    "English", "Spanish", "French", "German", 
+    "Chinese", "Japanese", "Italian", 
+    "Portuguese", "Russian", "Korean"
+)
+
+theme = gr.themes.Soft(
+    primary_hue="red",
+    secondary_hue="rose",
+    spacing_size="lg",
+)
+
+def _remove_file(path: str) -> None:
+    """Delete a file, ignoring files that are already gone."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.warning(f"Could not remove download file {path}: {e}")
+
+def _track_download_file(path: str) -> None:
+    """
+    Remember a published download file, deleting the oldest ones beyond MAX_DOWNLOAD_FILES.
+
+    Args:
+        path: Path of the download file
+    """
+    with _DOWNLOAD_FILES_LOCK:
+        _DOWNLOAD_FILES.append(path)
+        expired = [_DOWNLOAD_FILES.popleft() for _ in range(len(_DOWNLOAD_FILES) - MAX_DOWNLOAD_FILES)]
+    for expired_path in expired:
+        _remove_file(expired_path)
+
+def cleanup_download_files() -> None:
+    """Delete every download file created by this process."""
+    with _DOWNLOAD_FILES_LOCK:
+        paths = list(_DOWNLOAD_FILES)
+        _DOWNLOAD_FILES.clear()
+    for path in paths:
+        _remove_file(path)
+
+atexit.register(cleanup_download_files)
+
+def hidden_download_update() -> Dict[str, Any]:
+    """
+    Return a Gradio update that hides and clears the download button.
+
+    Returns:
+        Dict[str, Any]: Fresh copy of the precomputed update
+    """
+    return dict(_HIDDEN_DOWNLOAD)
+
+def clear_cached_results() -> str:
+    """
+    Forget all cached page descriptions and summaries, in memory and on disk.
+
+    Returns:
+        str: Status message for the progress box
+    """
+    core.clear_page_cache()
+    cache.clear_response_cache()
+    return "Cached page descriptions and summaries cleared."
+
+def stream_conversion(
+    pdf_file_obj: gr.File,
+    run_config: Dict[str, Any],
+    progress: gr.Progress
+) -> Iterator[Tuple[str, gr.update, Optional[str]]]:
+    """
+    Run a validated conversion and stream its progress to the Gradio components.
+
+    The Markdown is written to a partial download file as pages arrive and only
+    published under its final name once the conversion finished successfully.
+
+    Args:
+        pdf_file_obj: Gradio File object for the uploaded PDF
+        run_config: Configuration for this run, as passed to the core module
+        progress: Gradio progress tracker
+
+    Yields:
+        Tuple containing:
+        - str: Status message indicating progress, success or failure
+        - gr.update: Download button update (populated with the result file on the last yield)
+        - Optional[str]: Markdown content generated so far
+    """
+    # Create progress callback for Gradio, throttled to avoid flooding the websocket
+    last_update = [0.0, -1.0]  # [monotonic time, progress value] of the last emitted update
+
+    def progress_callback_gradio(progress_value: float, status: str) -> None:
+        """
+        Update Gradio progress bar with current progress and status message.
+
+        Updates closer than PROGRESS_MIN_INTERVAL seconds and PROGRESS_MIN_DELTA
+        progress to the previous one are dropped; completion is always shown.
+        
+        Args:
+            progress_value (float): Progress value between 0.0 and 1.0
+            status (str): Current status message to display
+        """
+        clamped_progress = max(0.0, min(1.0, progress_value))
+        now = time.monotonic()
+        if (clamped_progress < 1.0
+                and now - last_update[0] <= PROGRESS_MIN_INTERVAL
+                and clamped_progress - last_update[1] < PROGRESS_MIN_DELTA):
+            return
+        last_update[0], last_update[1] = now, clamped_progress
+        progress(clamped_progress, desc=status)
+        if logging.root.isEnabledFor(logging.INFO):
+            logging.info(f"Progress: {status} ({clamped_progress*100:.1f}%)")
+
+    # Get base filename from the uploaded PDF
+    base_name = os.path.splitext(os.path.basename(pdf_file_obj.name))[0]
+    base_name = _SAFE_NAME.sub("_", base_name)[:MAX_BASE_NAME_LENGTH] or "document"
+    download_filename = f"{base_name}_description.md"
+    
+    # Pages are written to a uniquely named partial file that only becomes the
+    # download file (same name without ".tmp") once complete
+    md_file = None
+    download_error = None
+    partial_filepath = download_filepath = None
+    try:
+        fd, partial_filepath = tempfile.mkstemp(prefix=f"{base_name}_", suffix=".md.tmp", dir=TEMP_DIR)
+        download_filepath = partial_filepath[:-len(".tmp")]
+        md_file = os.fdopen(fd, "w", encoding="utf-8", buffering=DOWNLOAD_WRITE_BUFFER_SIZE)
+    except Exception as e:
+        download_error = e
+
+    # Run the conversion, streaming each described page to the UI as it is ready
+    status_message, result_markdown = "", None
+    written_chars = 0
+    try:
+        for status_message, result_markdown in core.stream_convert_pdf_to_markdown(
+            pdf_file_obj.name,
+            run_config,
+            progress_callback_gradio
+        ):
+            # Only finished pages are written; a page still being streamed has no trailing separator
+            finished_chars = result_markdown.rfind(core.PAGE_SEPARATOR) if result_markdown else -1
+            if md_file is not None and finished_chars >= 0:
+                finished_chars += len(core.PAGE_SEPARATOR)
+                try:
+                    # Only the Markdown added since the previous page needs writing
+                    md_file.write(result_markdown[written_chars:finished_chars])
+                    written_chars = max(written_chars, finished_chars)
+                except Exception as e:
+                    download_error = e
+                    md_file.close()
+                    md_file = None
+            yield status_message, hidden_download_update(), result_markdown if result_markdown else ""
+    except GeneratorExit:
+        # The client went away before the conversion finished
+        if md_file is not None:
+            md_file.close()
+            md_file = None
+        if partial_filepath:
+            _remove_file(partial_filepath)
+        raise
+    finally:
+        if md_file is not None:
+            try:
+                md_file.close()
+            except Exception as e:
+                download_error = e
+
+    # Publish the complete file under its final name in a single atomic step
+    if result_markdown and download_error is None:
+        try:
+            os.replace(partial_filepath, download_filepath)
+            _track_download_file(download_filepath)
+        except Exception as e:
+            download_error = e
+
+    # Handle the download file
+    if result_markdown and download_error is None:
+        logging.info(f"Markdown result saved to temporary file for download: {download_filepath}")
+        download_button_update = gr.update(value=download_filepath, visible=True, label=f"Download '{download_filename}'")
+    else:
+        if download_error is not None:
+            logging.error(f"Error creating temporary file for download: {download_error}")
+            if result_markdown:
+                status_message += " (Error creating download file)"
+        # Nothing useful was written, so don't leave the file behind
+        if partial_filepath:
+            _remove_file(partial_filepath)
+        download_button_update = hidden_download_update()
+
+    yield (
+        status_message,
+        download_button_update,
+        result_markdown if result_markdown else ""
+    )
+
+def make_ui(
+    *,
+    handler: Callable[..., Iterator[Tuple[str, gr.update, Optional[str]]]],
+    build_provider_input: Callable[[], gr.components.Component],
+    provider_name: str,
+    initial_vlm: Optional[str],
+    initial_llm: Optional[str],
+    suggested_vlms: Tuple[str, ...],
+    suggested_llms: Tuple[str, ...],
+    build_extra_inputs: Optional[Callable[[], List[gr.components.Component]]] = None,
+    title: str = "DescribePDF"
+) -> gr.Blocks:
+    """
+    Create the Gradio interface shared by the OpenRouter and Ollama versions.
+
+    The provider-specific settings component is created by build_provider_input
+    and passed to the handler right after the uploaded PDF.
+
+    Args:
+        handler: Conversion handler connected to the 'Describe' button
+        build_provider_input: Function creating the provider settings component (API key, endpoint...)
+        provider_name: Provider name shown in the model selection hints
+        initial_vlm: Initial VLM model name
+        initial_llm: Initial summary LLM model name
+        suggested_vlms: VLM model names offered in the dropdown
+        suggested_llms: Summary LLM model names offered in the dropdown
+        build_extra_inputs: Optional function creating provider-specific advanced settings,
+            passed to the handler after the common settings
+        title: Browser window title
+
+    Returns:
+        gr.Blocks: Configured Gradio interface ready to be launched
+    """
+    # Load initial config from environment
+    initial_env_config = config.get_config()
+
+    # Set initial values from config
+    initial_lang = initial_env_config.get("output_language", "English")
+    initial_use_md = initial_env_config.get("use_markitdown", False)
+    initial_use_sum = initial_env_config.get("use_summary", False)
+    initial_use_cache = initial_env_config.get("use_page_cache", True)
+    initial_use_response_cache = initial_env_config.get("use_response_cache", False)
+    initial_image_format = initial_env_config.get("image_format", "jpeg")
+    initial_max_side = initial_env_config.get("render_max_side", 1120)
+    initial_image_quality = initial_env_config.get("image_quality", 85)
+    initial_parallel_pages = initial_env_config.get("max_parallel_pages", 4)
+
+    # Create the Gradio interface
+    with gr.Blocks(title=title, theme=theme) as iface:
+        gr.Markdown("<center><img src='https://davidlms.github.io/DescribePDF/assets/poster.png' alt='Describe PDF Logo' width='600px'/></center>")
+        gr.Markdown(
+            """<div style="display: flex;align-items: center;justify-content: center">
+            [<a href="https://davidlms.github.io/DescribePDF/">Project Page</a>] | [<a href="https://github.com/DavidLMS/describepdf">Github</a>]</div>
+            """
+        )
+        gr.Markdown(
+            "DescribePDF is an open-source tool designed to convert PDF files into detailed page-by-page descriptions in Markdown format using Vision-Language Models (VLMs). Unlike traditional PDF extraction tools that focus on replicating the text layout, DescribePDF generates rich, contextual descriptions of each page's content, making it perfect for visually complex documents like catalogs, scanned documents, and presentations."
+            "\n\n"
+            "Upload a PDF, adjust settings, and click 'Describe'. "
+        )
+
+        with gr.Tabs():
+            # Generate tab
+            with gr.TabItem("Generate", id=0):
+                with gr.Row():
+                    with gr.Column(scale=1):
+                        pdf_input = gr.File(
+                            label="Upload PDF", 
+                            file_types=['.pdf'], 
+                            type="filepath"
+                        )
+                        convert_button = gr.Button(
+                            "Describe", 
+                            variant="primary"
+                        )
+                        progress_output = gr.Textbox(
+                            label="Progress", 
+                            interactive=False, 
+                            lines=2
+                        )
+                        download_button = gr.File(
+                            label="Download Markdown", 
+                            visible=False, 
+                            interactive=False
+                        )
+
+                    with gr.Column(scale=2):
+                        markdown_output = gr.Markdown(label="Result (Markdown)")
+
+            # Configuration tab
+            with gr.TabItem("Settings", id=1):
+                gr.Markdown(
+                    "Adjust settings for the *next* generation. These settings are **not** saved. "
+                    "Defaults are controlled by the `.env` file."
+                )
+                provider_input = build_provider_input()
+                vlm_model_input = gr.Dropdown(
+                    label="VLM Model", 
+                    choices=list(suggested_vlms),
+                    value=initial_vlm,
+                    allow_custom_value=True,
+                    info=f"Select or type the {provider_name} VLM model name"
+                )
+                output_language_input = gr.Dropdown(
+                    label="Output Language", 
+                    choices=list(SUGGESTED_LANGUAGES),
+                    value=initial_lang,
+                    allow_custom_value=True,
+                    info="Select or type the desired output language (e.g., English, Spanish)"
+                )
+                page_selection_input = gr.Textbox(
+                    label="Page Selection (Optional)", 
+                    value="",
+                    placeholder="Example: 1,3,5-10,15 (leave empty for all pages)",
+                    info="Specify individual pages or ranges to process"
+                )
+                with gr.Row():
+                    use_markitdown_checkbox = gr.Checkbox(
+                        label="Use Markitdown for extra text context",
+                        value=initial_use_md
+                    )
+                    use_summary_checkbox = gr.Checkbox(
+                        label="Use PDF summary for augmented context (requires extra LLM call)",
+                        value=initial_use_sum
+                    )
+                    use_cache_checkbox = gr.Checkbox(
+                        label="Cache identical pages (skip the VLM call for repeated pages)",
+                        value=initial_use_cache
+                    )
+                    use_response_cache_checkbox = gr.Checkbox(
+                        label="Use response cache (keep descriptions on disk across runs)",
+                        value=initial_use_response_cache
+                    )
+                with gr.Row():
+                    image_format_input = gr.Dropdown(
+                        label="Page Image Format",
+                        choices=["jpeg", "webp"],
+                        value=initial_image_format,
+                        info="WebP images are smaller, but not every VLM accepts them"
+                    )
+                    max_side_input = gr.Slider(
+                        label="Maximum Page Image Size (px)",
+                        minimum=672,
+                        maximum=1568,
+                        step=112,
+                        value=initial_max_side,
+                        info="Longest side of the page images sent to the VLM"
+                    )
+                    image_quality_input = gr.Slider(
+                        label="Page Image Quality",
+                        minimum=70,
+                        maximum=95,
+                        step=1,
+                        value=initial_image_quality,
+                        info="JPEG/WebP compression quality of the page images"
+                    )
+                    parallel_pages_input = gr.Slider(
+                        label="Parallel pages",
+                        minimum=1,
+                        maximum=16,
+                        step=1,
+                        value=initial_parallel_pages,
+                        info="Number of pages described at the same time"
+                    )
+                summary_llm_model_input = gr.Dropdown(
+                    label="LLM Model for Summary", 
+                    choices=list(suggested_llms),
+                    value=initial_llm,
+                    allow_custom_value=True,
+                    info=f"Select or type the {provider_name} LLM model name for summaries"
+                )
+                extra_inputs = build_extra_inputs() if build_extra_inputs else []
+                clear_cache_button = gr.Button(
+                    "Clear cached descriptions and summaries",
+                    variant="secondary"
+                )
+
+        # Connect UI components
+        conversion_inputs = [
+            pdf_input, provider_input, vlm_model_input, output_language_input,
+            use_markitdown_checkbox, use_summary_checkbox, summary_llm_model_input, page_selection_input,
+            use_cache_checkbox, image_format_input, max_side_input, parallel_pages_input,
+            use_response_cache_checkbox, image_quality_input, *extra_inputs
+        ]
+        conversion_outputs = [
+            progress_output, download_button, markdown_output
+        ]
+        convert_button.click(
+            fn=handler,
+            inputs=conversion_inputs,
+            outputs=conversion_outputs,
+            concurrency_limit=DEFAULT_CONCURRENCY,
+            concurrency_id="convert",
+            show_progress="minimal"
+        )
+        clear_cache_button.click(
+            fn=clear_cached_results,
+            inputs=None,
+            outputs=progress_output
+        )
+
+    iface.queue(default_concurrency_limit=DEFAULT_CONCURRENCY, max_size=QUEUE_MAX_SIZE)
+    return iface
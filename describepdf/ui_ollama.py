@@ -6,21 +6,20 @@ provider version of DescribePDF.
 """
 
 import gradio as gr
-import os
-import tempfile
 import logging
-import secrets
-from typing import Tuple, Optional, Dict, Any, List
+from functools import lru_cache
+from typing import Iterator, Tuple, Optional, Dict, Any, List
 
 from . import config
 from . import core
+from . import ui_common
+from .ui_common import DEFAULT_CONCURRENCY, LAUNCH_OPTIONS
 from . import ollama_client
 
-theme = gr.themes.Soft(
-    primary_hue="red",
-    secondary_hue="rose",
-    spacing_size="lg",
-)
+# Suggested model names offered in the settings dropdowns
+SUGGESTED_VLMS: Tuple[str, ...] = ("llama3.2-vision",)
+
+SUGGESTED_LLMS: Tuple[str, ...] = ("qwen2.5", "llama3.2")
 
 def convert_pdf_to_descriptive_markdown(
     pdf_file_obj: Optional[gr.File], 
@@ -31,8 +30,15 @@ def convert_pdf_to_descriptive_markdown(
     ui_use_sum: bool, 
     ui_sum_model: str, 
     ui_page_selection: str,
+    ui_use_cache: bool = True,
+    ui_image_format: str = "jpeg",
+    ui_max_side: int = 1120,
+    ui_parallel_pages: int = 4,
+    ui_use_response_cache: bool = False,
+    ui_image_quality: int = 85,
+    ui_num_batch: int = 1024,
     progress: gr.Progress = gr.Progress(track_tqdm=True)
-) -> Tuple[str, gr.update, Optional[str]]:
+) -> Iterator[Tuple[str, gr.update, Optional[str]]]:
     """
     Convert a PDF file to detailed page-by-page Markdown descriptions using local Ollama Vision-Language Models.
     
@@ -54,88 +60,67 @@ def convert_pdf_to_descriptive_markdown(
         ui_use_sum: Whether to generate a document summary for context
         ui_sum_model: Summary model name from UI (e.g., qwen2.5)
         ui_page_selection: Optional page selection string (e.g., "1,3,5-10")
+        ui_use_cache: Whether to reuse descriptions of identical pages instead of calling the VLM again
+        ui_image_format: Image format used to send pages to the VLM ('jpeg' or 'webp')
+        ui_max_side: Maximum size in pixels of the longest side of each page image
+        ui_parallel_pages: Number of pages described concurrently
+        ui_use_response_cache: Whether to reuse and store descriptions in the on-disk response cache
+        ui_image_quality: Compression quality of the JPEG/WebP page images
+        ui_num_batch: Ollama num_batch option for VLM requests (0 keeps the server default)
         progress: Gradio progress tracker
         
-    Returns:
+    Yields:
         Tuple containing:
-        - str: Status message indicating success or failure
-        - gr.update: Download button update with the result file
-        - Optional[str]: Markdown result content
+        - str: Status message indicating progress, success or failure
+        - gr.update: Download button update (populated with the result file on the last yield)
+        - Optional[str]: Markdown content generated so far
     """
     # Validate input file
     if pdf_file_obj is None:
-        return "Please upload a PDF file.", gr.update(value=None, visible=False), None
+        yield "Please upload a PDF file.", ui_common.hidden_download_update(), None
+        return
+
+    # Reject a malformed page selection before doing any work
+    if ui_page_selection.strip():
+        try:
+            core.parse_page_numbers(ui_page_selection)
+        except ValueError as e:
+            error_msg = f"Invalid page selection: {e}"
+            logging.error(error_msg)
+            yield error_msg, ui_common.hidden_download_update(), None
+            return
 
     # Check Ollama availability
     if not ollama_client.check_ollama_availability(ollama_endpoint):
         error_msg = f"Error: Could not connect to Ollama at {ollama_endpoint}. Make sure it is running."
         logging.error(error_msg)
-        return error_msg, gr.update(value=None, visible=False), None
+        yield error_msg, ui_common.hidden_download_update(), None
+        return
 
     # Prepare configuration for this run
     current_run_config: Dict[str, Any] = {
         "provider": "ollama",
+        "stream_page_text": True,
         "ollama_endpoint": ollama_endpoint,
+        "ollama_num_batch": int(ui_num_batch) if ui_num_batch else None,
         "vlm_model": ui_vlm_model,
         "output_language": ui_lang,
         "use_markitdown": ui_use_md,
         "use_summary": ui_use_sum,
         "summary_llm_model": ui_sum_model,
+        "use_page_cache": ui_use_cache,
+        "use_response_cache": ui_use_response_cache,
+        "image_format": ui_image_format,
+        "render_max_side": int(ui_max_side) if ui_max_side else None,
+        "render_max_pixels": config.get_config().get("render_max_pixels"),
+        "image_quality": int(ui_image_quality) if ui_image_quality else 85,
+        "max_parallel_pages": int(ui_parallel_pages) if ui_parallel_pages else 1,
         "page_selection": ui_page_selection.strip() if ui_page_selection.strip() else None
     }
 
-    # Create progress callback for Gradio
-    def progress_callback_gradio(progress_value: float, status: str) -> None:
-        """
-        Update Gradio progress bar with current progress and status message.
-        
-        Args:
-            progress_value (float): Progress value between 0.0 and 1.0
-            status (str): Current status message to display
-        """
-        clamped_progress = max(0.0, min(1.0, progress_value))
-        progress(clamped_progress, desc=status)
-        logging.info(f"Progress: {status} ({clamped_progress*100:.1f}%)")
-
-    # Run the conversion
-    status_message, result_markdown = core.convert_pdf_to_markdown(
-        pdf_file_obj.name,
-        current_run_config,
-        progress_callback_gradio
-    )
-
-    # Handle the download file
-    if result_markdown:
-        try:
-            # Get base filename from the uploaded PDF
-            base_name = os.path.splitext(os.path.basename(pdf_file_obj.name))[0]
-            download_filename = f"{base_name}_description.md"
-            
-            # Create a temporary file with a random component to avoid collisions
-            random_suffix = secrets.token_hex(4)
-            temp_dir = tempfile.gettempdir()
-            download_filepath = os.path.join(temp_dir, f"{base_name}_{random_suffix}.md")
-
-            # Write markdown result to the temporary file
-            with open(download_filepath, "w", encoding="utf-8") as md_file:
-                md_file.write(result_markdown)
-                
-            logging.info(f"Markdown result saved to temporary file for download: {download_filepath}")
-            download_button_update = gr.update(value=download_filepath, visible=True, label=f"Download '{download_filename}'")
-
-        except Exception as e:
-            logging.error(f"Error creating temporary file for download: {e}")
-            status_message += " (Error creating download file)"
-            download_button_update = gr.update(value=None, visible=False)
-    else:
-        download_button_update = gr.update(value=None, visible=False)
-
-    return (
-        status_message,
-        download_button_update,
-        result_markdown if result_markdown else ""
-    )
+    yield from ui_common.stream_conversion(pdf_file_obj, current_run_config, progress)
 
+@lru_cache(maxsize=1)
 def create_ui() -> gr.Blocks:
     """
     Create and return the Gradio interface for Ollama.
@@ -143,134 +128,56 @@ def create_ui() -> gr.Blocks:
     This function sets up a Gradio web interface with tabs for PDF conversion
     and configuration. It loads initial settings from the environment config
     and provides UI components for adjusting settings for each conversion run.
+    The interface is built once; later calls return the same Blocks, which only
+    holds read-only settings shared by every session.
     
     Returns:
         gr.Blocks: Configured Gradio interface ready to be launched
     """
     # Load initial config from environment
     initial_env_config = config.get_config()
-
-    # Define suggested model lists and languages
-    suggested_vlms: List[str] = ["llama3.2-vision"]
-    suggested_llms: List[str] = ["qwen2.5", "llama3.2"]
-    suggested_languages: List[str] = [
-        "English", "Spanish", "French", "German", 
-        "Chinese", "Japanese", "Italian", 
-        "Portuguese", "Russian", "Korean"
-    ]
-
-    # Set initial values from config
     initial_endpoint = initial_env_config.get("ollama_endpoint", "http://localhost:11434")
-    initial_vlm = initial_env_config.get("ollama_vlm_model", "llama3.2-vision")
-    initial_llm = initial_env_config.get("ollama_summary_model", "qwen2.5")
-    initial_lang = initial_env_config.get("output_language", "English")
-    initial_use_md = initial_env_config.get("use_markitdown", False)
-    initial_use_sum = initial_env_config.get("use_summary", False)
-
-    # Create the Gradio interface
-    with gr.Blocks(title="DescribePDF", theme=theme) as iface:
-        gr.Markdown("<center><img src='https://davidlms.github.io/DescribePDF/assets/poster.png' alt='Describe PDF Logo' width='600px'/></center>")
-        gr.Markdown(
-            """<div style="display: flex;align-items: center;justify-content: center">
-            [<a href="https://davidlms.github.io/DescribePDF/">Project Page</a>] | [<a href="https://github.com/DavidLMS/describepdf">Github</a>]</div>
-            """
+    initial_num_batch = initial_env_config.get("ollama_num_batch", 1024)
+
+    def build_endpoint_input() -> gr.Textbox:
+        return gr.Textbox(
+            label="Ollama Endpoint",
+            value=initial_endpoint,
+            placeholder="http://localhost:11434",
+            info="URL of your Ollama server"
         )
-        gr.Markdown(
-            "DescribePDF is an open-source tool designed to convert PDF files into detailed page-by-page descriptions in Markdown format using Vision-Language Models (VLMs). Unlike traditional PDF extraction tools that focus on replicating the text layout, DescribePDF generates rich, contextual descriptions of each page's content, making it perfect for visually complex documents like catalogs, scanned documents, and presentations."
-            "\n\n"
-            "Upload a PDF, adjust settings, and click 'Describe'. "
-        )
-
-        with gr.Tabs():
-            # Generate tab
-            with gr.TabItem("Generate", id=0):
-                with gr.Row():
-                    with gr.Column(scale=1):
-                        pdf_input = gr.File(
-                            label="Upload PDF", 
-                            file_types=['.pdf'], 
-                            type="filepath"
-                        )
-                        convert_button = gr.Button(
-                            "Describe", 
-                            variant="primary"
-                        )
-                        progress_output = gr.Textbox(
-                            label="Progress", 
-                            interactive=False, 
-                            lines=2
-                        )
-                        download_button = gr.File(
-                            label="Download Markdown", 
-                            visible=False, 
-                            interactive=False
-                        )
-
-                    with gr.Column(scale=2):
-                        markdown_output = gr.Markdown(label="Result (Markdown)")
 
-            # Configuration tab
-            with gr.TabItem("Settings", id=1):
-                gr.Markdown(
-                    "Adjust settings for the *next* generation. These settings are **not** saved. "
-                    "Defaults are controlled by the `.env` file."
-                )
-                ollama_endpoint_input = gr.Textbox(
-                    label="Ollama Endpoint",
-                    value=initial_endpoint,
-                    placeholder="http://localhost:11434",
-                    info="URL of your Ollama server"
-                )
-                vlm_model_input = gr.Dropdown(
-                    label="VLM Model", 
-                    choices=suggested_vlms,
-                    value=initial_vlm,
-                    allow_custom_value=True,
-                    info="Select or type the Ollama vision model name"
-                )
-                output_language_input = gr.Dropdown(
-                    label="Output Language", 
-                    choices=suggested_languages,
-                    value=initial_lang,
-                    allow_custom_value=True,
-                    info="Select or type the desired output language (e.g., English, Spanish)"
-                )
-                page_selection_input = gr.Textbox(
-                    label="Page Selection (Optional)", 
-                    value="",
-                    placeholder="Example: 1,3,5-10,15 (leave empty for all pages)",
-                    info="Specify individual pages or ranges to process"
-                )
-                with gr.Row():
-                    use_markitdown_checkbox = gr.Checkbox(
-                        label="Use Markitdown for extra text context",
-                        value=initial_use_md
-                    )
-                    use_summary_checkbox = gr.Checkbox(
-                        label="Use PDF summary for augmented context (requires extra LLM call)",
-                        value=initial_use_sum
-                    )
-                summary_llm_model_input = gr.Dropdown(
-                    label="LLM Model for Summary", 
-                    choices=suggested_llms,
-                    value=initial_llm,
-                    allow_custom_value=True,
-                    info="Select or type the Ollama LLM model name for summaries"
-                )
-        # Connect UI components
-        conversion_inputs = [
-            pdf_input, ollama_endpoint_input, vlm_model_input, output_language_input,
-            use_markitdown_checkbox, use_summary_checkbox, summary_llm_model_input, page_selection_input
+    def build_advanced_inputs() -> List[gr.components.Component]:
+        return [
+            gr.Number(
+                label="Ollama num_batch",
+                value=initial_num_batch,
+                precision=0,
+                minimum=0,
+                info="Prompt tokens processed per batch by Ollama (0 keeps the server default)"
+            )
         ]
-        conversion_outputs = [
-            progress_output, download_button, markdown_output
-        ]
-        convert_button.click(
-            fn=convert_pdf_to_descriptive_markdown,
-            inputs=conversion_inputs,
-            outputs=conversion_outputs
-        )
 
+    initial_vlm = initial_env_config.get("ollama_vlm_model", "llama3.2-vision")
+
+    def prewarm_ollama() -> None:
+        # Check the server and load the default VLM while the user picks a file;
+        # repeated page loads reuse both results until their TTLs expire
+        if ollama_client.check_ollama_availability(initial_endpoint):
+            ollama_client.warm_up_model(initial_endpoint, initial_vlm)
+
+    iface = ui_common.make_ui(
+        handler=convert_pdf_to_descriptive_markdown,
+        build_provider_input=build_endpoint_input,
+        provider_name="Ollama",
+        initial_vlm=initial_vlm,
+        initial_llm=initial_env_config.get("ollama_summary_model", "qwen2.5"),
+        suggested_vlms=SUGGESTED_VLMS,
+        suggested_llms=SUGGESTED_LLMS,
+        build_extra_inputs=build_advanced_inputs
+    )
+    with iface:
+        iface.load(fn=prewarm_ollama, inputs=None, outputs=None, queue=False, show_progress="hidden")
     return iface
 
 def launch_app() -> None:
@@ -280,7 +187,11 @@ def launch_app() -> None:
     This function creates the Gradio UI and launches it.
     """
     app: gr.Blocks = create_ui()
-    app.launch()
+    logging.info(
+        "Tip: set OLLAMA_NUM_PARALLEL=%d and OLLAMA_MAX_LOADED_MODELS>=1 on the Ollama server for full parallelism",
+        DEFAULT_CONCURRENCY
+    )
+    app.launch(**LAUNCH_OPTIONS)
     
 if __name__ == "__main__":
     launch_app()
\ No newline at end of file
@@ -52,7 +52,7 @@ def main(args: Optional[List[str]] = None) -> int:
             from describepdf import ui
             logger.info("Starting in WEB mode with Gradio interface for OpenRouter...")
             app_ui = ui.create_ui()
-            app_ui.launch()
+            app_ui.launch(**ui.LAUNCH_OPTIONS)
             logger.info("Web UI stopped.")
             return 0
             
@@ -60,8 +60,7 @@ def main(args: Optional[List[str]] = None) -> int:
             # Start web UI with Ollama
             from describepdf import ui_ollama
             logger.info("Starting in WEB mode with Gradio interface for Ollama...")
-            app_ui = ui_ollama.create_ui()
-            app_ui.launch()
+            ui_ollama.launch_app()
             logger.info("Web UI (Ollama) stopped.")
             return 0
             
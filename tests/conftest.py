@@ -5,10 +5,55 @@ This module provides common fixtures used across multiple test modules.
 """
 
 import os
+import json
+import base64
 import pytest
+import requests
 import tempfile
+from requests.adapters import HTTPAdapter
 from unittest.mock import MagicMock, patch
 
+class DispatchAdapter(HTTPAdapter):
+    """Transport adapter that answers every request with the handler set by the current test."""
+
+    def __init__(self):
+        super().__init__()
+        self.handler = None
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        return self.handler(request)
+
+    def reply_with(self, body, status_code=200):
+        """Answer every request with an already serialized JSON body."""
+        def handler(request):
+            response = requests.Response()
+            response.status_code = status_code
+            response.headers["Content-Type"] = "application/json"
+            response._content = body
+            response.request = request
+            response.url = request.url
+            return response
+        self.handler = handler
+
+@pytest.fixture(autouse=True)
+def clear_page_cache():
+    """Keep cached page descriptions and PDF texts from leaking between tests."""
+    from describepdf import core, pdf_processor
+    core.clear_page_cache()
+    pdf_processor.clear_text_cache()
+    yield
+    core.clear_page_cache()
+    pdf_processor.clear_text_cache()
+    pdf_processor.close_scratch_doc()
+
+@pytest.fixture(scope="session")
+def cli_parser():
+    """Build the CLI argument parser once for every test that runs the CLI."""
+    from describepdf import cli
+    return cli.setup_cli_parser()
+
 # Define sample test data as fixtures
 @pytest.fixture
 def sample_pdf_content():
@@ -16,12 +61,17 @@ def sample_pdf_content():
     # This is not actually a valid PDF, just a binary stub for testing
     return b"%PDF-1.7\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\ntrailer\n<< /Root 1 0 R >>\n%%EOF"
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_image_bytes():
     """Return sample image bytes for testing the PDF renderer."""
     # This is not an actual image, just bytes for testing function calls
     return b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
 
+@pytest.fixture(scope="session")
+def sample_image_b64(sample_image_bytes):
+    """Return the sample image as the data URI sent to the OpenRouter API."""
+    return "data:image/jpeg;base64," + base64.b64encode(sample_image_bytes).decode("utf-8")
+
 @pytest.fixture
 def sample_markdown_content():
     """Return sample Markdown content for testing."""
@@ -50,6 +100,11 @@ def temp_pdf_file(sample_pdf_content):
     if os.path.exists(tmp_path):
         os.remove(tmp_path)
 
+@pytest.fixture
+def page_mocks():
+    """Return fresh page mocks limited to the attributes of a PyMuPDF page."""
+    return [MagicMock(spec_set=["number", "get_pixmap", "get_text", "rect"]) for _ in range(4)]
+
 @pytest.fixture
 def mock_pymupdf():
     """Mock the PyMuPDF module for testing PDF operations."""
@@ -85,9 +140,9 @@ def mock_pymupdf():
         if 'DESCRIBEPDF_TESTING' in os.environ:
             del os.environ['DESCRIBEPDF_TESTING']
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_openrouter_response():
-    """Return a mock OpenRouter API response."""
+    """Return a mock OpenRouter API response, shared by all tests and never modified."""
     return {
         "id": "gen_123",
         "model": "qwen/qwen2.5-vl-72b-instruct",
@@ -109,6 +164,27 @@ def mock_openrouter_response():
         }
     }
 
+@pytest.fixture(scope="session")
+def mock_openrouter_response_bytes(mock_openrouter_response):
+    """Return the mock OpenRouter API response serialized once as a JSON body."""
+    return json.dumps(mock_openrouter_response).encode("utf-8")
+
+@pytest.fixture(scope="session")
+def openrouter_session():
+    """Return a session whose OpenRouter requests are answered in-process, mounted once per session."""
+    session = requests.Session()
+    session.mount("https://openrouter.ai/", DispatchAdapter())
+    yield session
+    session.close()
+
+@pytest.fixture
+def openrouter_adapter(openrouter_session):
+    """Return the dispatch adapter of the OpenRouter session with no handler or recorded requests."""
+    adapter = openrouter_session.get_adapter("https://openrouter.ai/")
+    adapter.handler = None
+    adapter.requests.clear()
+    return adapter
+
 @pytest.fixture
 def mock_ollama_response():
     """Return a mock Ollama API response."""
@@ -122,6 +198,13 @@ def mock_ollama_response():
         "done": True
     }
 
+@pytest.fixture
+def mock_ollama_chat_client():
+    """Return a mock Ollama client whose chat call answers with a fixed message."""
+    mock_client = MagicMock()
+    mock_client.chat.return_value = {"message": {"content": "Description of the image content."}}
+    return mock_client
+
 @pytest.fixture
 def env_config_dict():
     """Return a sample environment configuration dictionary."""
@@ -0,0 +1,87 @@
+"""
+Tests for the response cache module of DescribePDF.
+
+This module tests the persistent storage of VLM responses between runs.
+"""
+
+from unittest.mock import patch
+
+from describepdf import cache
+
+class TestResponseCache:
+    """Test suite for the response cache functionality."""
+
+    def test_make_cache_key(self):
+        """Test that cache keys depend on every part and on part boundaries."""
+        # Execute test
+        key = cache.make_cache_key("model", "prompt", b"image")
+
+        # Assert results
+        assert key == cache.make_cache_key("model", "prompt", b"image")
+        assert key != cache.make_cache_key("model", "prompt", b"other image")
+        assert cache.make_cache_key("ab", "c") != cache.make_cache_key("a", "bc")
+        assert key == cache.make_cache_key("model", "prompt", memoryview(b"image"))
+
+    def test_file_digest_reused_until_file_changes(self, tmp_path):
+        """Test that an unchanged file is only hashed once."""
+        # Setup test
+        pdf_path = tmp_path / "document.pdf"
+        pdf_path.write_bytes(b"%PDF-1.7 first version")
+        first_digest = cache.file_digest(str(pdf_path))
+
+        # Execute test
+        with patch('describepdf.cache.open', side_effect=AssertionError("file read again"), create=True):
+            second_digest = cache.file_digest(str(pdf_path))
+        pdf_path.write_bytes(b"%PDF-1.7 second, longer version")
+        changed_digest = cache.file_digest(str(pdf_path))
+
+        # Assert results
+        assert second_digest == first_digest
+        assert changed_digest != first_digest
+
+    def test_sqlite_fallback_roundtrip(self, tmp_path):
+        """Test storing and reading responses without diskcache installed."""
+        # Setup test
+        with patch('describepdf.cache.DISKCACHE_AVAILABLE', False):
+            response_cache = cache.ResponseCache(str(tmp_path))
+
+            # Execute test
+            response_cache.set("key", "Description of the page")
+            response_cache.close()
+            reopened = cache.ResponseCache(str(tmp_path))
+
+            # Assert results
+            assert reopened.get("key") == "Description of the page"
+            assert reopened.get("missing") is None
+
+            reopened.clear()
+            assert reopened.get("key") is None
+            reopened.close()
+
+    def test_get_response_cache_open_error(self):
+        """Test that an unusable cache directory disables the cache instead of failing."""
+        # Setup test
+        with patch('describepdf.cache._RESPONSE_CACHE', None), \
+             patch('describepdf.cache.ResponseCache', side_effect=OSError("read-only file system")):
+
+            # Execute test
+            result = cache.get_response_cache()
+
+            # Assert results
+            assert result is None
+
+    def test_clear_response_cache_not_created(self, tmp_path):
+        """Test that clearing a response cache that was never used does not create it."""
+        # Setup test
+        cache_dir = tmp_path / "describepdf"
+
+        with patch('describepdf.cache._RESPONSE_CACHE', None), \
+             patch('describepdf.cache.DEFAULT_CACHE_DIR', str(cache_dir)), \
+             patch('describepdf.cache.ResponseCache') as mock_response_cache:
+
+            # Execute test
+            cache.clear_response_cache()
+
+            # Assert results
+            mock_response_cache.assert_not_called()
+            assert not cache_dir.exists()
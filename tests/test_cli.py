@@ -4,11 +4,39 @@ Tests for the command-line interface module of DescribePDF.
 This module tests the CLI functionality for converting PDF files to markdown descriptions.
 """
 
-from unittest.mock import patch, MagicMock, call
+import sys
+import logging
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock, call, mock_open
 from argparse import Namespace
 
 from describepdf import cli
 
+@pytest.fixture
+def cli_env(monkeypatch, cli_parser):
+    """
+    Patch everything run_cli depends on for a successful OpenRouter conversion.
+
+    Tests set cli_env.args and override only the behavior they exercise;
+    sys.exit raises SystemExit so a failed run stops where it exits.
+    """
+    env = SimpleNamespace(
+        args=None,
+        config={"openrouter_api_key": "test_key"},
+        convert=MagicMock(return_value=("Conversion completed successfully.", "# Markdown content")),
+        exit=MagicMock(side_effect=SystemExit(1))
+    )
+    monkeypatch.setattr(cli, "setup_cli_parser", lambda: cli_parser)
+    monkeypatch.setattr(cli_parser, "parse_args", lambda: env.args)
+    monkeypatch.setattr("os.path.exists", lambda path: True)
+    monkeypatch.setattr("os.path.isfile", lambda path: True)
+    monkeypatch.setattr(cli.config, "get_config", lambda: env.config)
+    monkeypatch.setattr(cli.core, "convert_pdf_to_markdown", env.convert)
+    monkeypatch.setattr(cli, "create_progress_callback", MagicMock())
+    monkeypatch.setattr(sys, "exit", env.exit)
+    return env
+
 class TestCLI:
     """Test suite for the CLI functionality."""
 
@@ -33,6 +61,8 @@ class TestCLI:
         assert "use_markitdown" in actions
         assert "use_summary" in actions
         assert "summary_model" in actions
+        assert "parallel_pages" in actions
+        assert "response_cache" in actions
         assert "verbose" in actions
 
     def test_create_progress_callback(self):
@@ -63,178 +93,172 @@ class TestCLI:
             # Verify tqdm was closed at the end
             mock_tqdm.close.assert_called_once()
 
-    def test_run_cli_file_not_found(self):
+    def test_run_cli_file_not_found(self, cli_env, monkeypatch):
         """Test handling when the input PDF file does not exist."""
         # Setup test
-        args = Namespace(
+        cli_env.args = Namespace(
             pdf_file="nonexistent.pdf",
             output=None,
             api_key=None,
             local=False,
             endpoint=None,
             vlm_model=None,
+            pages=None,
             language=None,
             use_markitdown=None,
             use_summary=None,
             summary_model=None,
+            parallel_pages=None,
+            response_cache=False,
             verbose=False
         )
+        monkeypatch.setattr("os.path.exists", lambda path: False)
         
-        with patch('describepdf.cli.setup_cli_parser', return_value=MagicMock()), \
-             patch('describepdf.cli.setup_cli_parser().parse_args', return_value=args), \
-             patch('os.path.exists', return_value=False), \
-             patch('sys.exit') as mock_exit:
-            
-            # Execute test
+        # Execute test
+        with pytest.raises(SystemExit):
             cli.run_cli()
-            
-            # Assert results
-            mock_exit.assert_called_once_with(1)
+        
+        # Assert results
+        cli_env.exit.assert_called_once_with(1)
+        cli_env.convert.assert_not_called()
 
-    def test_run_cli_verbose_mode(self):
+    def test_run_cli_verbose_mode(self, cli_env):
         """Test setting up logging when verbose mode is enabled."""
         # Setup test
-        args = Namespace(
+        cli_env.args = Namespace(
             pdf_file="test.pdf",
             output=None,
             api_key=None,
             local=False,
             endpoint=None,
             vlm_model=None,
+            pages=None,
             language=None,
             use_markitdown=None,
             use_summary=None,
             summary_model=None,
+            parallel_pages=None,
+            response_cache=False,
             verbose=True
         )
+        cli_env.convert.return_value = ("Error", None)
         
-        with patch('describepdf.cli.setup_cli_parser', return_value=MagicMock()), \
-             patch('describepdf.cli.setup_cli_parser().parse_args', return_value=args), \
-             patch('os.path.exists', return_value=True), \
-             patch('os.path.isfile', return_value=True), \
-             patch('describepdf.cli.config.get_config', return_value={}), \
-             patch('describepdf.cli.core.convert_pdf_to_markdown', return_value=("Error", None)), \
-             patch('describepdf.cli.logger.setLevel') as mock_set_level, \
-             patch('sys.exit'):
-            
+        with patch('describepdf.cli.logger.setLevel') as mock_set_level:
             # Execute test
-            cli.run_cli()
+            with pytest.raises(SystemExit):
+                cli.run_cli()
             
             # Assert results
-            import logging
             mock_set_level.assert_called_once_with(logging.DEBUG)
 
-    def test_run_cli_missing_openrouter_api_key(self):
+    def test_run_cli_missing_openrouter_api_key(self, cli_env):
         """Test handling when OpenRouter API key is required but missing."""
         # Setup test
-        args = Namespace(
+        cli_env.args = Namespace(
             pdf_file="test.pdf",
             output=None,
             api_key=None,
             local=False,
             endpoint=None,
             vlm_model=None,
+            pages=None,
             language=None,
             use_markitdown=None,
             use_summary=None,
             summary_model=None,
+            parallel_pages=None,
+            response_cache=False,
             verbose=False
         )
+        cli_env.config = {"openrouter_api_key": None}
         
-        with patch('describepdf.cli.setup_cli_parser', return_value=MagicMock()), \
-             patch('describepdf.cli.setup_cli_parser().parse_args', return_value=args), \
-             patch('os.path.exists', return_value=True), \
-             patch('os.path.isfile', return_value=True), \
-             patch('describepdf.cli.config.get_config', return_value={"openrouter_api_key": None}), \
-             patch('sys.exit') as mock_exit:
-            
-            # Execute test
+        # Execute test
+        with pytest.raises(SystemExit):
             cli.run_cli()
-            
-            # Assert results
-            mock_exit.assert_called_once_with(1)
+        
+        # Assert results
+        cli_env.exit.assert_called_once_with(1)
+        cli_env.convert.assert_not_called()
 
-    def test_run_cli_ollama_not_available(self):
+    def test_run_cli_ollama_not_available(self, cli_env, monkeypatch):
         """Test handling when Ollama is requested but not available."""
         # Setup test
-        args = Namespace(
+        cli_env.args = Namespace(
             pdf_file="test.pdf",
             output=None,
             api_key=None,
             local=True,  # Use Ollama
             endpoint=None,
             vlm_model=None,
+            pages=None,
             language=None,
             use_markitdown=None,
             use_summary=None,
             summary_model=None,
+            parallel_pages=None,
+            response_cache=False,
             verbose=False
         )
+        cli_env.config = {"ollama_endpoint": "http://localhost:11434"}
+        monkeypatch.setattr(cli.ollama_client, "OLLAMA_AVAILABLE", False)
         
-        with patch('describepdf.cli.setup_cli_parser', return_value=MagicMock()), \
-             patch('describepdf.cli.setup_cli_parser().parse_args', return_value=args), \
-             patch('os.path.exists', return_value=True), \
-             patch('os.path.isfile', return_value=True), \
-             patch('describepdf.cli.config.get_config', return_value={"ollama_endpoint": "http://localhost:11434"}), \
-             patch('describepdf.cli.ollama_client.OLLAMA_AVAILABLE', False), \
-             patch('sys.exit') as mock_exit:
-            
-            # Execute test
+        # Execute test
+        with pytest.raises(SystemExit):
             cli.run_cli()
-            
-            # Assert results
-            mock_exit.assert_called_once_with(1)
+        
+        # Assert results
+        cli_env.exit.assert_called_once_with(1)
 
-    def test_run_cli_ollama_not_running(self):
+    def test_run_cli_ollama_not_running(self, cli_env, monkeypatch):
         """Test handling when Ollama is not running."""
         # Setup test
-        args = Namespace(
+        cli_env.args = Namespace(
             pdf_file="test.pdf",
             output=None,
             api_key=None,
             local=True,  # Use Ollama
             endpoint=None,
             vlm_model=None,
+            pages=None,
             language=None,
             use_markitdown=None,
             use_summary=None,
             summary_model=None,
+            parallel_pages=None,
+            response_cache=False,
             verbose=False
         )
+        cli_env.config = {"ollama_endpoint": "http://localhost:11434"}
+        monkeypatch.setattr(cli.ollama_client, "OLLAMA_AVAILABLE", True)
+        monkeypatch.setattr(cli.ollama_client, "check_ollama_availability", lambda endpoint: False)
         
-        with patch('describepdf.cli.setup_cli_parser', return_value=MagicMock()), \
-             patch('describepdf.cli.setup_cli_parser().parse_args', return_value=args), \
-             patch('os.path.exists', return_value=True), \
-             patch('os.path.isfile', return_value=True), \
-             patch('describepdf.cli.config.get_config', return_value={"ollama_endpoint": "http://localhost:11434"}), \
-             patch('describepdf.cli.ollama_client.OLLAMA_AVAILABLE', True), \
-             patch('describepdf.cli.ollama_client.check_ollama_availability', return_value=False), \
-             patch('sys.exit') as mock_exit:
-            
-            # Execute test
+        # Execute test
+        with pytest.raises(SystemExit):
             cli.run_cli()
-            
-            # Assert results
-            mock_exit.assert_called_once_with(1)
+        
+        # Assert results
+        cli_env.exit.assert_called_once_with(1)
 
-    def test_run_cli_successful_conversion(self):
+    def test_run_cli_successful_conversion(self, cli_env):
         """Test successful conversion and saving of result."""
         # Setup test
-        args = Namespace(
+        cli_env.args = Namespace(
             pdf_file="test.pdf",
             output="output.md",
             api_key="test_key",
             local=False,
             endpoint=None,
             vlm_model="test_model",
+            pages=None,
             language="English",
             use_markitdown=True,
             use_summary=False,
             summary_model=None,
+            parallel_pages=None,
+            response_cache=False,
             verbose=False
         )
-        
-        env_config = {
+        cli_env.config = {
             "openrouter_api_key": "env_key",
             "or_vlm_model": "env_model",
             "output_language": "Spanish",
@@ -242,152 +266,129 @@ class TestCLI:
             "use_summary": False
         }
         
-        with patch('describepdf.cli.setup_cli_parser', return_value=MagicMock()), \
-             patch('describepdf.cli.setup_cli_parser().parse_args', return_value=args), \
-             patch('os.path.exists', return_value=True), \
-             patch('os.path.isfile', return_value=True), \
-             patch('describepdf.cli.config.get_config', return_value=env_config), \
-             patch('describepdf.cli.create_progress_callback', return_value=MagicMock()), \
-             patch('describepdf.cli.core.convert_pdf_to_markdown', 
-                   return_value=("Conversion completed successfully.", "# Markdown content")), \
-             patch('builtins.open', MagicMock()):
-            
+        with patch('describepdf.cli.open', new_callable=mock_open, create=True) as mock_file:
             # Execute test
             cli.run_cli()
             
             # Assert results
             # Verify convert_pdf_to_markdown was called with the correct configuration
-            _, kwargs = cli.core.convert_pdf_to_markdown.call_args
-            assert kwargs["pdf_path"] == "test.pdf"
-            assert kwargs["cfg"]["provider"] == "openrouter"
-            assert kwargs["cfg"]["openrouter_api_key"] == "test_key"  # From args, not env
-            assert kwargs["cfg"]["vlm_model"] == "test_model"  # From args, not env
-            assert kwargs["cfg"]["output_language"] == "English"  # From args, not env
-            assert kwargs["cfg"]["use_markitdown"] is True  # From args, not env
+            pdf_path, cfg, _ = cli_env.convert.call_args.args
+            assert pdf_path == "test.pdf"
+            assert cfg["provider"] == "openrouter"
+            assert cfg["openrouter_api_key"] == "test_key"  # From args, not env
+            assert cfg["vlm_model"] == "test_model"  # From args, not env
+            assert cfg["output_language"] == "English"  # From args, not env
+            assert cfg["use_markitdown"] is True  # From args, not env
             
             # Verify file was opened for writing
-            open.assert_called_once_with("output.md", "w", encoding="utf-8")
+            mock_file.assert_called_once_with("output.md", "w", encoding="utf-8")
+            mock_file().write.assert_called_once_with("# Markdown content")
+            cli_env.exit.assert_not_called()
 
-    def test_run_cli_default_output_filename(self):
+    def test_run_cli_default_output_filename(self, cli_env):
         """Test generation of default output filename when not specified."""
         # Setup test
-        args = Namespace(
+        cli_env.args = Namespace(
             pdf_file="test.pdf",
             output=None,  # No output specified
             api_key="test_key",
             local=False,
             endpoint=None,
             vlm_model=None,
+            pages=None,
             language=None,
             use_markitdown=None,
             use_summary=None,
             summary_model=None,
+            parallel_pages=None,
+            response_cache=False,
             verbose=False
         )
         
-        with patch('describepdf.cli.setup_cli_parser', return_value=MagicMock()), \
-             patch('describepdf.cli.setup_cli_parser().parse_args', return_value=args), \
-             patch('os.path.exists', return_value=True), \
-             patch('os.path.isfile', return_value=True), \
-             patch('describepdf.cli.config.get_config', return_value={"openrouter_api_key": "test_key"}), \
-             patch('describepdf.cli.create_progress_callback', return_value=MagicMock()), \
-             patch('describepdf.cli.core.convert_pdf_to_markdown', 
-                   return_value=("Conversion completed successfully.", "# Markdown content")), \
-             patch('builtins.open', MagicMock()):
-            
+        with patch('describepdf.cli.open', new_callable=mock_open, create=True) as mock_file:
             # Execute test
             cli.run_cli()
             
             # Assert results
             # Verify file was opened with default filename
-            open.assert_called_once_with("test_description.md", "w", encoding="utf-8")
+            mock_file.assert_called_once_with("test_description.md", "w", encoding="utf-8")
 
-    def test_run_cli_conversion_failure(self):
+    def test_run_cli_conversion_failure(self, cli_env):
         """Test handling when conversion fails."""
         # Setup test
-        args = Namespace(
+        cli_env.args = Namespace(
             pdf_file="test.pdf",
             output=None,
             api_key="test_key",
             local=False,
             endpoint=None,
             vlm_model=None,
+            pages=None,
             language=None,
             use_markitdown=None,
             use_summary=None,
             summary_model=None,
+            parallel_pages=None,
+            response_cache=False,
             verbose=False
         )
+        cli_env.convert.return_value = ("Error in conversion.", None)
         
-        with patch('describepdf.cli.setup_cli_parser', return_value=MagicMock()), \
-             patch('describepdf.cli.setup_cli_parser().parse_args', return_value=args), \
-             patch('os.path.exists', return_value=True), \
-             patch('os.path.isfile', return_value=True), \
-             patch('describepdf.cli.config.get_config', return_value={"openrouter_api_key": "test_key"}), \
-             patch('describepdf.cli.create_progress_callback', return_value=MagicMock()), \
-             patch('describepdf.cli.core.convert_pdf_to_markdown', 
-                   return_value=("Error in conversion.", None)), \
-             patch('sys.exit') as mock_exit:
-            
-            # Execute test
+        # Execute test
+        with pytest.raises(SystemExit):
             cli.run_cli()
-            
-            # Assert results
-            mock_exit.assert_called_once_with(1)
+        
+        # Assert results
+        cli_env.exit.assert_called_once_with(1)
 
-    def test_run_cli_error_saving_output(self):
+    def test_run_cli_error_saving_output(self, cli_env):
         """Test handling when saving output file fails."""
         # Setup test
-        args = Namespace(
+        cli_env.args = Namespace(
             pdf_file="test.pdf",
             output="output.md",
             api_key="test_key",
             local=False,
             endpoint=None,
             vlm_model=None,
+            pages=None,
             language=None,
             use_markitdown=None,
             use_summary=None,
             summary_model=None,
+            parallel_pages=None,
+            response_cache=False,
             verbose=False
         )
         
-        with patch('describepdf.cli.setup_cli_parser', return_value=MagicMock()), \
-             patch('describepdf.cli.setup_cli_parser().parse_args', return_value=args), \
-             patch('os.path.exists', return_value=True), \
-             patch('os.path.isfile', return_value=True), \
-             patch('describepdf.cli.config.get_config', return_value={"openrouter_api_key": "test_key"}), \
-             patch('describepdf.cli.create_progress_callback', return_value=MagicMock()), \
-             patch('describepdf.cli.core.convert_pdf_to_markdown', 
-                   return_value=("Conversion completed successfully.", "# Markdown content")), \
-             patch('builtins.open', side_effect=IOError("Permission denied")), \
-             patch('sys.exit') as mock_exit:
-            
+        with patch('describepdf.cli.open', side_effect=IOError("Permission denied"), create=True):
             # Execute test
-            cli.run_cli()
+            with pytest.raises(SystemExit):
+                cli.run_cli()
             
             # Assert results
-            mock_exit.assert_called_once_with(1)
+            cli_env.exit.assert_called_once_with(1)
     
-    def test_run_cli_with_page_selection(self):
+    def test_run_cli_with_page_selection(self, cli_env):
         """Test running CLI with page selection."""
         # Setup test
-        args = Namespace(
+        cli_env.args = Namespace(
             pdf_file="test.pdf",
             output=None,
             api_key="test_key",
             local=False,
             endpoint=None,
             vlm_model=None,
+            pages="1,3,5-10",
             language=None,
             use_markitdown=None,
             use_summary=None,
             summary_model=None,
-            verbose=False,
-            pages="1,3,5-10"
+            parallel_pages=None,
+            response_cache=False,
+            verbose=False
         )
-        
-        env_config = {
+        cli_env.config = {
             "openrouter_api_key": "env_key",
             "or_vlm_model": "env_model",
             "output_language": "Spanish",
@@ -395,21 +396,42 @@ class TestCLI:
             "use_summary": False
         }
         
-        with patch('describepdf.cli.setup_cli_parser', return_value=MagicMock()), \
-            patch('describepdf.cli.setup_cli_parser().parse_args', return_value=args), \
-            patch('os.path.exists', return_value=True), \
-            patch('os.path.isfile', return_value=True), \
-            patch('describepdf.cli.config.get_config', return_value=env_config), \
-            patch('describepdf.cli.create_progress_callback', return_value=MagicMock()), \
-            patch('describepdf.cli.core.convert_pdf_to_markdown', 
-                return_value=("Conversion completed successfully.", "# Markdown content")), \
-            patch('builtins.open', MagicMock()):
-            
+        with patch('describepdf.cli.open', new_callable=mock_open, create=True) as mock_file:
             # Execute test
             cli.run_cli()
             
             # Assert results
             # Verify convert_pdf_to_markdown was called with the correct configuration
-            _, kwargs = cli.core.convert_pdf_to_markdown.call_args
-            assert kwargs["cfg"]["provider"] == "openrouter"
-            assert kwargs["cfg"]["page_selection"] == "1,3,5-10" 
\ No newline at end of file
+            _, cfg, _ = cli_env.convert.call_args.args
+            assert cfg["provider"] == "openrouter"
+            assert cfg["page_selection"] == "1,3,5-10"
+            mock_file().write.assert_called_once_with("# Markdown content")
+
+    def test_run_cli_response_cache_flag(self, cli_env):
+        """Test that --response-cache enables the on-disk response cache for the run."""
+        # Setup test
+        cli_env.args = Namespace(
+            pdf_file="test.pdf",
+            output=None,
+            api_key="test_key",
+            local=False,
+            endpoint=None,
+            vlm_model=None,
+            pages=None,
+            language=None,
+            use_markitdown=None,
+            use_summary=None,
+            summary_model=None,
+            parallel_pages=None,
+            response_cache=True,
+            verbose=False
+        )
+        cli_env.config = {"openrouter_api_key": "test_key", "use_response_cache": False}
+        
+        with patch('describepdf.cli.open', new_callable=mock_open, create=True):
+            # Execute test
+            cli.run_cli()
+            
+            # Assert results
+            _, cfg, _ = cli_env.convert.call_args.args
+            assert cfg["use_response_cache"] is True
@@ -0,0 +1,111 @@
+"""
+Tests for the configuration module of DescribePDF.
+
+This module tests loading and caching of the prompt templates.
+"""
+
+import os
+from unittest.mock import patch
+
+from describepdf import config
+
+class TestConfig:
+    """Test suite for the configuration functionality."""
+
+    def test_get_required_prompts_for_config(self):
+        """Test that the prompts match the enabled features."""
+        # Setup test
+        templates = {key: f"Template {key}" for key in config.PROMPT_FILES}
+        config.clear_prompt_cache()
+
+        with patch('describepdf.config.load_prompt_templates', return_value=templates):
+            # Execute test
+            base_prompts = config.get_required_prompts_for_config({})
+            full_prompts = config.get_required_prompts_for_config({"use_markitdown": True, "use_summary": True})
+
+            # Assert results
+            assert set(base_prompts) == {"vlm_base"}
+            assert set(full_prompts) == {"vlm_base", "vlm_full", "summary"}
+
+        config.clear_prompt_cache()
+
+    def test_get_required_prompts_for_config_reads_files_once(self):
+        """Test that prompt files are only read once across conversions."""
+        # Setup test
+        templates = {key: f"Template {key}" for key in config.PROMPT_FILES}
+        config.clear_prompt_cache()
+
+        with patch('describepdf.config.load_prompt_templates', return_value=templates) as mock_load:
+            # Execute test
+            first = config.get_required_prompts_for_config({"use_summary": True})
+            second = config.get_required_prompts_for_config({"use_summary": True, "vlm_model": "other"})
+
+            # Assert results
+            assert first is second
+            mock_load.assert_called_once()
+
+        config.clear_prompt_cache()
+
+    def test_get_required_prompts_for_config_missing_template(self):
+        """Test that an incomplete selection is reported and not cached."""
+        # Setup test
+        config.clear_prompt_cache()
+
+        with patch('describepdf.config.load_prompt_templates', return_value={"vlm_base": "Template"}):
+            # Execute test
+            result = config.get_required_prompts_for_config({"use_summary": True})
+
+            # Assert results
+            assert result == {}
+            assert config._REQUIRED_PROMPTS_CACHE == {}
+
+        config.clear_prompt_cache()
+
+    def test_get_prompts_cached(self, tmp_path, monkeypatch):
+        """Test that prompt files are read once and read again only after they change."""
+        # Setup test
+        for key, filename in config.PROMPT_FILES.items():
+            (tmp_path / filename).write_text(f"Template {key}", encoding="utf-8")
+        monkeypatch.setattr(config, 'PROMPTS_DIR', tmp_path)
+        monkeypatch.setattr(config, 'PROMPTS_CHECK_INTERVAL', 0)
+        config.clear_prompt_cache()
+
+        with patch('describepdf.config.open', wraps=open, create=True) as mock_open:
+            # Execute test
+            first = config.get_prompts()
+            second = config.get_prompts()
+            reads_before_change = mock_open.call_count
+
+            summary_path = tmp_path / config.PROMPT_FILES["summary"]
+            summary_path.write_text("Edited summary", encoding="utf-8")
+            mtime_ns = summary_path.stat().st_mtime_ns + 1_000_000_000
+            os.utime(summary_path, ns=(mtime_ns, mtime_ns))
+            third = config.get_prompts()
+
+            # Assert results
+            assert second is first
+            assert reads_before_change == len(config.PROMPT_FILES)
+            assert third["summary"] == "Edited summary"
+
+        config.clear_prompt_cache()
+
+    def test_get_prompts_checks_files_once_per_interval(self, tmp_path, monkeypatch):
+        """Test that the prompt files are not checked again within the check interval."""
+        # Setup test
+        for key, filename in config.PROMPT_FILES.items():
+            (tmp_path / filename).write_text(f"Template {key}", encoding="utf-8")
+        monkeypatch.setattr(config, 'PROMPTS_DIR', tmp_path)
+        monkeypatch.setattr(config, 'PROMPTS_CHECK_INTERVAL', 60)
+        config.clear_prompt_cache()
+
+        with patch('describepdf.config._prompt_files_signature',
+                   wraps=config._prompt_files_signature) as mock_signature:
+            # Execute test
+            config.get_prompts()
+            config.get_prompts()
+            config.get_required_prompts_for_config({"use_summary": True})
+
+            # Assert results
+            assert mock_signature.call_count == 1
+
+        config.clear_prompt_cache()
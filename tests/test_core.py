@@ -4,9 +4,13 @@ Tests for the core module of DescribePDF.
 This module tests the main orchestration logic for converting PDFs to Markdown descriptions.
 """
 
+import time
+import threading
+import pytest
 from unittest.mock import patch, MagicMock, call
 
 from describepdf import core
+from describepdf import cache
 
 class TestCore:
     """Test suite for the core functionality."""
@@ -141,6 +145,7 @@ class TestCore:
              patch('os.path.isfile', return_value=True), \
              patch('describepdf.core.config.get_required_prompts_for_config', 
                    return_value={"vlm_base": "Test prompt", "summary": "Summary prompt"}), \
+             patch('describepdf.core.pdf_processor.extract_all_text', return_value="Document text"), \
              patch('describepdf.core.summarizer.generate_summary', return_value="Generated summary"):
             
             # Mock PDF loading to fail after summary to simplify test
@@ -155,7 +160,8 @@ class TestCore:
                     provider="openrouter", 
                     api_key="test_key", 
                     ollama_endpoint=None, 
-                    model="test_model"
+                    model="test_model",
+                    full_text="Document text"
                 )
 
     def test_convert_pdf_to_markdown_summary_generation_failure(self):
@@ -173,6 +179,7 @@ class TestCore:
              patch('os.path.isfile', return_value=True), \
              patch('describepdf.core.config.get_required_prompts_for_config', 
                    return_value={"vlm_base": "Test prompt"}), \
+             patch('describepdf.core.pdf_processor.extract_all_text', return_value="Document text"), \
              patch('describepdf.core.summarizer.generate_summary', return_value=None):
             
             # Mock PDF loading to fail after summary to simplify test
@@ -250,7 +257,7 @@ class TestCore:
                    return_value={"vlm_base": "Describe page [PAGE_NUM] in [LANGUAGE]:"}), \
              patch('describepdf.core.pdf_processor.get_pdf_pages', return_value=(mock_doc, mock_pages, 2)), \
              patch('describepdf.core.pdf_processor.render_page_to_image_bytes', 
-                   return_value=(b"image_data", "image/jpeg")), \
+                   side_effect=[(b"image_page_1", "image/jpeg"), (b"image_page_2", "image/jpeg")]), \
              patch('describepdf.core.openrouter_client.get_vlm_description', 
                    side_effect=["Description for page 1", "Description for page 2"]):
             
@@ -272,6 +279,265 @@ class TestCore:
             # Verify document was closed
             mock_doc.close.assert_called_once()
 
+    def test_stream_convert_pdf_to_markdown_yields_per_page(self):
+        """Test that streaming conversion yields cumulative Markdown after each page."""
+        # Setup test
+        config = {
+            "provider": "openrouter",
+            "openrouter_api_key": "test_key",
+            "vlm_model": "test_model",
+            "output_language": "English",
+            "use_markitdown": False,
+            "use_summary": False
+        }
+        progress_callback = MagicMock()
+        
+        # Create mock document and pages
+        mock_doc = MagicMock()
+        mock_pages = [MagicMock(number=0), MagicMock(number=1)]
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('os.path.isfile', return_value=True), \
+             patch('describepdf.core.config.get_required_prompts_for_config', 
+                   return_value={"vlm_base": "Describe page [PAGE_NUM] in [LANGUAGE]:"}), \
+             patch('describepdf.core.pdf_processor.get_pdf_pages', return_value=(mock_doc, mock_pages, 2)), \
+             patch('describepdf.core.pdf_processor.render_page_to_image_bytes', 
+                   side_effect=[(b"image_page_1", "image/jpeg"), (b"image_page_2", "image/jpeg")]), \
+             patch('describepdf.core.openrouter_client.get_vlm_description', 
+                   side_effect=["Description for page 1", "Description for page 2"]):
+            
+            # Execute test
+            results = list(core.stream_convert_pdf_to_markdown("test.pdf", config, progress_callback))
+            
+            # Assert results
+            assert len(results) == 3  # One partial result per page plus the final result
+            assert "Description for page 1" in results[0][1]
+            assert "## Page 2" not in results[0][1]
+            assert "Description for page 2" in results[1][1]
+            
+            final_status, final_markdown = results[-1]
+            assert "Conversion completed successfully" in final_status
+            assert final_markdown == results[1][1]
+            
+            # Verify document was closed
+            mock_doc.close.assert_called_once()
+
+    def test_convert_pdf_to_markdown_parallel_pages_keep_order(self):
+        """Test that pages described in parallel are assembled in document order."""
+        # Setup test
+        config = {
+            "provider": "openrouter",
+            "openrouter_api_key": "test_key",
+            "vlm_model": "test_model",
+            "output_language": "English",
+            "use_markitdown": False,
+            "use_summary": False,
+            "max_parallel_pages": 3
+        }
+        progress_callback = MagicMock()
+        
+        # Create mock document and pages; earlier pages take longer to describe
+        mock_doc = MagicMock()
+        mock_pages = [MagicMock(number=i) for i in range(3)]
+        
+        def slow_description(api_key, model, prompt, image_bytes, mime_type):
+            page_num = int(image_bytes.decode().rsplit("_", 1)[1])
+            time.sleep(0.05 * (3 - page_num))
+            return f"Description for page {page_num}"
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('os.path.isfile', return_value=True), \
+             patch('describepdf.core.config.get_required_prompts_for_config', 
+                   return_value={"vlm_base": "Describe page [PAGE_NUM] in [LANGUAGE]:"}), \
+             patch('describepdf.core.pdf_processor.get_pdf_pages', return_value=(mock_doc, mock_pages, 3)), \
+             patch('describepdf.core.pdf_processor.render_page_to_image_bytes', 
+                   side_effect=[(f"image_page_{i}".encode(), "image/jpeg") for i in range(1, 4)]), \
+             patch('describepdf.core.openrouter_client.get_vlm_description', side_effect=slow_description):
+            
+            # Execute test
+            results = list(core.stream_convert_pdf_to_markdown("test.pdf", config, progress_callback))
+            
+            # Assert results
+            assert len(results) == 4
+            final_status, final_markdown = results[-1]
+            assert "Conversion completed successfully" in final_status
+            positions = [final_markdown.index(f"Description for page {i}") for i in range(1, 4)]
+            assert positions == sorted(positions)
+            
+            # Partial results only ever grow by appending pages
+            for previous, current in zip(results, results[1:]):
+                assert current[1].startswith(previous[1])
+            
+            # Progress never goes backwards while pages finish out of order
+            reported = [c.args[0] for c in progress_callback.call_args_list]
+            assert reported == sorted(reported)
+
+    def test_convert_pdf_to_markdown_parallel_pages_overlap(self):
+        """Test that VLM requests for different pages run at the same time."""
+        # Setup test
+        config = {
+            "provider": "openrouter",
+            "openrouter_api_key": "test_key",
+            "vlm_model": "test_model",
+            "output_language": "English",
+            "use_markitdown": False,
+            "use_summary": False,
+            "max_parallel_pages": 4
+        }
+        progress_callback = MagicMock()
+        mock_doc = MagicMock()
+        mock_pages = [MagicMock(number=i) for i in range(4)]
+        
+        # Every request waits until all four are in flight
+        all_in_flight = threading.Barrier(4, timeout=5)
+        
+        def description(api_key, model, prompt, image_bytes, mime_type):
+            all_in_flight.wait()
+            return f"Description for {image_bytes.decode()}"
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('os.path.isfile', return_value=True), \
+             patch('describepdf.core.config.get_required_prompts_for_config', 
+                   return_value={"vlm_base": "Describe page [PAGE_NUM] in [LANGUAGE]:"}), \
+             patch('describepdf.core.pdf_processor.get_pdf_pages', return_value=(mock_doc, mock_pages, 4)), \
+             patch('describepdf.core.pdf_processor.render_page_to_image_bytes', 
+                   side_effect=[(f"image_page_{i}".encode(), "image/jpeg") for i in range(1, 5)]), \
+             patch('describepdf.core.openrouter_client.get_vlm_description', side_effect=description):
+            
+            # Execute test
+            status, markdown = core.convert_pdf_to_markdown("test.pdf", config, progress_callback)
+            
+            # Assert results
+            assert "Conversion completed successfully" in status
+            for i in range(1, 5):
+                assert f"Description for image_page_{i}" in markdown
+
+    def test_convert_pdf_to_markdown_renders_next_page_during_description(self):
+        """Test that the next page is rendered while the previous one is still being described."""
+        # Setup test
+        config = {
+            "provider": "openrouter",
+            "openrouter_api_key": "test_key",
+            "vlm_model": "test_model",
+            "output_language": "English",
+            "use_markitdown": False,
+            "use_summary": False,
+            "max_parallel_pages": 1
+        }
+        progress_callback = MagicMock()
+        mock_doc = MagicMock()
+        mock_pages = [MagicMock(number=i) for i in range(2)]
+        
+        # Page 1 is only described once page 2 has been rendered
+        page_2_rendered = threading.Event()
+        
+        def render(page, **kwargs):
+            if page.number == 1:
+                page_2_rendered.set()
+            return f"image_page_{page.number + 1}".encode(), "image/jpeg"
+        
+        def description(api_key, model, prompt, image_bytes, mime_type):
+            assert page_2_rendered.wait(timeout=5)
+            return f"Description for {image_bytes.decode()}"
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('os.path.isfile', return_value=True), \
+             patch('describepdf.core.config.get_required_prompts_for_config', 
+                   return_value={"vlm_base": "Describe page [PAGE_NUM] in [LANGUAGE]:"}), \
+             patch('describepdf.core.pdf_processor.get_pdf_pages', return_value=(mock_doc, mock_pages, 2)), \
+             patch('describepdf.core.pdf_processor.render_page_to_image_bytes', side_effect=render), \
+             patch('describepdf.core.openrouter_client.get_vlm_description', side_effect=description):
+            
+            # Execute test
+            final_status, final_markdown = list(core.stream_convert_pdf_to_markdown("test.pdf", config, progress_callback))[-1]
+            
+            # Assert results
+            assert "Conversion completed successfully" in final_status
+            assert final_markdown.index("image_page_1") < final_markdown.index("image_page_2")
+
+    def test_stream_convert_pdf_to_markdown_streams_page_text(self):
+        """Test that the text of the page being described is previewed while it streams."""
+        # Setup test
+        config = {
+            "provider": "ollama",
+            "ollama_endpoint": "http://localhost:11434",
+            "vlm_model": "llama3.2-vision",
+            "output_language": "English",
+            "use_markitdown": False,
+            "use_summary": False,
+            "stream_page_text": True
+        }
+        progress_callback = MagicMock()
+        mock_doc = MagicMock()
+        
+        def streamed_description(endpoint, model, prompt, image_bytes, mime_type, on_partial=None, options=None):
+            on_partial("Partial\n\n---\n\n---\n\nmore")
+            time.sleep(0.05)
+            return "Partial description"
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('os.path.isfile', return_value=True), \
+             patch('describepdf.core.ollama_client.OLLAMA_AVAILABLE', True), \
+             patch('describepdf.core.ollama_client.check_ollama_availability', return_value=True), \
+             patch('describepdf.core.config.get_required_prompts_for_config', 
+                   return_value={"vlm_base": "Describe page [PAGE_NUM] in [LANGUAGE]:"}), \
+             patch('describepdf.core.pdf_processor.get_pdf_pages', return_value=(mock_doc, [MagicMock(number=0)], 1)), \
+             patch('describepdf.core.pdf_processor.render_page_to_image_bytes', return_value=(b"image_page_1", "image/jpeg")), \
+             patch('describepdf.core.ollama_client.get_vlm_description', side_effect=streamed_description):
+            
+            # Execute test
+            results = list(core.stream_convert_pdf_to_markdown("test.pdf", config, progress_callback))
+            
+            # Assert results - a preview without page separator, then the finished page
+            preview_status, preview_markdown = results[0]
+            assert "receiving description" in preview_status
+            assert preview_markdown.endswith("## Page 1\n\nPartial\n\n- - -\n\n- - -\n\nmore")
+            assert core.PAGE_SEPARATOR not in preview_markdown
+            assert results[1] == ("Page 1/1 described.", results[-1][1])
+            assert results[-1][1].endswith("Partial description" + core.PAGE_SEPARATOR)
+
+    def test_convert_pdf_to_markdown_identical_pages_cached(self):
+        """Test that identical pages reuse the cached description instead of calling the VLM again."""
+        # Setup test
+        config = {
+            "provider": "openrouter",
+            "openrouter_api_key": "test_key",
+            "vlm_model": "test_model",
+            "output_language": "English",
+            "use_markitdown": False,
+            "use_summary": False
+        }
+        progress_callback = MagicMock()
+        
+        # Create mock document and three pages rendering to the same image
+        mock_doc = MagicMock()
+        mock_pages = [MagicMock(number=0), MagicMock(number=1), MagicMock(number=2)]
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('os.path.isfile', return_value=True), \
+             patch('describepdf.core.config.get_required_prompts_for_config', 
+                   return_value={"vlm_base": "Describe page [PAGE_NUM] in [LANGUAGE]:"}), \
+             patch('describepdf.core.pdf_processor.get_pdf_pages', return_value=(mock_doc, mock_pages, 3)), \
+             patch('describepdf.core.pdf_processor.render_page_to_image_bytes', 
+                   return_value=(b"blank_page", "image/jpeg")), \
+             patch('describepdf.core.openrouter_client.get_vlm_description', 
+                   return_value="A blank page."):
+            
+            # Execute test
+            status, result = core.convert_pdf_to_markdown("test.pdf", config, progress_callback)
+            
+            # Assert results
+            assert "Conversion completed successfully" in status
+            assert result.count("A blank page.") == 3
+            assert core.openrouter_client.get_vlm_description.call_count == 1
+            
+            # Disabling the cache calls the VLM for every page
+            core.clear_page_cache()
+            core.openrouter_client.get_vlm_description.reset_mock()
+            config["use_page_cache"] = False
+            core.convert_pdf_to_markdown("test.pdf", config, progress_callback)
+            assert core.openrouter_client.get_vlm_description.call_count == 3
+
     def test_convert_pdf_to_markdown_partial_success(self):
         """Test partial success in conversion when some pages fail."""
         # Setup test
@@ -324,7 +590,7 @@ class TestCore:
             # Verify document was closed
             mock_doc.close.assert_called_once()
 
-    def test_convert_pdf_to_markdown_with_markitdown(self):
+    def test_convert_pdf_to_markdown_with_markitdown(self, monkeypatch):
         """Test conversion with Markitdown enhanced text extraction."""
         # Setup test
         config = {
@@ -342,15 +608,16 @@ class TestCore:
         mock_page = MagicMock(number=0)
         mock_pages = [mock_page]
         
+        monkeypatch.setattr(core.markitdown_processor, 'MARKITDOWN_AVAILABLE', True)
+        
         with patch('os.path.exists', return_value=True), \
              patch('os.path.isfile', return_value=True), \
              patch('describepdf.core.config.get_required_prompts_for_config', 
                    return_value={"vlm_base": "Base prompt", "vlm_markdown": "Markdown prompt: [MARKDOWN_CONTEXT]"}), \
              patch('describepdf.core.pdf_processor.get_pdf_pages', return_value=(mock_doc, mock_pages, 1)), \
-             patch('describepdf.core.markitdown_processor.MARKITDOWN_AVAILABLE', True), \
              patch('describepdf.core.pdf_processor.render_page_to_image_bytes', return_value=(b"image_data", "image/jpeg")), \
-             patch('describepdf.core.pdf_processor.save_page_as_temp_pdf', return_value="/tmp/temp_page.pdf"), \
-             patch('describepdf.core.markitdown_processor.get_markdown_for_page_via_temp_pdf', 
+             patch('describepdf.core.pdf_processor.save_page_as_bytes', return_value=b"single page pdf"), \
+             patch('describepdf.core.markitdown_processor.get_markdown_for_page_bytes', 
                    return_value="Extracted markdown content"), \
              patch('describepdf.core.openrouter_client.get_vlm_description', return_value="Description with markdown context"), \
              patch('os.remove') as mock_remove:
@@ -365,16 +632,54 @@ class TestCore:
             assert "Description with markdown context" in result
             
             # Verify markitdown extraction was called
-            core.markitdown_processor.get_markdown_for_page_via_temp_pdf.assert_called_once_with("/tmp/temp_page.pdf")
+            core.markitdown_processor.get_markdown_for_page_bytes.assert_called_once_with(b"single page pdf")
             
-            # Verify temp file was removed
-            mock_remove.assert_called_once_with("/tmp/temp_page.pdf")
+            # Verify no temporary file was involved
+            mock_remove.assert_not_called()
             
             # Verify VLM was called with the markdown prompt
             core.openrouter_client.get_vlm_description.assert_called_once()
             args = core.openrouter_client.get_vlm_description.call_args[0]
             assert "Extracted markdown content" in args[2]  # Check that markdown was included in prompt
 
+    def test_convert_pdf_to_markdown_with_markitdown_all_pages(self, monkeypatch):
+        """Test that Markitdown extracts every page in one pass for multi-page documents."""
+        # Setup test
+        config = {
+            "provider": "openrouter",
+            "openrouter_api_key": "test_key",
+            "vlm_model": "test_model",
+            "output_language": "English",
+            "use_markitdown": True,
+            "use_summary": False
+        }
+        progress_callback = MagicMock()
+        mock_doc = MagicMock()
+        mock_pages = [MagicMock(number=i) for i in range(3)]
+        
+        monkeypatch.setattr(core.markitdown_processor, 'MARKITDOWN_AVAILABLE', True)
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('os.path.isfile', return_value=True), \
+             patch('describepdf.core.config.get_required_prompts_for_config', 
+                   return_value={"vlm_base": "Base prompt", "vlm_markdown": "Markdown prompt: [MARKDOWN_CONTEXT]"}), \
+             patch('describepdf.core.pdf_processor.get_pdf_pages', return_value=(mock_doc, mock_pages, 3)), \
+             patch('describepdf.core.pdf_processor.render_page_to_image_bytes', return_value=(b"image_data", "image/jpeg")), \
+             patch('describepdf.core.markitdown_processor.get_markdown_for_all_pages', 
+                   return_value={i: f"Markdown of page {i + 1}" for i in range(3)}) as mock_all_pages, \
+             patch('describepdf.core.pdf_processor.save_page_as_bytes') as mock_save_page, \
+             patch('describepdf.core.openrouter_client.get_vlm_description', return_value="Description") as mock_vlm:
+            
+            # Execute test
+            status, result = core.convert_pdf_to_markdown("test.pdf", config, progress_callback)
+            
+            # Assert results
+            assert "Conversion completed successfully" in status
+            mock_all_pages.assert_called_once_with("test.pdf", [0, 1, 2], 3)
+            mock_save_page.assert_not_called()
+            prompts = sorted(call_args.args[2] for call_args in mock_vlm.call_args_list)
+            assert prompts == [f"Markdown prompt: Markdown of page {i}" for i in range(1, 4)]
+
     def test_convert_pdf_to_markdown_api_critical_error(self):
         """Test handling of critical API errors during conversion."""
         # Setup test
@@ -412,6 +717,130 @@ class TestCore:
             # Verify document was closed
             mock_doc.close.assert_called_once()
     
+    def test_convert_pdf_to_markdown_response_cache_across_runs(self, tmp_path):
+        """Test that a second run reuses descriptions stored in the response cache."""
+        # Setup test
+        config = {
+            "provider": "openrouter",
+            "openrouter_api_key": "test_key",
+            "vlm_model": "test_model",
+            "output_language": "English",
+            "use_markitdown": False,
+            "use_summary": False,
+            "use_page_cache": False,
+            "use_response_cache": True
+        }
+        progress_callback = MagicMock()
+        response_cache = cache.ResponseCache(str(tmp_path))
+        mock_doc = MagicMock()
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('os.path.isfile', return_value=True), \
+             patch('describepdf.core.cache.get_response_cache', return_value=response_cache), \
+             patch('describepdf.core.config.get_required_prompts_for_config', 
+                   return_value={"vlm_base": "Describe page [PAGE_NUM] in [LANGUAGE]:"}), \
+             patch('describepdf.core.pdf_processor.get_pdf_pages', return_value=(mock_doc, [MagicMock(number=0)], 1)), \
+             patch('describepdf.core.pdf_processor.render_page_to_image_bytes', return_value=(b"image_page_1", "image/jpeg")), \
+             patch('describepdf.core.openrouter_client.get_vlm_description', 
+                   return_value="Description for page 1") as mock_vlm:
+            
+            # Execute test
+            first_status, first_markdown = core.convert_pdf_to_markdown("test.pdf", config, progress_callback)
+            second_status, second_markdown = core.convert_pdf_to_markdown("test.pdf", config, progress_callback)
+            
+            # Assert results
+            assert "Conversion completed successfully" in second_status
+            assert second_markdown == first_markdown
+            mock_vlm.assert_called_once()
+        
+        response_cache.close()
+
+    def test_convert_pdf_to_markdown_summary_cached(self, temp_pdf_file):
+        """Test that converting the same document again reuses its summary."""
+        # Setup test
+        config = {
+            "provider": "openrouter",
+            "openrouter_api_key": "test_key",
+            "vlm_model": "test_model",
+            "output_language": "English",
+            "use_markitdown": False,
+            "use_summary": True,
+            "summary_llm_model": "summary_model"
+        }
+        progress_callback = MagicMock()
+        mock_doc = MagicMock()
+        prompts = {
+            "vlm_summary": "Describe page [PAGE_NUM] with [SUMMARY_CONTEXT]:",
+            "summary": "Summarize: [FULL_PDF_TEXT]"
+        }
+        
+        with patch('describepdf.core.config.get_required_prompts_for_config', return_value=prompts), \
+             patch('describepdf.core.pdf_processor.extract_all_text', return_value="Document text"), \
+             patch('describepdf.core.summarizer.generate_summary', return_value="Document summary") as mock_summary, \
+             patch('describepdf.core.pdf_processor.get_pdf_pages', return_value=(mock_doc, [MagicMock(number=0)], 1)), \
+             patch('describepdf.core.pdf_processor.render_page_to_image_bytes', return_value=(b"image_page_1", "image/jpeg")), \
+             patch('describepdf.core.openrouter_client.get_vlm_description', return_value="Description for page 1"):
+            
+            # Execute test
+            core.convert_pdf_to_markdown(temp_pdf_file, dict(config), progress_callback)
+            status, markdown = core.convert_pdf_to_markdown(temp_pdf_file, dict(config), progress_callback)
+            
+            # Assert results
+            assert "Conversion completed successfully" in status
+            mock_summary.assert_called_once()
+
+    def test_convert_pdf_to_markdown_summary_overlaps_pdf_loading(self, temp_pdf_file):
+        """Test that the summary request runs while the PDF is loaded, and is used by every page."""
+        # Setup test
+        config = {
+            "provider": "openrouter",
+            "openrouter_api_key": "test_key",
+            "vlm_model": "test_model",
+            "output_language": "English",
+            "use_markitdown": False,
+            "use_summary": True,
+            "use_page_cache": False,
+            "summary_llm_model": "summary_model"
+        }
+        progress_callback = MagicMock()
+        mock_doc = MagicMock()
+        prompts = {
+            "vlm_summary": "Describe page [PAGE_NUM] with [SUMMARY_CONTEXT]:",
+            "summary": "Summarize: [FULL_PDF_TEXT]"
+        }
+        pdf_loading = threading.Event()
+
+        def slow_summary(*args, **kwargs):
+            # Only returns once the PDF is being loaded on the conversion thread
+            assert pdf_loading.wait(timeout=5)
+            return "Document summary"
+
+        extraction_threads = []
+
+        def extract_text(path):
+            extraction_threads.append(threading.current_thread())
+            return "Document text"
+
+        def load_pdf(path):
+            pdf_loading.set()
+            return mock_doc, [MagicMock(number=0)], 1
+
+        with patch('describepdf.core.config.get_required_prompts_for_config', return_value=prompts), \
+             patch('describepdf.core.pdf_processor.extract_all_text', side_effect=extract_text), \
+             patch('describepdf.core.summarizer.generate_summary', side_effect=slow_summary), \
+             patch('describepdf.core.pdf_processor.get_pdf_pages', side_effect=load_pdf), \
+             patch('describepdf.core.pdf_processor.render_page_to_image_bytes', return_value=(b"image_page_1", "image/jpeg")), \
+             patch('describepdf.core.openrouter_client.get_vlm_description', return_value="Description for page 1") as mock_vlm:
+
+            # Execute test
+            status, markdown = core.convert_pdf_to_markdown(temp_pdf_file, config, progress_callback)
+
+            # Assert results
+            assert "Conversion completed successfully" in status
+            assert "Document summary" in mock_vlm.call_args.args[2]
+            # PyMuPDF is only used from the conversion thread, never by the summary worker
+            assert extraction_threads == [threading.current_thread()]
+
     def test_parse_page_selection_empty(self):
         """Test parsing empty page selection (should return all pages)."""
         # Execute test
@@ -464,6 +893,30 @@ class TestCore:
         assert result == list(range(10))
         assert len(result) == 10
 
+    def test_parse_page_numbers(self):
+        """Test parsing a page selection without a document."""
+        # Execute test
+        result = core.parse_page_numbers(" 1, 3-5 ,,8")
+        
+        # Assert results - 1-based page numbers
+        assert result == frozenset({1, 3, 4, 5, 8})
+
+    def test_parse_page_numbers_invalid(self):
+        """Test that malformed page selections are rejected."""
+        # Execute test / Assert results
+        with pytest.raises(ValueError):
+            core.parse_page_numbers("1,a-3")
+
+    def test_parse_page_numbers_cached(self):
+        """Test that parsing the same selection again reuses the result."""
+        # Execute test
+        first = core.parse_page_numbers("1,3,5-7")
+        second = core.parse_page_numbers("1,3,5-7")
+        
+        # Assert results
+        assert first == frozenset({1, 3, 5, 6, 7})
+        assert second is first
+
     def test_format_markdown_output_with_page_numbers(self):
         """Test formatting of markdown output with specified page numbers."""
         # Setup test data
@@ -481,4 +934,19 @@ class TestCore:
         assert "## Page 10" in result
         assert "Page 1 content" in result
         assert "Page 5 content" in result
-        assert "Page 10 content" in result
\ No newline at end of file
+        assert "Page 10 content" in result
+
+    def test_format_markdown_output_large_document(self):
+        """Test that formatting a long document keeps the pages in order and stays fast."""
+        # Setup test data
+        descriptions = [f"Content of page {i}" for i in range(1, 1001)]
+        
+        # Execute test
+        start = time.perf_counter()
+        result = core.format_markdown_output(descriptions, "large.pdf")
+        elapsed = time.perf_counter() - start
+        
+        # Assert results
+        assert result.count(core.PAGE_SEPARATOR) == 1000
+        assert result.index("## Page 999\n") < result.index("## Page 1000\n")
+        assert elapsed < 1.0
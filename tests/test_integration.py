@@ -12,7 +12,7 @@ from describepdf import core
 class TestIntegration:
     """Test suite for integration testing across multiple components."""
 
-    def test_end_to_end_openrouter_flow(self, temp_pdf_file, sample_image_bytes, mock_openrouter_response, mock_config):
+    def test_end_to_end_openrouter_flow(self, temp_pdf_file, sample_image_bytes, sample_image_b64, mock_openrouter_response, mock_config):
         """Test full conversion flow with OpenRouter provider."""
         # Setup test
         test_config = {
@@ -39,7 +39,7 @@ class TestIntegration:
              patch('describepdf.core.pdf_processor.render_page_to_image_bytes', 
                    return_value=(sample_image_bytes, "image/jpeg")), \
              patch('describepdf.core.openrouter_client.encode_image_to_base64',
-                   return_value="data:image/jpeg;base64,encoded_image"), \
+                   return_value=sample_image_b64), \
              patch('describepdf.core.openrouter_client.call_openrouter_api',
                    return_value=mock_openrouter_response):
             
@@ -85,8 +85,6 @@ class TestIntegration:
              patch('describepdf.core.pdf_processor.render_page_to_image_bytes', 
                    return_value=(sample_image_bytes, "image/jpeg")), \
              patch('describepdf.core.ollama_client.Client', return_value=MagicMock()), \
-             patch('base64.b64encode', return_value=b'encoded_image_data'), \
-             patch('base64.b64encode().decode', return_value='encoded_image_data'), \
              patch('describepdf.core.ollama_client.get_vlm_description',
                    return_value=mock_ollama_response["message"]["content"]):
             
@@ -104,7 +102,7 @@ class TestIntegration:
             assert expected_content in result
 
     def test_with_summary_and_markitdown(self, temp_pdf_file, sample_image_bytes, 
-                                         sample_markdown_content, mock_openrouter_response, mock_config):
+                                         sample_markdown_content, mock_openrouter_response, mock_config, monkeypatch):
         """Test conversion with both summary and Markitdown enabled."""
         # Setup test
         test_config = {
@@ -125,13 +123,15 @@ class TestIntegration:
         mock_page = MagicMock(number=0)
         
         # Set up all required mocks for a successful flow with summary and markitdown
+        monkeypatch.setattr(core.markitdown_processor, 'MARKITDOWN_AVAILABLE', True)
+        
         with patch('os.path.exists', return_value=True), \
              patch('os.path.isfile', return_value=True), \
+             patch('describepdf.core.pdf_processor.extract_all_text', return_value="Document text"), \
              patch('describepdf.core.summarizer.generate_summary', 
                    return_value="This is a test document summary."), \
              patch('describepdf.core.pdf_processor.get_pdf_pages', 
                    return_value=(mock_doc, [mock_page], 1)), \
-             patch('describepdf.core.markitdown_processor.MARKITDOWN_AVAILABLE', True), \
              patch('describepdf.core.config.get_required_prompts_for_config',
                    return_value={
                        "vlm_base": "Base prompt",
@@ -140,13 +140,12 @@ class TestIntegration:
                    }), \
              patch('describepdf.core.pdf_processor.render_page_to_image_bytes', 
                    return_value=(sample_image_bytes, "image/jpeg")), \
-             patch('describepdf.core.pdf_processor.save_page_as_temp_pdf', 
-                   return_value="/tmp/temp_page.pdf"), \
-             patch('describepdf.core.markitdown_processor.get_markdown_for_page_via_temp_pdf', 
+             patch('describepdf.core.pdf_processor.save_page_as_bytes', 
+                   return_value=b"single page pdf"), \
+             patch('describepdf.core.markitdown_processor.get_markdown_for_page_bytes', 
                    return_value=sample_markdown_content), \
              patch('describepdf.core.openrouter_client.get_vlm_description', 
-                   return_value="Description with both markdown and summary context."), \
-             patch('os.remove'):
+                   return_value="Description with both markdown and summary context."):
             
             # Execute test
             status, result = core.convert_pdf_to_markdown(temp_pdf_file, test_config, progress_callback)
@@ -162,7 +161,7 @@ class TestIntegration:
             core.summarizer.generate_summary.assert_called_once()
             
             # Verify markitdown was used
-            core.markitdown_processor.get_markdown_for_page_via_temp_pdf.assert_called_once()
+            core.markitdown_processor.get_markdown_for_page_bytes.assert_called_once()
             
             # Verify VLM was called with the correct prompt
             core.openrouter_client.get_vlm_description.assert_called_once()
@@ -170,7 +169,7 @@ class TestIntegration:
             # The prompt should contain both markdown and summary context
             assert "Full prompt with" in args[2]
       
-    def test_end_to_end_with_page_selection(self, temp_pdf_file, sample_image_bytes, mock_openrouter_response, mock_config):
+    def test_end_to_end_with_page_selection(self, temp_pdf_file, sample_image_bytes, sample_image_b64, mock_openrouter_response, mock_config):
       """Test full conversion flow with page selection."""
       # Setup test
       test_config = {
@@ -200,7 +199,7 @@ class TestIntegration:
             patch('describepdf.core.pdf_processor.render_page_to_image_bytes', 
                   return_value=(sample_image_bytes, "image/jpeg")), \
             patch('describepdf.core.openrouter_client.encode_image_to_base64',
-                  return_value="data:image/jpeg;base64,encoded_image"), \
+                  return_value=sample_image_b64), \
             patch('describepdf.core.openrouter_client.call_openrouter_api',
                   return_value=mock_openrouter_response):
             
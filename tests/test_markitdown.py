@@ -5,132 +5,179 @@ This module tests the integration with the MarkItDown library for
 enhanced text extraction and markdown conversion from PDFs.
 """
 
-from unittest.mock import MagicMock, patch
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 from describepdf import markitdown_processor
 
+@pytest.fixture
+def markitdown_available(monkeypatch):
+    """Pretend MarkItDown is installed."""
+    monkeypatch.setattr(markitdown_processor, 'MARKITDOWN_AVAILABLE', True)
+    return monkeypatch
+
+@pytest.fixture
+def temp_pdf_available(markitdown_available):
+    """Pretend MarkItDown is installed and every temporary PDF exists."""
+    markitdown_available.setattr('os.path.exists', lambda path: True)
+    return markitdown_available
+
+@pytest.fixture
+def force_markitdown_absent(monkeypatch):
+    """Pretend MarkItDown is not installed, patching only when it actually is."""
+    if markitdown_processor.MARKITDOWN_AVAILABLE:
+        monkeypatch.setattr(markitdown_processor, 'MARKITDOWN_AVAILABLE', False)
+
 class TestMarkitdownProcessor:
     """Test suite for the Markitdown processor functionality."""
 
-    def test_markitdown_not_available(self):
+    def test_markitdown_not_available(self, force_markitdown_absent):
         """Test behavior when MarkItDown is not available."""
-        # Setup test - ensure MARKITDOWN_AVAILABLE is False for this test
-        with patch('describepdf.markitdown_processor.MARKITDOWN_AVAILABLE', False):
-            # Execute test
-            result = markitdown_processor.get_markdown_for_page_via_temp_pdf("/path/to/temp.pdf")
-            
-            # Assert results
-            assert result is None
-            
-            # Also test the is_available function
-            assert markitdown_processor.is_available() is False
-
-    def test_markitdown_file_not_found(self):
+        # Execute test
+        result = markitdown_processor.get_markdown_for_page_via_temp_pdf("/path/to/temp.pdf")
+
+        # Assert results
+        assert result is None
+
+        # Also test the is_available function
+        assert markitdown_processor.is_available() is False
+
+    def test_markitdown_file_not_found(self, markitdown_available):
         """Test behavior when the temporary PDF file is not found."""
         # Setup test
-        with patch('describepdf.markitdown_processor.MARKITDOWN_AVAILABLE', True), \
-             patch('os.path.exists', return_value=False):
-            
-            # Execute test
-            result = markitdown_processor.get_markdown_for_page_via_temp_pdf("/path/to/nonexistent.pdf")
-            
-            # Assert results
-            assert result is None
-
-    def test_markitdown_converter_initialization_error(self):
+        markitdown_available.setattr('os.path.exists', lambda path: False)
+
+        # Execute test
+        result = markitdown_processor.get_markdown_for_page_via_temp_pdf("/path/to/nonexistent.pdf")
+
+        # Assert results
+        assert result is None
+
+    def test_markitdown_converter_initialization_error(self, temp_pdf_available):
         """Test handling when MarkItDown converter initialization fails."""
         # Setup test
-        with patch('describepdf.markitdown_processor.MARKITDOWN_AVAILABLE', True), \
-             patch('os.path.exists', return_value=True), \
-             patch('describepdf.markitdown_processor._get_markdown_converter', return_value=None):
-            
-            # Execute test
-            result = markitdown_processor.get_markdown_for_page_via_temp_pdf("/path/to/valid.pdf")
-            
-            # Assert results
-            assert result is None
-
-    def test_markitdown_conversion_success(self):
+        temp_pdf_available.setattr(markitdown_processor, '_get_markdown_converter', lambda: None)
+
+        # Execute test
+        result = markitdown_processor.get_markdown_for_page_via_temp_pdf("/path/to/valid.pdf")
+
+        # Assert results
+        assert result is None
+
+    def test_markitdown_conversion_success(self, temp_pdf_available):
         """Test successful conversion of PDF to Markdown with MarkItDown."""
         # Setup test
         mock_converter = MagicMock()
-        mock_result = MagicMock()
-        mock_result.text_content = "# Converted Markdown\n\nThis is the converted content."
+        mock_result = SimpleNamespace(text_content="# Converted Markdown\n\nThis is the converted content.")
         mock_converter.convert.return_value = mock_result
-        
-        with patch('describepdf.markitdown_processor.MARKITDOWN_AVAILABLE', True), \
-             patch('os.path.exists', return_value=True), \
-             patch('describepdf.markitdown_processor._get_markdown_converter', return_value=mock_converter):
-            
-            # Execute test
-            result = markitdown_processor.get_markdown_for_page_via_temp_pdf("/path/to/valid.pdf")
-            
-            # Assert results
-            assert result == "# Converted Markdown\n\nThis is the converted content."
-            mock_converter.convert.assert_called_once_with("/path/to/valid.pdf")
-
-    def test_markitdown_conversion_exception(self):
+        temp_pdf_available.setattr(markitdown_processor, '_get_markdown_converter', lambda: mock_converter)
+
+        # Execute test
+        result = markitdown_processor.get_markdown_for_page_via_temp_pdf("/path/to/valid.pdf")
+
+        # Assert results
+        assert result == "# Converted Markdown\n\nThis is the converted content."
+        mock_converter.convert.assert_called_once_with("/path/to/valid.pdf")
+
+    def test_markitdown_conversion_exception(self, temp_pdf_available):
         """Test handling of exceptions during MarkItDown conversion."""
         # Setup test
         mock_converter = MagicMock()
         mock_converter.convert.side_effect = Exception("Conversion error")
-        
-        with patch('describepdf.markitdown_processor.MARKITDOWN_AVAILABLE', True), \
-             patch('os.path.exists', return_value=True), \
-             patch('describepdf.markitdown_processor._get_markdown_converter', return_value=mock_converter):
-            
-            # Execute test
-            result = markitdown_processor.get_markdown_for_page_via_temp_pdf("/path/to/valid.pdf")
-            
-            # Assert results
-            assert result is None
-            mock_converter.convert.assert_called_once_with("/path/to/valid.pdf")
-
-    def test_markitdown_empty_result(self):
+        temp_pdf_available.setattr(markitdown_processor, '_get_markdown_converter', lambda: mock_converter)
+
+        # Execute test
+        result = markitdown_processor.get_markdown_for_page_via_temp_pdf("/path/to/valid.pdf")
+
+        # Assert results
+        assert result is None
+        mock_converter.convert.assert_called_once_with("/path/to/valid.pdf")
+
+    def test_markitdown_empty_result(self, temp_pdf_available):
         """Test handling when MarkItDown returns an empty result."""
         # Setup test
         mock_converter = MagicMock()
         mock_converter.convert.return_value = None
-        
-        with patch('describepdf.markitdown_processor.MARKITDOWN_AVAILABLE', True), \
-             patch('os.path.exists', return_value=True), \
-             patch('describepdf.markitdown_processor._get_markdown_converter', return_value=mock_converter):
-            
-            # Execute test
-            result = markitdown_processor.get_markdown_for_page_via_temp_pdf("/path/to/valid.pdf")
-            
-            # Assert results
-            assert result == ""
-            mock_converter.convert.assert_called_once_with("/path/to/valid.pdf")
-
-    def test_get_markdown_converter_success(self):
+        temp_pdf_available.setattr(markitdown_processor, '_get_markdown_converter', lambda: mock_converter)
+
+        # Execute test
+        result = markitdown_processor.get_markdown_for_page_via_temp_pdf("/path/to/valid.pdf")
+
+        # Assert results
+        assert result == ""
+        mock_converter.convert.assert_called_once_with("/path/to/valid.pdf")
+
+    def test_markitdown_conversion_from_bytes(self, markitdown_available):
+        """Test conversion of an in-memory single-page PDF to Markdown."""
+        # Setup test
+        mock_converter = MagicMock()
+        mock_converter.convert_stream.return_value = SimpleNamespace(text_content="# Page from memory")
+        markitdown_available.setattr(markitdown_processor, '_get_markdown_converter', lambda: mock_converter)
+
+        # Execute test
+        result = markitdown_processor.get_markdown_for_page_bytes(b"%PDF-1.7 single page")
+
+        # Assert results
+        assert result == "# Page from memory"
+        stream = mock_converter.convert_stream.call_args.args[0]
+        assert stream.getvalue() == b"%PDF-1.7 single page"
+        assert mock_converter.convert_stream.call_args.kwargs == {"file_extension": ".pdf"}
+
+    def test_get_markdown_converter_success(self, markitdown_available):
         """Test successful creation of MarkItDown converter instance."""
         # Setup test
         mock_markitdown_class = MagicMock()
         mock_converter_instance = MagicMock()
         mock_markitdown_class.return_value = mock_converter_instance
-        
-        with patch('describepdf.markitdown_processor.MARKITDOWN_AVAILABLE', True), \
-             patch('describepdf.markitdown_processor.MarkItDown', mock_markitdown_class):
-            
-            # Execute test
-            result = markitdown_processor._get_markdown_converter()
-            
-            # Assert results
-            assert result == mock_converter_instance
-            mock_markitdown_class.assert_called_once()
-
-    def test_get_markdown_converter_exception(self):
+        markitdown_available.setattr(markitdown_processor, 'MarkItDown', mock_markitdown_class)
+        markitdown_available.setattr(markitdown_processor, '_CONVERTER', None)
+
+        # Execute test
+        result = markitdown_processor._get_markdown_converter()
+
+        # Assert results
+        assert result == mock_converter_instance
+        assert markitdown_processor._get_markdown_converter() is result  # Reused, not recreated
+        mock_markitdown_class.assert_called_once()
+
+    def test_get_markdown_converter_exception(self, markitdown_available):
         """Test handling of exceptions when creating MarkItDown converter."""
         # Setup test
         mock_markitdown_class = MagicMock(side_effect=Exception("Initialization error"))
-        
-        with patch('describepdf.markitdown_processor.MARKITDOWN_AVAILABLE', True), \
-             patch('describepdf.markitdown_processor.MarkItDown', mock_markitdown_class):
-            
-            # Execute test
-            result = markitdown_processor._get_markdown_converter()
-            
-            # Assert results
-            assert result is None
-            mock_markitdown_class.assert_called_once()
\ No newline at end of file
+        markitdown_available.setattr(markitdown_processor, 'MarkItDown', mock_markitdown_class)
+        markitdown_available.setattr(markitdown_processor, '_CONVERTER', None)
+
+        # Execute test
+        result = markitdown_processor._get_markdown_converter()
+
+        # Assert results
+        assert result is None
+        mock_markitdown_class.assert_called_once()
+
+    def test_get_markdown_for_all_pages(self, markitdown_available):
+        """Test that all pages are extracted from a single conversion of the document."""
+        # Setup test
+        mock_converter = MagicMock()
+        mock_converter.convert.return_value = SimpleNamespace(text_content="Page one\n\fPage two\n\fPage three\n\f")
+        markitdown_available.setattr(markitdown_processor, '_get_markdown_converter', lambda: mock_converter)
+
+        # Execute test
+        result = markitdown_processor.get_markdown_for_all_pages("/path/to/valid.pdf", [0, 2], 3)
+
+        # Assert results
+        assert result == {0: "Page one\n", 2: "Page three\n"}
+        mock_converter.convert.assert_called_once_with("/path/to/valid.pdf")
+
+    def test_get_markdown_for_all_pages_unexpected_page_count(self, markitdown_available):
+        """Test that a document that cannot be split into its pages returns nothing."""
+        # Setup test
+        mock_converter = MagicMock()
+        mock_converter.convert.return_value = SimpleNamespace(text_content="Text without page breaks")
+        markitdown_available.setattr(markitdown_processor, '_get_markdown_converter', lambda: mock_converter)
+
+        # Execute test
+        result = markitdown_processor.get_markdown_for_all_pages("/path/to/valid.pdf", [0, 1], 2)
+
+        # Assert results
+        assert result == {}
@@ -7,197 +7,197 @@ VLM (Vision Language Model) image descriptions and LLM text summarization.
 
 import pytest
 import requests
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 
 from describepdf import ollama_client
 
+OLLAMA_HOST = "http://localhost:11434"
+OLLAMA_VERSION_URL = OLLAMA_HOST + "/api/version"
+VLM_ARGS = (OLLAMA_HOST, "llama3.2-vision", "Describe this image", b"image_data", "image/jpeg")
+
+def assert_chat_kwargs(mock_client, model, content, role="user"):
+    """Assert that the client sent one chat message and return that message."""
+    chat_kwargs = mock_client.chat.call_args.kwargs
+    assert chat_kwargs["model"] == model
+    assert len(chat_kwargs["messages"]) == 1
+    message = chat_kwargs["messages"][0]
+    assert message["role"] == role
+    assert message["content"] == content
+    return message
+
+class MockResponseError(Exception):
+    """Stand-in for ollama.ResponseError raised by the mocked client."""
+
+@pytest.fixture(autouse=True)
+def reset_client_pool():
+    """Make sure every test starts without pooled Ollama clients, cached health checks or warm-ups."""
+    ollama_client._CLIENTS.clear()
+    ollama_client._AVAILABLE_SINCE.clear()
+    ollama_client._WARMED_UP_SINCE.clear()
+    yield
+    ollama_client._CLIENTS.clear()
+    ollama_client._AVAILABLE_SINCE.clear()
+    ollama_client._WARMED_UP_SINCE.clear()
+
 class TestOllamaClient:
     """Test suite for the Ollama client functionality."""
 
-    def test_check_ollama_availability_success(self):
-        """Test successful connection to Ollama server."""
+    @pytest.mark.parametrize("side_effect, expected", [
+        (None, True),
+        (requests.exceptions.RequestException("Connection error"), False),
+        (Exception("Unexpected error"), False),
+    ], ids=["success", "connection_error", "unexpected_error"])
+    def test_check_ollama_availability(self, side_effect, expected):
+        """Test the availability check for a reachable, unreachable and failing server."""
         # Setup test
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
+        mock_response = SimpleNamespace(status_code=200, raise_for_status=lambda: None)
         
-        with patch('describepdf.ollama_client.OLLAMA_AVAILABLE', True), \
-             patch('requests.get', return_value=mock_response):
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', True), \
+             patch.object(ollama_client._SESSION, 'get', return_value=mock_response, side_effect=side_effect):
             
             # Execute test
-            result = ollama_client.check_ollama_availability("http://localhost:11434")
+            result = ollama_client.check_ollama_availability(OLLAMA_HOST)
             
             # Assert results
-            assert result is True
-            requests.get.assert_called_once_with("http://localhost:11434/api/version", timeout=5)
+            assert result is expected
+            ollama_client._SESSION.get.assert_called_once_with(
+                OLLAMA_VERSION_URL, timeout=ollama_client.AVAILABILITY_TIMEOUT
+            )
 
-    def test_check_ollama_availability_client_not_installed(self):
-        """Test behavior when Ollama Python client is not installed."""
+    def test_check_ollama_availability_cached(self):
+        """Test that a successful check is reused until the TTL expires."""
         # Setup test
-        with patch('describepdf.ollama_client.OLLAMA_AVAILABLE', False):
+        mock_response = SimpleNamespace(status_code=200, raise_for_status=lambda: None)
+        
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', True), \
+             patch.object(ollama_client._SESSION, 'get', return_value=mock_response), \
+             patch.object(ollama_client.time, 'monotonic', side_effect=[100.0, 110.0, 200.0, 200.0]):
+            
             # Execute test
-            result = ollama_client.check_ollama_availability("http://localhost:11434")
+            results = [ollama_client.check_ollama_availability(OLLAMA_HOST) for _ in range(3)]
             
-            # Assert results
-            assert result is False
+            # Assert results - the second check falls inside the TTL, the third one does not
+            assert results == [True, True, True]
+            assert ollama_client._SESSION.get.call_count == 2
+
+    def test_check_ollama_availability_does_not_retry(self):
+        """Test that the availability check gives up on the first failed connection."""
+        # Setup test
+        adapter = ollama_client._SESSION.get_adapter(OLLAMA_VERSION_URL)
+        
+        # Assert results
+        assert adapter.max_retries.total == 0
+        assert adapter.max_retries.connect == 0
+        assert adapter.max_retries.read == 0
 
-    def test_check_ollama_availability_connection_error(self):
-        """Test behavior when connection to Ollama server fails."""
+    def test_warm_up_model(self):
+        """Test that warming up a model sends an empty generate request."""
         # Setup test
-        with patch('describepdf.ollama_client.OLLAMA_AVAILABLE', True), \
-             patch('requests.get', side_effect=requests.exceptions.RequestException("Connection error")):
+        mock_client = MagicMock()
+        
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', True), \
+             patch.object(ollama_client, 'Client', return_value=mock_client):
             
             # Execute test
-            result = ollama_client.check_ollama_availability("http://localhost:11434")
+            result = ollama_client.warm_up_model(OLLAMA_HOST, "llama3.2-vision")
             
             # Assert results
-            assert result is False
-            requests.get.assert_called_once_with("http://localhost:11434/api/version", timeout=5)
+            assert result is True
+            mock_client.generate.assert_called_once_with(
+                model="llama3.2-vision", prompt="", keep_alive=ollama_client.WARMUP_KEEP_ALIVE
+            )
 
-    def test_check_ollama_availability_unexpected_error(self):
-        """Test behavior when unexpected error occurs checking Ollama availability."""
+    def test_warm_up_model_once_per_ttl(self):
+        """Test that a model is warmed up again only after the TTL expires or a failure."""
         # Setup test
-        with patch('describepdf.ollama_client.OLLAMA_AVAILABLE', True), \
-             patch('requests.get', side_effect=Exception("Unexpected error")):
+        mock_client = MagicMock()
+        mock_client.generate.side_effect = [None, Exception("model not found"), None]
+        
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', True), \
+             patch.object(ollama_client, 'Client', return_value=mock_client), \
+             patch.object(ollama_client.time, 'monotonic', side_effect=[100.0, 110.0, 500.0, 510.0, 520.0]):
             
             # Execute test
-            result = ollama_client.check_ollama_availability("http://localhost:11434")
+            results = [ollama_client.warm_up_model(OLLAMA_HOST, "llama3.2-vision") for _ in range(4)]
+            
+            # Assert results - the second call is inside the TTL, the failed third one is retried
+            assert results == [True, True, False, True]
+            assert mock_client.generate.call_count == 3
+
+    def test_check_ollama_availability_client_not_installed(self):
+        """Test behavior when Ollama Python client is not installed."""
+        # Setup test
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', False):
+            # Execute test
+            result = ollama_client.check_ollama_availability(OLLAMA_HOST)
             
             # Assert results
             assert result is False
-            requests.get.assert_called_once_with("http://localhost:11434/api/version", timeout=5)
 
     def test_get_vlm_description_client_not_installed(self):
         """Test behavior when Ollama Python client is not installed."""
         # Setup test
-        with patch('describepdf.ollama_client.OLLAMA_AVAILABLE', False):
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', False):
             # Execute test and check exception
-            with pytest.raises(ImportError) as excinfo:
-                ollama_client.get_vlm_description(
-                    "http://localhost:11434", 
-                    "llama3.2-vision", 
-                    "Describe this image", 
-                    b"image_data", 
-                    "image/jpeg"
-                )
-            
-            # Assert exception message
-            assert "not installed" in str(excinfo.value)
+            with pytest.raises(ImportError, match="not installed"):
+                ollama_client.get_vlm_description(*VLM_ARGS)
 
-    def test_get_vlm_description_success(self):
+    def test_get_vlm_description_success(self, mock_ollama_chat_client):
         """Test successful VLM description request through Ollama."""
         # Setup test
-        mock_client = MagicMock()
-        mock_response = {
-            "message": {
-                "content": "Description of the image content."
-            }
-        }
-        mock_client.chat.return_value = mock_response
+        mock_client = mock_ollama_chat_client
         
-        with patch('describepdf.ollama_client.OLLAMA_AVAILABLE', True), \
-             patch('describepdf.ollama_client.Client', return_value=mock_client), \
-             patch('base64.b64encode', return_value=b'encoded_image_data'), \
-             patch('base64.b64encode().decode', return_value='encoded_image_data'):
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', True), \
+             patch.object(ollama_client, 'Client', return_value=mock_client):
             
             # Execute test
-            result = ollama_client.get_vlm_description(
-                "http://localhost:11434", 
-                "llama3.2-vision", 
-                "Describe this image", 
-                b"image_data", 
-                "image/jpeg"
-            )
+            result = ollama_client.get_vlm_description(*VLM_ARGS)
             
             # Assert results
             assert result == "Description of the image content."
             
             # Verify client was created and used correctly
-            ollama_client.Client.assert_called_once_with(host="http://localhost:11434")
+            ollama_client.Client.assert_called_once_with(host=OLLAMA_HOST, timeout=ollama_client.DEFAULT_TIMEOUT)
             assert mock_client.chat.call_count == 1
             
             # Verify chat call arguments
-            chat_args = mock_client.chat.call_args[1]
-            assert chat_args["model"] == "llama3.2-vision"
-            assert len(chat_args["messages"]) == 1
-            assert chat_args["messages"][0]["role"] == "user"
-            assert chat_args["messages"][0]["content"] == "Describe this image"
-            assert "images" in chat_args["messages"][0]
-
-    def test_get_vlm_description_api_error(self):
-        """Test error handling when Ollama API returns an error."""
-        # Setup test
-        mock_client = MagicMock()
-        
-        # Create a mock ResponseError class
-        class MockResponseError(Exception):
-            pass
-        
-        with patch('describepdf.ollama_client.OLLAMA_AVAILABLE', True), \
-             patch('describepdf.ollama_client.Client', return_value=mock_client), \
-             patch('describepdf.ollama_client.ollama.ResponseError', MockResponseError), \
-             patch('base64.b64encode', return_value=b'encoded_image_data'), \
-             patch('base64.b64encode().decode', return_value='encoded_image_data'):
-            
-            # Make the chat method raise an error
-            mock_client.chat.side_effect = MockResponseError("API Error")
-            
-            # Execute test and check exception
-            with pytest.raises(ConnectionError) as excinfo:
-                ollama_client.get_vlm_description(
-                    "http://localhost:11434", 
-                    "llama3.2-vision", 
-                    "Describe this image", 
-                    b"image_data", 
-                    "image/jpeg"
-                )
-            
-            # Assert exception message
-            assert "Ollama API error" in str(excinfo.value)
+            message = assert_chat_kwargs(mock_client, "llama3.2-vision", "Describe this image")
+            assert "images" in message
 
-    def test_get_vlm_description_unexpected_response(self):
-        """Test error handling when Ollama returns unexpected response structure."""
+    @pytest.mark.parametrize("chat_result, expected_error, message", [
+        (MockResponseError("API Error"), ConnectionError, "Ollama API error"),
+        ({"model": "llama3.2-vision"}, ValueError, "unexpected response structure"),  # Missing 'message' key
+    ], ids=["api_error", "unexpected_response"])
+    def test_get_vlm_description_errors(self, mock_ollama_chat_client, chat_result, expected_error, message):
+        """Test error handling when Ollama fails or returns an unexpected response structure."""
         # Setup test
-        mock_client = MagicMock()
-        # Response missing 'message' key
-        mock_response = {"model": "llama3.2-vision"}
-        mock_client.chat.return_value = mock_response
+        mock_client = mock_ollama_chat_client
+        if isinstance(chat_result, Exception):
+            mock_client.chat.side_effect = chat_result
+        else:
+            mock_client.chat.return_value = chat_result
         
-        with patch('describepdf.ollama_client.OLLAMA_AVAILABLE', True), \
-             patch('describepdf.ollama_client.Client', return_value=mock_client), \
-             patch('base64.b64encode', return_value=b'encoded_image_data'), \
-             patch('base64.b64encode().decode', return_value='encoded_image_data'):
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', True), \
+             patch.object(ollama_client, 'Client', return_value=mock_client), \
+             patch.object(ollama_client.ollama, 'ResponseError', MockResponseError):
             
             # Execute test and check exception
-            with pytest.raises(ValueError) as excinfo:
-                ollama_client.get_vlm_description(
-                    "http://localhost:11434", 
-                    "llama3.2-vision", 
-                    "Describe this image", 
-                    b"image_data", 
-                    "image/jpeg"
-                )
-            
-            # Assert exception message
-            assert "unexpected response structure" in str(excinfo.value)
+            with pytest.raises(expected_error, match=message):
+                ollama_client.get_vlm_description(*VLM_ARGS)
 
-    def test_get_llm_summary_success(self):
+    def test_get_llm_summary_success(self, mock_ollama_chat_client):
         """Test successful summary request through Ollama."""
         # Setup test
-        mock_client = MagicMock()
-        mock_response = {
-            "message": {
-                "content": "Summary of the document."
-            }
-        }
-        mock_client.chat.return_value = mock_response
+        mock_client = mock_ollama_chat_client
+        mock_client.chat.return_value = {"message": {"content": "Summary of the document."}}
         
-        with patch('describepdf.ollama_client.OLLAMA_AVAILABLE', True), \
-             patch('describepdf.ollama_client.Client', return_value=mock_client):
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', True), \
+             patch.object(ollama_client, 'Client', return_value=mock_client):
             
             # Execute test
             result = ollama_client.get_llm_summary(
-                "http://localhost:11434",
+                OLLAMA_HOST,
                 "qwen2.5",
                 "Summarize this document"
             )
@@ -206,27 +206,103 @@ class TestOllamaClient:
             assert result == "Summary of the document."
             
             # Verify client was created and used correctly
-            ollama_client.Client.assert_called_once_with(host="http://localhost:11434")
+            ollama_client.Client.assert_called_once_with(host=OLLAMA_HOST, timeout=ollama_client.DEFAULT_TIMEOUT)
             assert mock_client.chat.call_count == 1
             
             # Verify chat call arguments
-            chat_args = mock_client.chat.call_args[1]
-            assert chat_args["model"] == "qwen2.5"
-            assert len(chat_args["messages"]) == 1
-            assert chat_args["messages"][0]["role"] == "user"
-            assert chat_args["messages"][0]["content"] == "Summarize this document"
+            assert_chat_kwargs(mock_client, "qwen2.5", "Summarize this document")
 
     def test_get_llm_summary_client_not_installed(self):
         """Test behavior when Ollama Python client is not installed."""
         # Setup test
-        with patch('describepdf.ollama_client.OLLAMA_AVAILABLE', False):
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', False):
             # Execute test and check exception
-            with pytest.raises(ImportError) as excinfo:
+            with pytest.raises(ImportError, match="not installed"):
                 ollama_client.get_llm_summary(
-                    "http://localhost:11434",
+                    OLLAMA_HOST,
                     "qwen2.5",
                     "Summarize this document"
                 )
+
+    def test_get_vlm_description_streaming(self):
+        """Test that streamed responses report the accumulated text after each chunk."""
+        # Setup test
+        mock_client = MagicMock()
+        mock_client.chat.return_value = iter([
+            {"message": {"content": "This page "}},
+            {"message": {"content": ""}},
+            {"message": {"content": "shows a chart."}}
+        ])
+        on_partial = MagicMock()
+        
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', True), \
+             patch.object(ollama_client, 'Client', return_value=mock_client):
+            
+            # Execute test
+            result = ollama_client.get_vlm_description(
+                OLLAMA_HOST, "llama3.2-vision", "Describe", b"image", "image/jpeg",
+                on_partial=on_partial
+            )
+            
+            # Assert results
+            assert result == "This page shows a chart."
+            assert mock_client.chat.call_args.kwargs["stream"] is True
+            assert [c.args[0] for c in on_partial.call_args_list] == ["This page ", "This page shows a chart."]
+
+    def test_get_vlm_description_options_and_request_slots(self):
+        """Test that model options are forwarded and requests hold an endpoint slot."""
+        # Setup test
+        mock_client = MagicMock()
+        
+        def chat(**kwargs):
+            # The only slot of the endpoint is taken while the request runs
+            assert not ollama_client._REQUEST_SLOTS[OLLAMA_HOST].acquire(blocking=False)
+            return {"message": {"content": "A page."}}
+        
+        mock_client.chat.side_effect = chat
+        
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', True), \
+             patch.object(ollama_client, 'Client', return_value=mock_client), \
+             patch.object(ollama_client, 'MAX_CONCURRENT_REQUESTS', 1), \
+             patch.dict('describepdf.ollama_client._REQUEST_SLOTS', clear=True):
+            
+            # Execute test
+            result = ollama_client.get_vlm_description(
+                "http://localhost:11434/", "llama3.2-vision", "Describe", b"image", "image/jpeg",
+                options={"num_batch": 1024}
+            )
+            
+            # Assert results
+            assert result == "A page."
+            assert mock_client.chat.call_args.kwargs["options"] == {"num_batch": 1024}
+            assert ollama_client._REQUEST_SLOTS[OLLAMA_HOST].acquire(blocking=False)
+
+    def test_client_reused_across_calls(self):
+        """Test that the same Ollama client is reused for calls to the same endpoint."""
+        # Setup test
+        mock_client = MagicMock()
+        mock_client.chat.return_value = {"message": {"content": "Summary of the document."}}
+        
+        with patch.object(ollama_client, 'OLLAMA_AVAILABLE', True), \
+             patch.object(ollama_client, 'Client', return_value=mock_client):
             
-            # Assert exception message
-            assert "not installed" in str(excinfo.value)
\ No newline at end of file
+            # Execute test
+            ollama_client.get_llm_summary(OLLAMA_HOST, "qwen2.5", "First")
+            ollama_client.get_llm_summary("http://localhost:11434/", "qwen2.5", "Second")
+            
+            # Assert results
+            ollama_client.Client.assert_called_once_with(host=OLLAMA_HOST, timeout=ollama_client.DEFAULT_TIMEOUT)
+            assert mock_client.chat.call_count == 2
+
+    def test_close_clients(self):
+        """Test that closing the pool closes and forgets every client."""
+        # Setup test
+        mock_client = MagicMock()
+        ollama_client._CLIENTS[OLLAMA_HOST] = mock_client
+        
+        # Execute test
+        ollama_client.close_clients()
+        
+        # Assert results
+        mock_client.close.assert_called_once()
+        assert ollama_client._CLIENTS == {}
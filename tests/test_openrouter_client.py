@@ -8,21 +8,17 @@ VLM (Vision Language Model) image descriptions and LLM text summarization.
 import json
 import pytest
 import base64
-import responses
-from unittest.mock import patch
+import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
 
 from describepdf import openrouter_client
 
-@pytest.fixture
-def mock_base64_image():
-    """Fixture providing a mock base64 encoded image string."""
-    return "data:image/jpeg;base64,/9j/4AAQSkZJRgABAQEAYABgAAD..."
-
-@pytest.fixture
-def setup_responses():
-    """Setup responses library for mocking HTTP requests."""
-    with responses.RequestsMock() as rsps:
-        yield rsps
+API_KEY = "test_api_key"
+VLM_MODEL = "qwen/qwen2.5-vl-72b-instruct"
+LLM_MODEL = "google/gemini-2.5-flash-preview"
+MESSAGES = [{"role": "user", "content": "Test message"}]
 
 class TestOpenRouterClient:
     """Test suite for the OpenRouter client functionality."""
@@ -44,79 +40,109 @@ class TestOpenRouterClient:
     def test_encode_image_to_base64_error(self):
         """Test error handling when image encoding fails."""
         # Setup test
-        with patch('base64.b64encode', side_effect=Exception("Encoding error")):
+        with patch.object(base64, 'b64encode', side_effect=Exception("Encoding error")):
             # Execute test and check exception
-            with pytest.raises(ValueError) as excinfo:
+            with pytest.raises(ValueError, match="Failed to encode image"):
                 openrouter_client.encode_image_to_base64(b"invalid image data", "image/png")
-            
-            # Assert exception message
-            assert "Failed to encode image" in str(excinfo.value)
 
-    def test_call_openrouter_api_success(self, setup_responses, mock_openrouter_response):
+    def test_call_openrouter_api_success(self, openrouter_session, openrouter_adapter,
+                                         mock_openrouter_response, mock_openrouter_response_bytes):
         """Test successful call to OpenRouter API."""
         # Setup test
-        api_key = "test_api_key"
-        model = "qwen/qwen2.5-vl-72b-instruct"
-        messages = [{"role": "user", "content": "Test message"}]
-        
-        # Mock the API response
-        setup_responses.add(
-            responses.POST,
-            openrouter_client.OPENROUTER_API_URL,
-            json=mock_openrouter_response,
-            status=200
-        )
+        openrouter_adapter.reply_with(mock_openrouter_response_bytes)
         
         # Execute test
-        result = openrouter_client.call_openrouter_api(api_key, model, messages)
+        result = openrouter_client.call_openrouter_api(API_KEY, VLM_MODEL, MESSAGES, session=openrouter_session)
         
         # Assert results
         assert result == mock_openrouter_response
-        assert len(setup_responses.calls) == 1
+        assert len(openrouter_adapter.requests) == 1
         
         # Validate request
-        request_body = json.loads(setup_responses.calls[0].request.body)
-        assert request_body["model"] == model
-        assert request_body["messages"] == messages
+        request = openrouter_adapter.requests[0]
+        assert request.url == openrouter_client.OPENROUTER_API_URL
+        request_body = json.loads(request.body)
+        assert request_body["model"] == VLM_MODEL
+        assert request_body["messages"] == MESSAGES
+
+    def test_call_openrouter_api_reuses_session(self, mock_openrouter_response):
+        """Test that API calls share one pooled session."""
+        # Setup test
+        mock_response = MagicMock()
+        mock_response.json.return_value = mock_openrouter_response
+        
+        with patch.object(openrouter_client._SESSION, 'post', return_value=mock_response) as mock_post:
+            # Execute test
+            openrouter_client.call_openrouter_api(API_KEY, VLM_MODEL, MESSAGES)
+            openrouter_client.call_openrouter_api(API_KEY, VLM_MODEL, MESSAGES)
+            
+            # Assert results
+            assert mock_post.call_count == 2
+            assert mock_post.call_args.kwargs["timeout"] == openrouter_client.DEFAULT_TIMEOUT
+
+    def test_call_openrouter_api_concurrent_calls(self, mock_openrouter_response):
+        """Test that calls made from several threads run at the same time instead of one after another."""
+        # Setup test
+        call_count = 20
+        all_in_flight = threading.Barrier(call_count, timeout=5)
+        mock_response = MagicMock()
+        mock_response.json.return_value = mock_openrouter_response
+        
+        def post(*args, **kwargs):
+            # Every call has to be waiting here before any of them can return
+            all_in_flight.wait()
+            return mock_response
+        
+        with patch.object(openrouter_client._SESSION, 'post', side_effect=post):
+            # Execute test
+            with ThreadPoolExecutor(max_workers=call_count) as executor:
+                results = list(executor.map(
+                    lambda _: openrouter_client.call_openrouter_api(API_KEY, VLM_MODEL, MESSAGES),
+                    range(call_count)
+                ))
+            
+            # Assert results
+            assert results == [mock_openrouter_response] * call_count
+
+    def test_session_retries_are_bounded(self):
+        """Test that the shared session retries failed connections a limited number of times."""
+        # Execute test
+        adapter = openrouter_client._SESSION.get_adapter(openrouter_client.OPENROUTER_API_URL)
+        
+        # Assert results
+        assert adapter.max_retries.total == 3
+        assert "POST" not in adapter.max_retries.allowed_methods
+
+    def test_close_session(self):
+        """Test that closing the shared session drops its pooled connections."""
+        # Setup test
+        with patch.object(openrouter_client._SESSION, 'close') as mock_close:
+            # Execute test
+            openrouter_client.close_session()
+            
+            # Assert results
+            mock_close.assert_called_once()
 
     def test_call_openrouter_api_missing_key(self):
         """Test error handling when API key is missing."""
         # Execute test and check exception
-        with pytest.raises(ValueError) as excinfo:
-            openrouter_client.call_openrouter_api("", "model_name", [])
-        
-        # Assert exception message
-        assert "API Key is missing" in str(excinfo.value)
+        with pytest.raises(ValueError, match="API Key is missing"):
+            openrouter_client.call_openrouter_api("", VLM_MODEL, MESSAGES)
 
-    def test_call_openrouter_api_timeout(self, setup_responses):
+    def test_call_openrouter_api_timeout(self, openrouter_session, openrouter_adapter):
         """Test error handling when API call times out."""
         # Setup test
-        api_key = "test_api_key"
-        model = "qwen/qwen2.5-vl-72b-instruct"
-        messages = [{"role": "user", "content": "Test message"}]
-        
-        # Mock timeout response
-        setup_responses.add(
-            responses.POST,
-            openrouter_client.OPENROUTER_API_URL,
-            body=responses.ConnectionError("Connection timed out")
-        )
+        def handler(request):
+            raise requests.exceptions.ReadTimeout("Read timed out")
+        openrouter_adapter.handler = handler
         
         # Execute test and check exception
-        with pytest.raises(TimeoutError) as excinfo:
-            openrouter_client.call_openrouter_api(api_key, model, messages)
-        
-        # Assert exception message
-        assert "API call timed out" in str(excinfo.value)
+        with pytest.raises(TimeoutError, match="API call timed out"):
+            openrouter_client.call_openrouter_api(API_KEY, VLM_MODEL, MESSAGES, session=openrouter_session)
 
-    def test_call_openrouter_api_error_response(self, setup_responses):
+    def test_call_openrouter_api_error_response(self, openrouter_session, openrouter_adapter):
         """Test error handling when API returns an error response."""
         # Setup test
-        api_key = "test_api_key"
-        model = "qwen/qwen2.5-vl-72b-instruct"
-        messages = [{"role": "user", "content": "Test message"}]
-        
-        # Mock error response
         error_json = {
             "error": {
                 "message": "Invalid model specified",
@@ -124,109 +150,61 @@ class TestOpenRouterClient:
                 "code": "model_not_found"
             }
         }
-        
-        setup_responses.add(
-            responses.POST,
-            openrouter_client.OPENROUTER_API_URL,
-            json=error_json,
-            status=400
-        )
+        openrouter_adapter.reply_with(json.dumps(error_json).encode("utf-8"), status_code=400)
         
         # Execute test and check exception
-        with pytest.raises(ConnectionError) as excinfo:
-            openrouter_client.call_openrouter_api(api_key, model, messages)
-        
-        # Assert exception message
-        assert "API Error" in str(excinfo.value)
-        assert "Invalid model specified" in str(excinfo.value)
+        with pytest.raises(ConnectionError, match="API Error.*Invalid model specified"):
+            openrouter_client.call_openrouter_api(API_KEY, VLM_MODEL, MESSAGES, session=openrouter_session)
 
-    def test_get_vlm_description_success(self, setup_responses, sample_image_bytes, mock_openrouter_response):
+    def test_get_vlm_description_success(self, sample_image_bytes, sample_image_b64, mock_openrouter_response):
         """Test getting a page description using a VLM through OpenRouter."""
         # Setup test
-        api_key = "test_api_key"
-        model = "qwen/qwen2.5-vl-72b-instruct"
         prompt = "Describe this image"
         mime_type = "image/jpeg"
         
         # Mock encode_image_to_base64
-        with patch('describepdf.openrouter_client.encode_image_to_base64', 
-                   return_value="data:image/jpeg;base64,encodedImageData"), \
-             patch('describepdf.openrouter_client.call_openrouter_api', 
+        with patch.object(openrouter_client, 'encode_image_to_base64', 
+                   return_value=sample_image_b64), \
+             patch.object(openrouter_client, 'call_openrouter_api', 
                    return_value=mock_openrouter_response):
             
             # Execute test
-            result = openrouter_client.get_vlm_description(api_key, model, prompt, sample_image_bytes, mime_type)
+            result = openrouter_client.get_vlm_description(API_KEY, VLM_MODEL, prompt, sample_image_bytes, mime_type)
             
             # Assert results
             expected_content = mock_openrouter_response["choices"][0]["message"]["content"]
             assert result == expected_content
-
-    def test_get_vlm_description_empty_response(self):
-        """Test handling when VLM returns empty or unexpected response structure."""
-        # Setup test
-        api_key = "test_api_key"
-        model = "qwen/qwen2.5-vl-72b-instruct"
-        prompt = "Describe this image"
-        
-        empty_response = {
-            "choices": [
-                {
-                    "message": {
-                        "content": ""
-                    }
-                }
-            ]
-        }
-        
-        with patch('describepdf.openrouter_client.encode_image_to_base64', 
-                   return_value="data:image/jpeg;base64,encodedImageData"), \
-             patch('describepdf.openrouter_client.call_openrouter_api', 
-                   return_value=empty_response):
-            
-            # Execute test and check exception
-            with pytest.raises(ValueError) as excinfo:
-                openrouter_client.get_vlm_description(api_key, model, prompt, b"image_data", "image/jpeg")
-            
-            # Assert exception message
-            assert "VLM returned no usable content" in str(excinfo.value)
-
-    def test_get_vlm_description_invalid_response_structure(self):
-        """Test handling when VLM returns invalid response structure."""
+            messages = openrouter_client.call_openrouter_api.call_args.args[2]
+            assert messages[0]["content"][1]["image_url"]["url"] == sample_image_b64
+
+    @pytest.mark.parametrize("response, fragment", [
+        ({"choices": [{"message": {"content": ""}}]}, "VLM returned no usable content"),
+        ({"id": "gen_123", "model": "qwen/qwen2.5-vl-72b-instruct"}, "unexpected response structure"),
+    ], ids=["empty_content", "missing_choices"])
+    def test_get_vlm_description_unexpected_response(self, sample_image_b64, response, fragment):
+        """Test handling when VLM returns empty content or an invalid response structure."""
         # Setup test
-        api_key = "test_api_key"
-        model = "qwen/qwen2.5-vl-72b-instruct"
         prompt = "Describe this image"
         
-        invalid_response = {
-            "id": "gen_123",
-            "model": "qwen/qwen2.5-vl-72b-instruct"
-            # Missing 'choices' key
-        }
-        
-        with patch('describepdf.openrouter_client.encode_image_to_base64', 
-                   return_value="data:image/jpeg;base64,encodedImageData"), \
-             patch('describepdf.openrouter_client.call_openrouter_api', 
-                   return_value=invalid_response):
+        with patch.object(openrouter_client, 'encode_image_to_base64', 
+                   return_value=sample_image_b64), \
+             patch.object(openrouter_client, 'call_openrouter_api', 
+                   return_value=response):
             
             # Execute test and check exception
-            with pytest.raises(ValueError) as excinfo:
-                openrouter_client.get_vlm_description(api_key, model, prompt, b"image_data", "image/jpeg")
-            
-            # Assert exception message
-            assert "unexpected response structure" in str(excinfo.value)
+            with pytest.raises(ValueError, match=fragment):
+                openrouter_client.get_vlm_description(API_KEY, VLM_MODEL, prompt, b"image_data", "image/jpeg")
 
     def test_get_llm_summary_success(self, mock_openrouter_response):
         """Test getting a summary using an LLM through OpenRouter."""
         # Setup test
-        api_key = "test_api_key"
-        model = "google/gemini-2.5-flash-preview"
         prompt = "Summarize this document"
         
-        with patch('describepdf.openrouter_client.call_openrouter_api', 
+        with patch.object(openrouter_client, 'call_openrouter_api', 
                    return_value=mock_openrouter_response):
             
             # Execute test
-            result = openrouter_client.get_llm_summary(api_key, model, prompt)
+            result = openrouter_client.get_llm_summary(API_KEY, LLM_MODEL, prompt)
             
             # Assert results
             expected_content = mock_openrouter_response["choices"][0]["message"]["content"]
@@ -235,16 +213,11 @@ class TestOpenRouterClient:
     def test_get_llm_summary_error(self):
         """Test error handling when getting a summary from LLM fails."""
         # Setup test
-        api_key = "test_api_key"
-        model = "google/gemini-2.5-flash-preview"
         prompt = "Summarize this document"
         
-        with patch('describepdf.openrouter_client.call_openrouter_api', 
+        with patch.object(openrouter_client, 'call_openrouter_api', 
                    side_effect=ValueError("API Error")):
             
             # Execute test and check exception
-            with pytest.raises(ValueError) as excinfo:
-                openrouter_client.get_llm_summary(api_key, model, prompt)
-            
-            # Assert exception message
-            assert "API Error" in str(excinfo.value)
\ No newline at end of file
+            with pytest.raises(ValueError, match="API Error"):
+                openrouter_client.get_llm_summary(API_KEY, LLM_MODEL, prompt)
\ No newline at end of file
@@ -5,7 +5,9 @@ This module tests the functionality for handling PDF files, including
 opening, rendering, text extraction, and page manipulation.
 """
 
-from unittest.mock import MagicMock, patch
+import os
+import pymupdf
+from unittest.mock import MagicMock, Mock, call, patch
 
 # Import module under test
 from describepdf import pdf_processor
@@ -13,23 +15,25 @@ from describepdf import pdf_processor
 class TestPDFProcessor:
     """Test suite for the PDF processor functionality."""
 
-    def test_get_pdf_pages_success(self, mock_pymupdf, temp_pdf_file):
-        """Test successful opening of a PDF and retrieval of pages."""
+    def test_get_pdf_pages_success(self, temp_pdf_file, page_mocks):
+        """Test successful opening of a PDF and lazy retrieval of its pages."""
         # Setup test
-        mock_doc = MagicMock()
+        mock_doc = MagicMock(spec=pymupdf.Document)
         mock_doc.__len__.return_value = 3
-        mock_page1, mock_page2, mock_page3 = MagicMock(), MagicMock(), MagicMock()
-        mock_doc.load_page.side_effect = [mock_page1, mock_page2, mock_page3]
-        mock_pymupdf.open.return_value = mock_doc
+        mock_doc.load_page.side_effect = page_mocks[:3]
 
-        # Execute test
-        doc, pages, total_pages = pdf_processor.get_pdf_pages(temp_pdf_file)
+        with patch.object(pdf_processor.pymupdf, 'open', return_value=mock_doc) as mock_open:
+            # Execute test
+            doc, pages, total_pages = pdf_processor.get_pdf_pages(temp_pdf_file)
+            loaded_before_iteration = mock_doc.load_page.call_count
+            pages_list = list(pages)
 
-        # Assert results
-        assert doc == mock_doc
-        assert len(pages) == 3
-        assert total_pages == 3
-        mock_pymupdf.open.assert_called_once_with(temp_pdf_file)
+            # Assert results
+            assert doc == mock_doc
+            assert loaded_before_iteration == 0  # Pages are only loaded when reached
+            assert pages_list == page_mocks[:3]
+            assert total_pages == 3
+            mock_open.assert_called_once_with(temp_pdf_file)
 
     def test_get_pdf_pages_file_not_found(self, mock_pymupdf):
         """Test handling of non-existent PDF file."""
@@ -47,9 +51,9 @@ class TestPDFProcessor:
     def test_render_page_to_image_bytes_png(self, mock_pymupdf, sample_image_bytes):
         """Test rendering a page to PNG image bytes."""
         # Setup test
-        mock_page = MagicMock()
+        mock_page = Mock(spec=pymupdf.Page)
         mock_page.number = 0
-        mock_pixmap = MagicMock()
+        mock_pixmap = Mock(spec=pymupdf.Pixmap)
         mock_pixmap.tobytes.return_value = sample_image_bytes
         mock_page.get_pixmap.return_value = mock_pixmap
 
@@ -64,37 +68,113 @@ class TestPDFProcessor:
             mock_page.get_pixmap.assert_called_once()
             mock_pixmap.tobytes.assert_called_once_with("png")
 
+    def test_render_page_to_image_bytes_memoryview(self, sample_image_bytes):
+        """Test that the image can be returned as a memoryview instead of bytes."""
+        # Setup test
+        mock_page = Mock(spec=pymupdf.Page)
+        mock_page.number = 0
+        mock_pixmap = Mock(spec=pymupdf.Pixmap)
+        mock_pixmap.tobytes.return_value = sample_image_bytes
+        mock_page.get_pixmap.return_value = mock_pixmap
+
+        # Execute test
+        image_bytes, mime_type = pdf_processor.render_page_to_image_bytes(mock_page, "png", as_view=True)
+
+        # Assert results
+        assert isinstance(image_bytes, memoryview)
+        assert image_bytes == sample_image_bytes
+        assert mime_type == "image/png"
+
     def test_render_page_to_image_bytes_jpeg(self, mock_pymupdf, sample_image_bytes):
         """Test rendering a page to JPEG image bytes."""
         # Setup test
-        mock_page = MagicMock()
+        mock_page = Mock(spec=pymupdf.Page)
         mock_page.number = 0
-        mock_pixmap = MagicMock()
-        mock_pixmap.samples = b"sample_image_data"
+        mock_pixmap = Mock(spec=pymupdf.Pixmap)
+        mock_pixmap.tobytes.side_effect = lambda fmt, jpg_quality=None: sample_image_bytes
+        mock_page.get_pixmap.return_value = mock_pixmap
+
+        # Execute test
+        image_bytes, mime_type = pdf_processor.render_page_to_image_bytes(mock_page, "jpeg", quality=75)
+
+        # Assert results
+        assert image_bytes == sample_image_bytes
+        assert mime_type == "image/jpeg"
+        mock_page.get_pixmap.assert_called_once()
+        mock_pixmap.tobytes.assert_called_once_with("jpeg", jpg_quality=75)
+
+    def test_render_page_to_image_bytes_webp(self, mock_pymupdf, sample_image_bytes):
+        """Test rendering a page to WebP image bytes."""
+        # Setup test
+        mock_page = Mock(spec=pymupdf.Page)
+        mock_page.number = 0
+        mock_pixmap = Mock(spec=pymupdf.Pixmap)
+        mock_pixmap.samples_mv = memoryview(b"sample_image_data")
         mock_pixmap.width = 100
         mock_pixmap.height = 100
+        mock_pixmap.stride = 300
         mock_page.get_pixmap.return_value = mock_pixmap
 
         # Mock PIL Image
         mock_pil_image = MagicMock()
-        mock_pil_image.save.side_effect = lambda io_buf, format, quality: io_buf.write(sample_image_bytes)
+        mock_pil_image.save.side_effect = lambda io_buf, **kwargs: io_buf.write(sample_image_bytes)
 
-        # Test JPEG format with PIL
         with patch('describepdf.pdf_processor.PIL_AVAILABLE', True), \
-             patch('describepdf.pdf_processor.Image.frombytes', return_value=mock_pil_image):
+             patch('describepdf.pdf_processor.Image.frombuffer', return_value=mock_pil_image) as mock_frombuffer:
             
             # Execute test
-            image_bytes, mime_type = pdf_processor.render_page_to_image_bytes(mock_page, "jpeg")
+            image_bytes, mime_type = pdf_processor.render_page_to_image_bytes(mock_page, "webp")
 
             # Assert results
             assert image_bytes == sample_image_bytes
-            assert mime_type == "image/jpeg"
-            mock_page.get_pixmap.assert_called_once()
+            assert mime_type == "image/webp"
+            assert mock_pil_image.save.call_args[1]["format"] == "WEBP"
+            # The image shares the pixmap samples instead of copying them
+            mock_frombuffer.assert_called_once_with(
+                "RGB", (100, 100), mock_pixmap.samples_mv, "raw", "RGB", 300, 1
+            )
+
+    def test_render_page_to_image_bytes_max_side(self, mock_pymupdf, sample_image_bytes):
+        """Test that the resolution is lowered so the longest side fits the maximum size."""
+        # Setup test - A4 page in points (595 x 842)
+        mock_page = Mock(spec=pymupdf.Page)
+        mock_page.number = 0
+        mock_page.rect.width = 595
+        mock_page.rect.height = 842
+        mock_pixmap = Mock(spec=pymupdf.Pixmap)
+        mock_pixmap.tobytes.return_value = sample_image_bytes
+        mock_page.get_pixmap.return_value = mock_pixmap
+
+        with patch('describepdf.pdf_processor.PIL_AVAILABLE', True):
+            # Execute test
+            pdf_processor.render_page_to_image_bytes(mock_page, "png", dpi=150, max_side=1120)
+            pdf_processor.render_page_to_image_bytes(mock_page, "png", dpi=72, max_side=1120)
+
+            # Assert results - 1120 px over 842 pt allows at most 95 DPI
+            assert mock_page.get_pixmap.call_args_list[0][1]["dpi"] == 95
+            assert mock_page.get_pixmap.call_args_list[1][1]["dpi"] == 72  # Never raised
+
+    def test_render_page_to_image_bytes_max_pixels(self, sample_image_bytes):
+        """Test that the resolution is lowered so very large pages stay under the pixel limit."""
+        # Setup test - square page of 10000 x 10000 points
+        mock_page = Mock(spec=pymupdf.Page)
+        mock_page.number = 0
+        mock_page.rect.width = 10000
+        mock_page.rect.height = 10000
+        mock_pixmap = Mock(spec=pymupdf.Pixmap)
+        mock_pixmap.tobytes.return_value = sample_image_bytes
+        mock_page.get_pixmap.return_value = mock_pixmap
+
+        # Execute test
+        pdf_processor.render_page_to_image_bytes(mock_page, "png", dpi=150, max_pixels=1024 * 1024)
+
+        # Assert results - 1024 px over 10000 pt allows at most 7 DPI
+        assert mock_page.get_pixmap.call_args.kwargs["dpi"] == 7
 
     def test_render_page_invalid_format(self, mock_pymupdf):
         """Test handling of invalid image format."""
         # Setup test
-        mock_page = MagicMock()
+        mock_page = Mock(spec=pymupdf.Page)
 
         # Execute test
         image_bytes, mime_type = pdf_processor.render_page_to_image_bytes(mock_page, "invalid_format")
@@ -102,40 +182,43 @@ class TestPDFProcessor:
         # Assert results
         assert image_bytes is None
         assert mime_type is None
-        
-    def test_extract_all_text(self, mock_pymupdf, temp_pdf_file):
-        """Test extraction of text from a PDF file."""
+
+    def test_extract_all_text(self, temp_pdf_file, page_mocks):
+        """Test extraction of text from a PDF file, parsed only once while it is unchanged."""
         # Setup test
-        mock_doc = MagicMock()
-        mock_doc.__len__.return_value = 2
-        mock_page1, mock_page2 = MagicMock(), MagicMock()
+        mock_doc = Mock(spec=pymupdf.Document)
+        mock_page1, mock_page2 = page_mocks[:2]
         mock_page1.get_text.return_value = "Text from page 1"
         mock_page2.get_text.return_value = "Text from page 2"
-        mock_doc.load_page.side_effect = [mock_page1, mock_page2]
+        mock_doc.pages.return_value = iter([mock_page1, mock_page2])
         
-        with patch.object(mock_pymupdf, 'open', return_value=mock_doc):
+        with patch.object(pdf_processor.pymupdf, 'open', return_value=mock_doc) as mock_open:
             # Execute test
             result = pdf_processor.extract_all_text(temp_pdf_file)
+            second_result = pdf_processor.extract_all_text(temp_pdf_file)
 
             # Assert results
             assert result == "Text from page 1\n\nText from page 2\n\n"
-            mock_pymupdf.open.assert_called_once_with(temp_pdf_file)
-            assert mock_doc.load_page.call_count == 2
+            assert second_result == result
+            mock_open.assert_called_once_with(os.path.abspath(temp_pdf_file))
+            mock_doc.close.assert_called_once()
+            mock_doc.pages.assert_called_once()
             mock_page1.get_text.assert_called_once_with("text")
             mock_page2.get_text.assert_called_once_with("text")
 
-    def test_save_page_as_temp_pdf(self, mock_pymupdf):
+    def test_save_page_as_temp_pdf(self):
         """Test saving a single page as a temporary PDF file."""
         # Setup test
-        mock_orig_doc = MagicMock()
-        mock_new_doc = MagicMock()
-        mock_pymupdf.open.return_value = mock_new_doc
+        mock_orig_doc = Mock(spec=pymupdf.Document)
+        mock_new_doc = Mock(spec=pymupdf.Document)
         
         # Mock tempfile.NamedTemporaryFile
         mock_temp_file = MagicMock()
         mock_temp_file.name = "/tmp/test_page.pdf"
+        mock_temp_file.__enter__.return_value = mock_temp_file
         
-        with patch('tempfile.NamedTemporaryFile', return_value=mock_temp_file), \
+        with patch.object(pdf_processor.pymupdf, 'open', return_value=mock_new_doc) as mock_open, \
+             patch('tempfile.NamedTemporaryFile', return_value=mock_temp_file), \
              patch('os.path.exists', return_value=True):
             
             # Execute test
@@ -143,24 +226,67 @@ class TestPDFProcessor:
             
             # Assert results
             assert result == "/tmp/test_page.pdf"
-            mock_pymupdf.open.assert_called_once()
+            mock_open.assert_called_once_with()
             mock_new_doc.insert_pdf.assert_called_once_with(mock_orig_doc, from_page=1, to_page=1)
             mock_new_doc.save.assert_called_once_with("/tmp/test_page.pdf")
             mock_new_doc.close.assert_called_once()
             
-    def test_save_page_as_temp_pdf_error(self, mock_pymupdf):
+    def test_save_page_as_bytes(self):
+        """Test saving single pages as in-memory PDFs through one scratch document, without temporary files."""
+        # Setup test
+        mock_orig_doc = Mock(spec=pymupdf.Document)
+        mock_new_doc = Mock(spec=pymupdf.Document)
+        mock_new_doc.tobytes.return_value = b"%PDF-1.7 single page"
+
+        with patch.object(pdf_processor.pymupdf, 'open', return_value=mock_new_doc) as mock_open, \
+             patch('tempfile.NamedTemporaryFile') as mock_temp_file:
+
+            # Execute test
+            result = pdf_processor.save_page_as_bytes(mock_orig_doc, 1)
+            second_result = pdf_processor.save_page_as_bytes(mock_orig_doc, 2)
+            pdf_processor.close_scratch_doc()
+
+            # Assert results
+            assert result == second_result == b"%PDF-1.7 single page"
+            mock_open.assert_called_once_with()
+            assert mock_new_doc.insert_pdf.call_args_list == [
+                call(mock_orig_doc, from_page=1, to_page=1),
+                call(mock_orig_doc, from_page=2, to_page=2),
+            ]
+            mock_new_doc.tobytes.assert_called_with(garbage=3)
+            assert mock_new_doc.delete_page.call_count == 2
+            mock_new_doc.close.assert_called_once()
+            mock_temp_file.assert_not_called()
+
+    def test_save_page_as_bytes_error(self):
+        """Test that a failed page copy discards the scratch document."""
+        # Setup test
+        mock_orig_doc = Mock(spec=pymupdf.Document)
+        mock_new_doc = Mock(spec=pymupdf.Document)
+        mock_new_doc.insert_pdf.side_effect = Exception("PDF creation error")
+
+        with patch.object(pdf_processor.pymupdf, 'open', return_value=mock_new_doc):
+            # Execute test
+            result = pdf_processor.save_page_as_bytes(mock_orig_doc, 1)
+
+            # Assert results
+            assert result is None
+            mock_new_doc.close.assert_called_once()
+
+    def test_save_page_as_temp_pdf_error(self):
         """Test error handling when saving a page as temporary PDF fails."""
         # Setup test
-        mock_orig_doc = MagicMock()
-        mock_new_doc = MagicMock()
-        mock_pymupdf.open.return_value = mock_new_doc
+        mock_orig_doc = Mock(spec=pymupdf.Document)
+        mock_new_doc = Mock(spec=pymupdf.Document)
         mock_new_doc.insert_pdf.side_effect = Exception("PDF creation error")
         
         # Mock tempfile.NamedTemporaryFile
         mock_temp_file = MagicMock()
         mock_temp_file.name = "/tmp/test_page.pdf"
+        mock_temp_file.__enter__.return_value = mock_temp_file
         
-        with patch('tempfile.NamedTemporaryFile', return_value=mock_temp_file), \
+        with patch.object(pdf_processor.pymupdf, 'open', return_value=mock_new_doc) as mock_open, \
+             patch('tempfile.NamedTemporaryFile', return_value=mock_temp_file), \
              patch('os.path.exists', return_value=True), \
              patch('os.remove') as mock_remove:
             
@@ -169,6 +295,7 @@ class TestPDFProcessor:
             
             # Assert results
             assert result is None
-            mock_pymupdf.open.assert_called_once()
+            mock_open.assert_called_once()
             mock_new_doc.insert_pdf.assert_called_once_with(mock_orig_doc, from_page=1, to_page=1)
+            mock_new_doc.close.assert_called_once()
             mock_remove.assert_called_once_with("/tmp/test_page.pdf")
\ No newline at end of file
@@ -5,236 +5,366 @@ This module tests the generation of document summaries from PDF text content
 using either OpenRouter or Ollama LLM models.
 """
 
-from unittest.mock import patch
+import pytest
+from unittest.mock import MagicMock
 
 from describepdf import summarizer
 
+SUMMARY_PROMPTS = {"summary": "Summarize: [FULL_PDF_TEXT]"}
+PDF_TEXT = "Text content of a document with enough words to be summarized."
+
 class TestSummarizer:
     """Test suite for the summarizer functionality."""
 
-    def test_generate_summary_extract_text_error(self):
+    def test_generate_summary_extract_text_error(self, mocker):
         """Test handling when text extraction from PDF fails."""
         # Setup test
-        with patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=None):
-            # Execute test
-            result = summarizer.generate_summary(
-                "test.pdf",
-                provider="openrouter",
-                api_key="test_api_key",
-                model="test_model"
-            )
-            
-            # Assert results
-            assert result is None
+        mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=None)
 
-    def test_generate_summary_empty_text(self):
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="openrouter",
+            api_key="test_api_key",
+            model="test_model"
+        )
+
+        # Assert results
+        assert result is None
+
+    def test_generate_summary_empty_text(self, mocker):
         """Test handling when PDF contains no extractable text."""
         # Setup test
-        with patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=""):
-            # Execute test
-            result = summarizer.generate_summary(
-                "test.pdf",
-                provider="openrouter",
-                api_key="test_api_key",
-                model="test_model"
-            )
-            
-            # Assert results
-            assert result == "Document contains no extractable text."
+        mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value="")
+        mock_get_prompts = mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="openrouter",
+            api_key="test_api_key",
+            model="test_model"
+        )
+
+        # Assert results
+        assert result == "Document contains no extractable text."
+        mock_get_prompts.assert_not_called()
+
+    @pytest.mark.parametrize("text", [
+        "  abc \n\n",
+        "a b c\n\n\n\n" * 10,
+    ], ids=["short_text", "sparse_text"])
+    def test_generate_summary_low_text(self, mocker, text):
+        """Test that a PDF with only a few non-blank characters of text is not sent to the LLM."""
+        # Setup test
+        mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=text)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+        mock_get_summary = mocker.patch('describepdf.summarizer.openrouter_client.get_llm_summary')
+
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="openrouter",
+            api_key="test_api_key",
+            model="test_model"
+        )
 
-    def test_generate_summary_prompt_not_found(self):
+        # Assert results
+        assert result == "Document contains insufficient extractable text."
+        mock_get_summary.assert_not_called()
+
+    def test_generate_summary_prompt_not_found(self, mocker):
         """Test handling when summary prompt template is not found."""
         # Setup test
-        with patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value="Text content"),\
-             patch('describepdf.summarizer.get_prompts', return_value={}):
-            
-            # Execute test
-            result = summarizer.generate_summary(
-                "test.pdf",
-                provider="openrouter",
-                api_key="test_api_key",
-                model="test_model"
-            )
-            
-            # Assert results
-            assert result is None
+        mock_extract = mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=PDF_TEXT)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value={})
 
-    def test_generate_summary_text_truncation(self):
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="openrouter",
+            api_key="test_api_key",
+            model="test_model"
+        )
+
+        # Assert results
+        assert result is None
+        mock_extract.assert_called_once_with("test.pdf")
+
+    def test_generate_summary_text_truncation(self, mocker):
         """Test truncation of text when it exceeds the maximum length."""
         # Setup test
         long_text = "a" * (summarizer.MAX_CHARS_FOR_PROMPT + 1000)  # Text longer than the limit
-        
-        with patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=long_text),\
-             patch('describepdf.summarizer.get_prompts', return_value={"summary": "Summarize: [FULL_PDF_TEXT]"}),\
-             patch('describepdf.summarizer.openrouter_client.get_llm_summary') as mock_get_summary:
-            
-            # Configure mock to return a predefined summary
-            mock_get_summary.return_value = "This is a summary."
-            
-            # Execute test
-            result = summarizer.generate_summary(
-                "test.pdf",
-                provider="openrouter",
-                api_key="test_api_key",
-                model="test_model"
-            )
-            
-            # Assert results
-            assert result == "This is a summary."
-            
-            # Verify summary was called with truncated text
-            call_args = mock_get_summary.call_args[0]
-            prompt_text = call_args[2]
-            assert "Summarize: " in prompt_text
-            assert "[... text truncated ...]" in prompt_text
-            assert len(prompt_text) <= summarizer.MAX_CHARS_FOR_PROMPT + 100  # Allow for prompt template text
-
-    def test_generate_summary_openrouter_success(self):
+        mocker.patch('describepdf.summarizer.TIKTOKEN_AVAILABLE', False)
+        mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=long_text)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+        mock_get_summary = mocker.patch('describepdf.summarizer.openrouter_client.get_llm_summary',
+                                        return_value="This is a summary.")
+
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="openrouter",
+            api_key="test_api_key",
+            model="test_model"
+        )
+
+        # Assert results
+        assert result == "This is a summary."
+
+        # Verify summary was called with truncated text
+        call_args = mock_get_summary.call_args[0]
+        prompt_text = call_args[2]
+        assert "Summarize: " in prompt_text
+        assert "[... text truncated ...]" in prompt_text
+        assert len(prompt_text) <= summarizer.MAX_CHARS_FOR_PROMPT + 100  # Allow for prompt template text
+
+    def test_generate_summary_token_truncation(self, mocker):
+        """Test truncation of text to the token budget when tiktoken is installed."""
+        # Setup test - one token per character
+        mock_encoding = MagicMock()
+        mock_encoding.encode.side_effect = lambda text, **kwargs: list(text)
+        mock_encoding.decode.side_effect = "".join
+        mock_tiktoken = MagicMock()
+        mock_tiktoken.encoding_for_model.side_effect = KeyError("test_model")
+        mock_tiktoken.get_encoding.return_value = mock_encoding
+        long_text = "a" * (summarizer.MAX_TOKENS_FOR_PROMPT + 1000)
+        summarizer._get_encoding.cache_clear()
+        mocker.patch('describepdf.summarizer.TIKTOKEN_AVAILABLE', True)
+        mocker.patch('describepdf.summarizer.tiktoken', mock_tiktoken, create=True)
+        mock_truncate = mocker.patch('describepdf.summarizer._truncate_to_tokens', wraps=summarizer._truncate_to_tokens)
+        mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=long_text)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+        mock_get_summary = mocker.patch('describepdf.summarizer.openrouter_client.get_llm_summary',
+                                        return_value="This is a summary.")
+
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="openrouter",
+            api_key="test_api_key",
+            model="test_model"
+        )
+
+        # Assert results
+        assert result == "This is a summary."
+        mock_truncate.assert_called_once_with(long_text, "test_model", summarizer.MAX_TOKENS_FOR_PROMPT)
+        mock_tiktoken.get_encoding.assert_called_once_with(summarizer.DEFAULT_ENCODING)
+        prompt_text = mock_get_summary.call_args[0][2]
+        expected_text = "a" * summarizer.MAX_TOKENS_FOR_PROMPT + "\n\n[... text truncated ...]"
+        assert prompt_text == "Summarize: " + expected_text
+        summarizer._get_encoding.cache_clear()
+
+    def test_generate_summary_token_encoding_error(self, mocker):
+        """Test that text is truncated by characters when the tiktoken encoding cannot be loaded."""
+        # Setup test
+        mock_tiktoken = MagicMock()
+        mock_tiktoken.encoding_for_model.side_effect = KeyError("test_model")
+        mock_tiktoken.get_encoding.side_effect = ConnectionError("no network")
+        long_text = "a" * (summarizer.MAX_CHARS_FOR_PROMPT + 1000)
+        summarizer._get_encoding.cache_clear()
+        mocker.patch('describepdf.summarizer.TIKTOKEN_AVAILABLE', True)
+        mocker.patch('describepdf.summarizer.tiktoken', mock_tiktoken, create=True)
+        mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=long_text)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+        mock_get_summary = mocker.patch('describepdf.summarizer.openrouter_client.get_llm_summary',
+                                        return_value="This is a summary.")
+
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="openrouter",
+            api_key="test_api_key",
+            model="test_model"
+        )
+
+        # Assert results
+        assert result == "This is a summary."
+        prompt_text = mock_get_summary.call_args[0][2]
+        expected_text = "a" * summarizer.MAX_CHARS_FOR_PROMPT + "\n\n[... text truncated ...]"
+        assert prompt_text == "Summarize: " + expected_text
+        summarizer._get_encoding.cache_clear()
+
+    def test_generate_summary_openrouter_success(self, mocker):
         """Test successful summary generation using OpenRouter."""
         # Setup test
-        with patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value="Text content"),\
-             patch('describepdf.summarizer.get_prompts', return_value={"summary": "Summarize: [FULL_PDF_TEXT]"}),\
-             patch('describepdf.summarizer.openrouter_client.get_llm_summary', return_value="Generated summary."):
-            
-            # Execute test
-            result = summarizer.generate_summary(
+        mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=PDF_TEXT)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+        mocker.patch('describepdf.summarizer.openrouter_client.get_llm_summary', return_value="Generated summary.")
+        summarizer._split_summary_template.cache_clear()
+
+        # Execute test
+        results = [
+            summarizer.generate_summary(
                 "test.pdf",
                 provider="openrouter",
                 api_key="test_api_key",
                 model="test_model"
             )
-            
-            # Assert results
-            assert result == "Generated summary."
-            
-            # Verify OpenRouter client was called correctly
-            summarizer.openrouter_client.get_llm_summary.assert_called_once_with(
-                "test_api_key", "test_model", "Summarize: Text content"
-            )
+            for _ in range(2)
+        ]
+
+        # Assert results
+        assert results == ["Generated summary.", "Generated summary."]
 
-    def test_generate_summary_ollama_success(self):
+        # Verify OpenRouter client was called correctly
+        summarizer.openrouter_client.get_llm_summary.assert_called_with(
+            "test_api_key", "test_model", "Summarize: " + PDF_TEXT
+        )
+
+        # The template was split once and reused for the second summary
+        assert summarizer._split_summary_template.cache_info().misses == 1
+
+    def test_generate_summary_with_extracted_text(self, mocker):
+        """Test that text passed in by the caller is summarized without opening the PDF."""
+        # Setup test
+        mock_extract = mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text')
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+        mock_get_summary = mocker.patch('describepdf.summarizer.openrouter_client.get_llm_summary',
+                                        return_value="Generated summary.")
+
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="openrouter",
+            api_key="test_api_key",
+            model="test_model",
+            full_text=PDF_TEXT
+        )
+
+        # Assert results
+        assert result == "Generated summary."
+        mock_extract.assert_not_called()
+        mock_get_summary.assert_called_once_with("test_api_key", "test_model", "Summarize: " + PDF_TEXT)
+
+    def test_generate_summary_ollama_success(self, mocker):
         """Test successful summary generation using Ollama."""
         # Setup test
-        with patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value="Text content"),\
-             patch('describepdf.summarizer.get_prompts', return_value={"summary": "Summarize: [FULL_PDF_TEXT]"}),\
-             patch('describepdf.summarizer.ollama_client.get_llm_summary', return_value="Generated summary."):
-            
-            # Execute test
-            result = summarizer.generate_summary(
-                "test.pdf",
-                provider="ollama",
-                ollama_endpoint="http://localhost:11434",
-                model="test_model"
-            )
-            
-            # Assert results
-            assert result == "Generated summary."
-            
-            # Verify Ollama client was called correctly
-            summarizer.ollama_client.get_llm_summary.assert_called_once_with(
-                "http://localhost:11434", "test_model", "Summarize: Text content"
-            )
+        mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=PDF_TEXT)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+        mocker.patch('describepdf.summarizer.ollama_client.get_llm_summary', return_value="Generated summary.")
+
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="ollama",
+            ollama_endpoint="http://localhost:11434",
+            model="test_model"
+        )
+
+        # Assert results
+        assert result == "Generated summary."
 
-    def test_generate_summary_openrouter_missing_api_key(self):
+        # Verify Ollama client was called correctly
+        summarizer.ollama_client.get_llm_summary.assert_called_once_with(
+            "http://localhost:11434", "test_model", "Summarize: " + PDF_TEXT
+        )
+
+    def test_generate_summary_openrouter_missing_api_key(self, mocker):
         """Test handling when OpenRouter API key is missing."""
         # Setup test
-        with patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value="Text content"),\
-             patch('describepdf.summarizer.get_prompts', return_value={"summary": "Summarize: [FULL_PDF_TEXT]"}):
-            
-            # Execute test
-            result = summarizer.generate_summary(
-                "test.pdf",
-                provider="openrouter",
-                api_key=None,
-                model="test_model"
-            )
-            
-            # Assert results
-            assert result is None
+        mock_extract = mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=PDF_TEXT)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="openrouter",
+            api_key=None,
+            model="test_model"
+        )
 
-    def test_generate_summary_ollama_missing_endpoint(self):
+        # Assert results
+        assert result is None
+        mock_extract.assert_not_called()
+
+    def test_generate_summary_ollama_missing_endpoint(self, mocker):
         """Test handling when Ollama endpoint URL is missing."""
         # Setup test
-        with patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value="Text content"),\
-             patch('describepdf.summarizer.get_prompts', return_value={"summary": "Summarize: [FULL_PDF_TEXT]"}):
-            
-            # Execute test
-            result = summarizer.generate_summary(
-                "test.pdf",
-                provider="ollama",
-                ollama_endpoint=None,
-                model="test_model"
-            )
-            
-            # Assert results
-            assert result is None
+        mock_extract = mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=PDF_TEXT)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="ollama",
+            ollama_endpoint=None,
+            model="test_model"
+        )
+
+        # Assert results
+        assert result is None
+        mock_extract.assert_not_called()
 
-    def test_generate_summary_unsupported_provider(self):
+    def test_generate_summary_unsupported_provider(self, mocker):
         """Test handling of unsupported provider."""
         # Setup test
-        with patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value="Text content"),\
-             patch('describepdf.summarizer.get_prompts', return_value={"summary": "Summarize: [FULL_PDF_TEXT]"}):
-            
-            # Execute test
-            result = summarizer.generate_summary(
-                "test.pdf",
-                provider="unsupported_provider",
-                model="test_model"
-            )
-            
-            # Assert results
-            assert result is None
+        mock_extract = mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=PDF_TEXT)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
 
-    def test_generate_summary_value_error(self):
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="unsupported_provider",
+            model="test_model"
+        )
+
+        # Assert results
+        assert result is None
+        mock_extract.assert_not_called()
+
+    def test_generate_summary_value_error(self, mocker):
         """Test handling of ValueError during summary generation."""
         # Setup test
-        with patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value="Text content"),\
-             patch('describepdf.summarizer.get_prompts', return_value={"summary": "Summarize: [FULL_PDF_TEXT]"}),\
-             patch('describepdf.summarizer.openrouter_client.get_llm_summary', side_effect=ValueError("API Error")):
-            
-            # Execute test
-            result = summarizer.generate_summary(
-                "test.pdf",
-                provider="openrouter",
-                api_key="test_api_key",
-                model="test_model"
-            )
-            
-            # Assert results
-            assert result is None
+        mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=PDF_TEXT)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+        mocker.patch('describepdf.summarizer.openrouter_client.get_llm_summary', side_effect=ValueError("API Error"))
+
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="openrouter",
+            api_key="test_api_key",
+            model="test_model"
+        )
+
+        # Assert results
+        assert result is None
 
-    def test_generate_summary_connection_error(self):
+    def test_generate_summary_connection_error(self, mocker):
         """Test handling of ConnectionError during summary generation."""
         # Setup test
-        with patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value="Text content"),\
-             patch('describepdf.summarizer.get_prompts', return_value={"summary": "Summarize: [FULL_PDF_TEXT]"}),\
-             patch('describepdf.summarizer.openrouter_client.get_llm_summary', side_effect=ConnectionError("Connection failed")):
-            
-            # Execute test
-            result = summarizer.generate_summary(
-                "test.pdf",
-                provider="openrouter",
-                api_key="test_api_key",
-                model="test_model"
-            )
-            
-            # Assert results
-            assert result is None
+        mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=PDF_TEXT)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+        mocker.patch('describepdf.summarizer.openrouter_client.get_llm_summary',
+                     side_effect=ConnectionError("Connection failed"))
+
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="openrouter",
+            api_key="test_api_key",
+            model="test_model"
+        )
 
-    def test_generate_summary_timeout_error(self):
+        # Assert results
+        assert result is None
+
+    def test_generate_summary_timeout_error(self, mocker):
         """Test handling of TimeoutError during summary generation."""
         # Setup test
-        with patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value="Text content"),\
-             patch('describepdf.summarizer.get_prompts', return_value={"summary": "Summarize: [FULL_PDF_TEXT]"}),\
-             patch('describepdf.summarizer.openrouter_client.get_llm_summary', side_effect=TimeoutError("Request timed out")):
-            
-            # Execute test
-            result = summarizer.generate_summary(
-                "test.pdf",
-                provider="openrouter",
-                api_key="test_api_key",
-                model="test_model"
-            )
-            
-            # Assert results
-            assert result is None
\ No newline at end of file
+        mocker.patch('describepdf.summarizer.pdf_processor.extract_all_text', return_value=PDF_TEXT)
+        mocker.patch('describepdf.summarizer.get_prompts', return_value=SUMMARY_PROMPTS)
+        mocker.patch('describepdf.summarizer.openrouter_client.get_llm_summary',
+                     side_effect=TimeoutError("Request timed out"))
+
+        # Execute test
+        result = summarizer.generate_summary(
+            "test.pdf",
+            provider="openrouter",
+            api_key="test_api_key",
+            model="test_model"
+        )
+
+        # Assert results
+        assert result is None